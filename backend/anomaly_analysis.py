@@ -0,0 +1,186 @@
+import threading
+import numpy as np
+import pandas as pd
+from model_registry import default_registry, ANOMALY_MODEL_PATH, CLASSIFIER_MODEL_PATH
+
+GROUP_KEYS = ['scan_id', 'payload', 'method']
+FEATURE_COLUMNS = ['response_code', 'body_word_count_changed']
+READ_COLUMNS = ['label', 'payload', 'method'] + FEATURE_COLUMNS
+AGG_COLUMNS = ['count', 'score_sum', 'score_max', 'effective']
+
+
+def anomaly_scores(anomaly_detector, features):
+    """Map IsolationForest decision values onto 0-100, where 50 is the model's anomaly threshold"""
+    decision = anomaly_detector.decision_function(features)
+    return np.clip((0.5 - decision) * 100, 0, 100)
+
+
+def merge_groups(groups, grouped):
+    """Fold grouped into groups, touching only the rows of keys in grouped; new keys are appended"""
+    if groups.empty:
+        return grouped
+    positions = groups.index.get_indexer(grouped.index)
+    found = positions >= 0
+    if found.any():
+        rows = positions[found]
+        current = groups.iloc[rows].to_numpy()
+        incoming = grouped[found].to_numpy()
+        merged = current + incoming
+        merged[:, 2] = np.fmax(current[:, 2], incoming[:, 2])  # score_max
+        groups.iloc[rows] = merged
+    if not found.all():
+        groups = pd.concat([groups, grouped[~found]])
+    return groups
+
+
+class AnomalyAggregator:
+    """Running per-payload anomaly statistics over the result store
+
+    Every refresh() reads only the rows appended since the last one, scores them in one
+    vectorized call per model and folds them into a table of (scan_id, payload, method) groups
+    holding count, score sum, max score and effective count, and into running cross-scan totals
+    per (payload, method). Only the groups a chunk touches are updated. Label counts are kept per
+    scan with their own cursor, so they stay available when scoring fails. A model replacement
+    restarts the score aggregation from the first row.
+    """
+
+    def __init__(self, store, registry=default_registry, anomaly_path=ANOMALY_MODEL_PATH,
+                 classifier_path=CLASSIFIER_MODEL_PATH, chunk_size=100000):
+        self.store = store
+        self.registry = registry
+        self.anomaly_path = anomaly_path
+        self.classifier_path = classifier_path
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.label_cursor = 0
+        self.labels = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays([[], []], names=['scan_id', 'label']))
+        self.reset(None)
+
+    def reset(self, model_version):
+        self.cursor = 0
+        self.model_version = model_version
+        self.groups = pd.DataFrame(
+            {column: pd.Series(dtype=float) for column in AGG_COLUMNS},
+            index=pd.MultiIndex.from_arrays([[], [], []], names=GROUP_KEYS)
+        )
+        # The same aggregates across scans, keyed by (payload, method)
+        self.totals = self.groups.droplevel('scan_id')
+        self.summaries = {}
+
+    def refresh_labels(self):
+        """Count the labels of rows stored since the last count, without scoring them"""
+        while True:
+            chunk = self.store.read_frame(since_id=self.label_cursor, limit=self.chunk_size, columns=['label'])
+            if chunk.empty:
+                break
+            self.add_labels(chunk)
+            if len(chunk) < self.chunk_size:
+                break
+
+    def add_labels(self, chunk):
+        """Fold the label counts of the rows in chunk that were not counted yet"""
+        chunk = chunk[chunk['id'] > self.label_cursor]
+        if chunk.empty:
+            return
+        # The legacy CSV store has no scan ids
+        scan_ids = chunk['scan_id'] if 'scan_id' in chunk else pd.Series('default', index=chunk.index)
+        labels = chunk.groupby([scan_ids.rename('scan_id'), 'label']).size()
+        self.labels = self.labels.add(labels, fill_value=0).astype('int64')
+        self.label_cursor = int(chunk['id'].iloc[-1])
+
+    def refresh(self):
+        """Fold newly stored rows into the aggregates; returns the store cursor"""
+        anomaly_detector, classifier, version = self.registry.get_models(self.anomaly_path, self.classifier_path)
+        if version != self.model_version:
+            self.reset(version)
+
+        while True:
+            chunk = self.store.read_frame(since_id=self.cursor, limit=self.chunk_size, columns=READ_COLUMNS)
+            if chunk.empty:
+                break
+            self.add_chunk(chunk, anomaly_detector, classifier)
+            self.cursor = int(chunk['id'].iloc[-1])
+            if len(chunk) < self.chunk_size:
+                break
+        return self.cursor
+
+    def add_chunk(self, chunk, anomaly_detector, classifier):
+        # Rows are counted once even if scoring fails and the chunk is read again
+        self.add_labels(chunk)
+        # The legacy CSV store has neither scan ids nor methods
+        if 'scan_id' not in chunk:
+            chunk['scan_id'] = 'default'
+        chunk['method'] = chunk['method'].fillna('unknown') if 'method' in chunk else 'unknown'
+
+        if anomaly_detector is None or classifier is None:
+            return
+        features = np.column_stack([
+            chunk['response_code'].fillna(0).to_numpy(dtype=float),
+            chunk['body_word_count_changed'].astype(bool).to_numpy(dtype=float)
+        ])
+        chunk['score'] = anomaly_scores(anomaly_detector, features)
+        chunk['effective'] = (classifier.predict(features) == 1).astype('int64')
+
+        grouped = chunk.groupby(GROUP_KEYS).agg(
+            count=('score', 'size'),
+            score_sum=('score', 'sum'),
+            score_max=('score', 'max'),
+            effective=('effective', 'sum')
+        ).astype(float)
+        self.groups = merge_groups(self.groups, grouped)
+        totals = grouped.groupby(level=['payload', 'method']).agg(
+            {'count': 'sum', 'score_sum': 'sum', 'score_max': 'max', 'effective': 'sum'}
+        )
+        self.totals = merge_groups(self.totals, totals)
+
+    def label_summary(self, scan_id=None):
+        """Return the label counts of all stored rows, optionally for one scan; needs no models"""
+        with self.lock:
+            self.refresh_labels()
+            labels = self.labels
+            if scan_id:
+                labels = labels[labels.index.get_level_values('scan_id') == scan_id]
+            label_counts = labels.groupby(level='label').sum()
+            return {
+                "vulnerabilityData": [{"name": label, "value": int(count)} for label, count in label_counts.items()],
+                "rowsAnalyzed": int(label_counts.sum())
+            }
+
+    def summary(self, scan_id=None, top=5):
+        """Return the top payloads by mean anomaly score, optionally for one scan"""
+        with self.lock:
+            cursor = self.refresh()
+            key = (scan_id, top)
+            cached = self.summaries.get(key)
+            if cached is not None and cached[0] == cursor:
+                return cached[1]
+
+            groups = self.groups
+            if scan_id:
+                groups = groups[groups.index.get_level_values('scan_id') == scan_id]
+            else:
+                # Across scans the same payload and method are merged into one group
+                groups = self.totals
+
+            # Groups are kept in arrival order; ties are broken by payload and method as before
+            top_groups = groups.assign(score_mean=groups['score_sum'] / groups['count']).nlargest(top, 'score_mean', keep='all')
+            top_groups = top_groups.sort_index().sort_values('score_mean', ascending=False, kind='stable').head(top)
+            anomaly_data = []
+            for index, row in top_groups.iterrows():
+                payload, method = index[-2], index[-1]
+                anomaly_data.append({
+                    "name": payload[:15] + "..." if len(payload) > 15 else payload,
+                    "payload": payload,
+                    "method": method,
+                    "score": round(float(row['score_mean']), 1),
+                    "maxScore": round(float(row['score_max']), 1),
+                    "count": int(row['count']),
+                    "effectiveRate": round(float(row['effective'] / row['count']), 3)
+                })
+
+            result = {
+                "anomalyData": anomaly_data,
+                "payloadsAnalyzed": int(len(groups))
+            }
+            self.summaries[key] = (cursor, result)
+            return result
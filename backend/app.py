@@ -1,15 +1,22 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
 import time
 import logging
 import threading
-import json
-import numpy as np
 import pandas as pd
-import joblib
+from urllib.parse import urljoin
 from werkzeug.utils import secure_filename
+from result_store import open_result_store
+from live_stream import EventHub, format_event
+from job_manager import JobManager
+from model_registry import default_registry
+from anomaly_analysis import AnomalyAggregator
+from checkpoint import CheckpointStore
+from distributed import Coordinator, authkey_from_env
+from metrics import default_metrics
+from model_training import ModelTrainer
 
 # Import your WebFuzzer class
 # This assumes your WebFuzzer class is in a file called webfuzzer.py
@@ -20,7 +27,7 @@ except ImportError:
     
     # Dummy class for demonstration
     class WebFuzzer:
-        def __init__(self, target_url, wordlist_file):
+        def __init__(self, target_url, wordlist_file, **kwargs):
             self.target_url = target_url
             self.wordlist_file = wordlist_file
             self.running = False
@@ -39,11 +46,6 @@ except ImportError:
 app = Flask(__name__)
 CORS(app)  # Enable Cross-Origin Resource Sharing for React frontend
 
-# Global variables to track fuzzing state
-fuzzer_instance = None
-fuzzing_thread = None
-is_fuzzing = False
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,58 +55,146 @@ UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# Path to the CSV dataset
-DATASET_FILE = "fuzzer_dataset.csv"
+# Labelled dataset store; DATASET_BACKEND=csv keeps the legacy fuzzer_dataset.csv file
+result_store = open_result_store()
+
+# Page size limits for /api/fuzzing-results
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+# Severity shown for each dataset label
+SEVERITY_BY_LABEL = {"malicious": "high", "suspicious": "medium"}
+
+# Push channel for live results and progress ticks served by /api/stream
+event_hub = EventHub()
+STREAM_TICK_SECONDS = 1.0
+
+# All scans share one worker pool; FUZZ_MAX_WORKERS is the global concurrency budget
+job_manager = JobManager(
+    max_workers=int(os.environ.get("FUZZ_MAX_WORKERS", 32)),
+    max_active=int(os.environ.get("FUZZ_MAX_ACTIVE_SCANS", 4))
+)
 
 # ML models paths (adjust if needed)
 ANOMALY_MODEL_PATH = "anomaly_model.pkl"
 CLASSIFIER_MODEL_PATH = "classifier_model.pkl"
 
-@app.route('/api/start-fuzzing', methods=['POST'])
-def start_fuzzing():
-    global fuzzer_instance, fuzzing_thread, is_fuzzing
+# Per-payload anomaly statistics, updated incrementally from the result store
+anomaly_aggregator = AnomalyAggregator(result_store, default_registry, ANOMALY_MODEL_PATH, CLASSIFIER_MODEL_PATH)
+MAX_ANOMALY_TOP = 100
+
+# Retrains both models from new dataset rows on a worker process, see model_training.py
+model_trainer = ModelTrainer(result_store)
+
+# Remote workers pull probes of distributed scans from here when FUZZ_COORDINATOR is set,
+# e.g. unix:/tmp/webfuzzer.sock or tcp:0.0.0.0:7070; FUZZ_COORDINATOR_KEY is the shared secret
+COORDINATOR_ADDRESS = os.environ.get("FUZZ_COORDINATOR")
+if COORDINATOR_ADDRESS:
+    # A TCP address without FUZZ_COORDINATOR_KEY fails here at startup, not on the first request
+    authkey_from_env(COORDINATOR_ADDRESS)
+coordinator = None
+coordinator_lock = threading.Lock()
+
+# Periodic scan checkpoints used by /api/scans/<scan_id>/resume; CHECKPOINT_DIR overrides the folder
+checkpoint_store = CheckpointStore()
+
+def find_job(scan_id=None):
+    """Return the job for scan_id, or the most recent job when no id is given"""
+    return job_manager.get(scan_id) if scan_id else job_manager.latest()
+
+def as_list(value):
+    """Accept a JSON list or a comma/newline separated string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace('\n', ',').split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def create_fuzzer(data):
+    """Build a WebFuzzer from a start-scan request body"""
+    # Get parameters from request
+    target_url = f"{data.get('protocol', 'https')}://{data.get('targetUrl', '')}"
+    # Extra endpoints may be given relative to the target
+    endpoints = [urljoin(target_url, endpoint) for endpoint in as_list(data.get('endpoints'))]
     
-    if is_fuzzing:
-        return jsonify({"success": False, "message": "A fuzzing scan is already running"}), 400
-        
-    try:
-        data = request.json
-        
-        # Get parameters from request
-        target_url = f"{data.get('protocol', 'https')}://{data.get('targetUrl', '')}"
-        
-        # For payload handling, either use uploaded file or create temp file with provided payloads
-        if data.get('payloads'):
-            # Create a temporary wordlist file from provided payloads
-            wordlist_file = os.path.join(UPLOAD_FOLDER, f"wordlist_{int(time.time())}.txt")
+    # For payload handling, either use uploaded file or create temp file with provided payloads
+    if data.get('payloads'):
+        # Create a temporary wordlist file from provided payloads
+        wordlist_file = os.path.join(UPLOAD_FOLDER, f"wordlist_{time.time_ns()}.txt")
+        with open(wordlist_file, 'w') as f:
+            f.write(data.get('payloads', ''))
+    elif data.get('wordlistFile'):
+        # Stream a previously uploaded wordlist; only files in the uploads folder are allowed
+        wordlist_file = os.path.join(UPLOAD_FOLDER, secure_filename(os.path.basename(data['wordlistFile'])))
+    else:
+        # Default wordlist if none provided
+        wordlist_file = os.path.join(os.path.dirname(__file__), 'xss.txt')
+        if not os.path.exists(wordlist_file):
             with open(wordlist_file, 'w') as f:
-                f.write(data.get('payloads', ''))
-        else:
-            # Default wordlist if none provided
-            wordlist_file = os.path.join(os.path.dirname(__file__), 'xss.txt')
-            if not os.path.exists(wordlist_file):
-                with open(wordlist_file, 'w') as f:
-                    f.write("<script>alert(1)</script>\n'\"><script>alert(1)</script>")
-                    
-        # Create WebFuzzer instance
-        fuzzer_instance = WebFuzzer(target_url, wordlist_file)
-        
-        # Start fuzzing in a separate thread to not block the API
-        def run_fuzzing():
-            global is_fuzzing
-            is_fuzzing = True
-            try:
-                fuzzer_instance.start_fuzzing()
-            finally:
-                is_fuzzing = False
+                f.write("<script>alert(1)</script>\n'\"><script>alert(1)</script>")
                 
-        fuzzing_thread = threading.Thread(target=run_fuzzing)
-        fuzzing_thread.daemon = True
-        fuzzing_thread.start()
+    # Create WebFuzzer instance; threadCount from the UI sets the number of concurrent probes
+    fuzzer = WebFuzzer(
+        target_url,
+        wordlist_file,
+        result_store=result_store,
+        concurrency=int(data.get('threadCount', 1) or 1),
+        per_host_limit=data.get('perHostLimit'),
+        pool_size=data.get('poolSize'),
+        keep_alive=data.get('keepAlive', True),
+        http2=bool(data.get('http2', False)),
+        wordlist_offset=int(data.get('wordlistOffset', 0) or 0),
+        adaptive_rate=bool(data.get('adaptiveRate', True)),
+        request_timeout=float(data.get('requestTimeout', 10) or 10),
+        checkpoint_store=checkpoint_store,
+        dedup=bool(data.get('dedup', True)),
+        prune=data.get('prune') or None,
+        endpoints=endpoints,
+        params=as_list(data.get('params')),
+        discover_forms=bool(data.get('discoverForms', False)),
+        param_priority=data.get('paramPriority') or None,
+        distributed=bool(data.get('distributed', False)),
+        result_buffer_size=int(data.get('resultBufferSize', 10000) or 10000),
+        log_level=data.get('logLevel') or None,
+        log_format=data.get('logFormat') or None
+    )
+    return attach_listeners(fuzzer)
+
+def attach_listeners(fuzzer):
+    """Publish a fuzzer's results and progress to /api/stream subscribers"""
+    if hasattr(fuzzer, 'add_result_listener'):
+        fuzzer.add_result_listener(event_hub.publish_result)
+        fuzzer.add_progress_listener(event_hub.publish_progress)
+    return fuzzer
+
+@app.before_request
+def start_coordinator():
+    """Open the coordinator socket on the first request, so the debug reloader's parent never binds it"""
+    global coordinator
+    if COORDINATOR_ADDRESS and coordinator is None:
+        with coordinator_lock:
+            if coordinator is None:
+                coordinator = Coordinator(job_manager, COORDINATOR_ADDRESS).start()
+
+@app.before_request
+def start_model_trainer():
+    """Start the periodic training check on the first request, for the same reason"""
+    model_trainer.start()
+
+@app.route('/api/start-fuzzing', methods=['POST'])
+@app.route('/api/scans', methods=['POST'])
+def start_fuzzing():
+    try:
+        if (request.get_json(silent=True) or {}).get('distributed') and coordinator is None:
+            return jsonify({"success": False, "message": "Distributed scans need FUZZ_COORDINATOR to be set"}), 400
+        # Queue the scan on the shared worker pool; several scans may run at once
+        job = job_manager.submit(create_fuzzer(request.json))
         
         return jsonify({
             "success": True,
-            "message": f"Fuzzing started against {target_url}"
+            "message": f"Fuzzing started against {job.fuzzer.target_url}",
+            "scanId": job.scan_id,
+            "state": job.state
         })
         
     except Exception as e:
@@ -113,133 +203,357 @@ def start_fuzzing():
 
 @app.route('/api/stop-fuzzing', methods=['POST'])
 def stop_fuzzing():
-    global fuzzer_instance, is_fuzzing
+    data = request.get_json(silent=True) or {}
+    job = find_job(data.get('scanId'))
     
-    if not is_fuzzing or not fuzzer_instance:
+    if not job or job.finished:
         return jsonify({"success": False, "message": "No active fuzzing scan to stop"}), 400
         
+    return stop_scan(job.scan_id)
+
+@app.route('/api/scans/<scan_id>/stop', methods=['POST'])
+def stop_scan(scan_id):
     try:
-        # Call stop method if available, otherwise set flag
-        if hasattr(fuzzer_instance, 'stop_fuzzing'):
-            result = fuzzer_instance.stop_fuzzing()
-        else:
-            is_fuzzing = False
-            result = {"status": "stopped"}
+        job = job_manager.stop(scan_id)
+        if not job:
+            return jsonify({"success": False, "message": f"Unknown scan: {scan_id}"}), 404
             
         return jsonify({
             "success": True,
             "message": "Fuzzing scan stopped successfully",
-            "result": result
+            "result": job.to_dict()
         })
         
     except Exception as e:
         logger.error(f"Error stopping fuzzing: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
 
+@app.route('/api/scans/<scan_id>/resume', methods=['POST'])
+def resume_scan(scan_id):
+    """Continue a stopped or interrupted scan from its last checkpoint"""
+    try:
+        state = checkpoint_store.load(scan_id)
+        if state is None:
+            return jsonify({"success": False, "message": f"No checkpoint for scan: {scan_id}"}), 404
+        if state.get("state") == "completed":
+            return jsonify({"success": False, "message": f"Scan {scan_id} already completed"}), 400
+        job = job_manager.get(scan_id)
+        if job and not job.finished:
+            return jsonify({"success": False, "message": f"Scan {scan_id} is still running"}), 409
+
+        fuzzer = WebFuzzer(
+            state["targetUrl"],
+            state["wordlistFile"],
+            result_store=result_store,
+            checkpoint_store=checkpoint_store,
+            resume_from=state,
+            **state.get("options", {})
+        )
+        job = job_manager.submit(attach_listeners(fuzzer))
+
+        return jsonify({
+            "success": True,
+            "message": f"Resumed scan {scan_id} after {state.get('payloadsDone', 0)} payloads",
+            "scanId": job.scan_id,
+            "state": job.state,
+            "wordlistOffset": state.get("wordlistOffset", 0)
+        })
+
+    except Exception as e:
+        logger.error(f"Error resuming scan {scan_id}: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/workers', methods=['GET'])
+def list_workers():
+    """Connected workers of the distributed mode with their throughput"""
+    if coordinator is None:
+        return jsonify({"success": True, "enabled": False, "workers": []})
+    return jsonify({"success": True, "enabled": True, **coordinator.get_stats()})
+
+@app.route('/api/checkpoints', methods=['GET'])
+def list_checkpoints():
+    return jsonify({"success": True, "checkpoints": checkpoint_store.list()})
+
+@app.route('/api/scans', methods=['GET'])
+def list_scans():
+    return jsonify({
+        "success": True,
+        "scans": [job.to_dict() for job in job_manager.list_jobs()],
+        "scheduler": job_manager.get_stats()
+    })
+
+@app.route('/api/scans/<scan_id>', methods=['GET'])
+def get_scan(scan_id):
+    job = job_manager.get(scan_id)
+    if not job:
+        return jsonify({"success": False, "message": f"Unknown scan: {scan_id}"}), 404
+    return jsonify({"success": True, "scan": job.to_dict()})
+
+@app.route('/api/scans/<scan_id>/rate-limits', methods=['GET'])
+def get_scan_rate_limits(scan_id):
+    """Current per-host window, rate cap, latency percentiles and Retry-After state of a scan"""
+    job = job_manager.get(scan_id)
+    if not job:
+        return jsonify({"success": False, "message": f"Unknown scan: {scan_id}"}), 404
+    if not hasattr(job.fuzzer, 'host_limiter'):
+        return jsonify({"success": True, "scanId": scan_id, "rateControl": {}})
+    return jsonify({"success": True, "scanId": scan_id, "rateControl": job.fuzzer.host_limiter.get_stats()})
+
+def store_results_to_json(df):
+    """Convert dataset rows to the frontend result format with column operations instead of iterrows"""
+    if df.empty:
+        return []
+
+    payload = df['payload'].fillna('').astype(str)
+    label = df['label'].fillna('unknown').astype(str)
+    # The CSV dataset has no method column; responseTime is not stored by either backend
+    method = df['method'].fillna('GET').astype(str) if 'method' in df else 'GET'
+    results = pd.DataFrame({
+        "id": df['id'].astype(int),
+        "url": payload,  # Using payload as URL for demonstration
+        "method": method,
+        "payload": payload,
+        "status": df['response_code'].fillna(200).astype(int),
+        "responseTime": None,
+        "severity": label.map(SEVERITY_BY_LABEL).fillna("low"),
+        "finding": label + " payload detected",
+        "alertDetected": df['alert_detected'].fillna(False).astype(bool),
+        "errorDetected": df['error_detected'].fillna(False).astype(bool),
+        "bodyWordCountChanged": df['body_word_count_changed'].fillna(False).astype(bool)
+    })
+    return results.to_dict('records')
+
+def live_results_page(fuzzer, since, limit):
+    """Slice a fuzzer's in-memory results after the since id"""
+    return fuzzer.results_since(since, limit), fuzzer.latest_result_id()
+
 @app.route('/api/fuzzing-results', methods=['GET'])
 def get_fuzzing_results():
+    return results_page(request.args.get('scanId'))
+
+@app.route('/api/scans/<scan_id>/results', methods=['GET'])
+def get_scan_results(scan_id):
+    return results_page(scan_id)
+
+def results_page(scan_id):
     try:
-        # Read results from the dataset file
-        if os.path.exists(DATASET_FILE):
-            df = pd.read_csv(DATASET_FILE)
-            
-            # Convert to the format expected by the frontend
-            results = []
-            for i, row in df.iterrows():
-                # Map severity based on label
-                severity = "low"
-                if row.get('label') == "malicious":
-                    severity = "high"
-                elif row.get('label') == "suspicious":
-                    severity = "medium"
-                
-                results.append({
-                    "id": i + 1,
-                    "url": row.get('payload', ''),  # Using payload as URL for demonstration
-                    "method": "GET",  # Default method
-                    "payload": row.get('payload', ''),
-                    "status": int(row.get('response_code', 200)),
-                    "responseTime": 100,  # Example response time
-                    "severity": severity,
-                    "finding": f"{row.get('label', 'unknown')} payload detected",
-                    "alertDetected": bool(row.get('alert_detected', False)),
-                    "errorDetected": bool(row.get('error_detected', False)),
-                    "bodyWordCountChanged": bool(row.get('body_word_count_changed', False))
-                })
-                
-            return jsonify({"success": True, "results": results})
+        since = max(0, int(request.args.get('since', 0)))
+        limit = min(max(1, int(request.args.get('limit', DEFAULT_PAGE_SIZE))), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"success": False, "message": "since and limit must be integers"}), 400
+
+    try:
+        # Serve a scan the manager still holds from memory, otherwise read the store
+        job = find_job(scan_id)
+        use_live = job is not None and hasattr(job.fuzzer, 'get_results')
+        if use_live:
+            source, scan_id = "live", job.scan_id
+            latest = job.fuzzer.latest_result_id()
         else:
-            return jsonify({"success": True, "results": []})
-            
+            source = "store"
+            latest = result_store.latest_id(scan_id) if result_store.exists() else 0
+
+        # The tag only depends on the cursor and the newest row, so unchanged polls skip the read entirely
+        etag = f"{source}-{scan_id}-{since}-{limit}-{latest}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        if use_live:
+            results, total = live_results_page(job.fuzzer, since, limit)
+            has_more = (results[-1]["id"] if results else since) < total
+        else:
+            # Fetch one extra row to learn whether another page follows
+            df = result_store.read_frame(scan_id=scan_id, since_id=since, limit=limit + 1)
+            has_more = len(df) > limit
+            results = store_results_to_json(df.iloc[:limit])
+
+        next_cursor = results[-1]["id"] if results else since
+        response = jsonify({
+            "success": True,
+            "results": results,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "scanId": scan_id,
+            "source": source
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
     except Exception as e:
         logger.error(f"Error getting fuzzing results: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
 
+@app.route('/api/stream', methods=['GET'])
+def stream_results():
+    """Server-Sent Events stream of new results, progress ticks and gap notices"""
+    scan_id = request.args.get('scanId')
+    try:
+        since = max(0, int(request.args.get('since') or request.headers.get('Last-Event-ID') or 0))
+    except ValueError:
+        return jsonify({"success": False, "message": "since and Last-Event-ID must be integers"}), 400
+    subscription = event_hub.subscribe(scan_id)
+    job = find_job(scan_id)
+    fuzzer = job.fuzzer if job else None
+
+    def generate():
+        last_id = since
+        # Without a scanId the stream follows the most recent scan, like /api/fuzzing-results
+        followed = fuzzer.scan_id if fuzzer is not None and hasattr(fuzzer, 'scan_id') else None
+        try:
+            # Replay live results after the cursor; the subscription buffers anything newer meanwhile
+            if since and hasattr(fuzzer, 'get_results'):
+                backlog = fuzzer.results_since(since)
+                for start in range(0, len(backlog), DEFAULT_PAGE_SIZE):
+                    page = backlog[start:start + DEFAULT_PAGE_SIZE]
+                    last_id = page[-1]["id"]
+                    yield format_event("results", page, last_id)
+
+            while True:
+                results, ticks, dropped = subscription.take(STREAM_TICK_SECONDS)
+                if dropped:
+                    # The client fell behind; it can refetch the missing rows from /api/fuzzing-results
+                    yield format_event("gap", {"dropped": dropped, "resumeFrom": last_id})
+                if not scan_id:
+                    latest = job_manager.latest()
+                    if latest and latest.scan_id != followed:
+                        # Ids restart with the new scan; clients notice the jump and resync over REST
+                        followed, last_id = latest.scan_id, 0
+                results = [r for sid, r in results if sid == (scan_id or followed) and r["id"] > last_id]
+                if results:
+                    # Everything queued since the last write goes out as one coalesced event
+                    last_id = results[-1]["id"]
+                    yield format_event("results", results, last_id)
+
+                if not ticks:
+                    # Nothing was pushed, so pull a tick for the requested scan or for every running scan
+                    jobs = [find_job(scan_id)] if scan_id else job_manager.list_jobs()
+                    ticks = [
+                        current.fuzzer.get_progress() for current in jobs
+                        if current and current.state == "running" and hasattr(current.fuzzer, 'get_progress')
+                    ]
+                for tick in ticks:
+                    yield format_event("progress", tick)
+                if not results and not ticks:
+                    yield ": keep-alive\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/fuzzing-stats', methods=['GET'])
+def get_fuzzing_stats():
+    job = find_job(request.args.get('scanId'))
+    if not job or not hasattr(job.fuzzer, 'get_stats'):
+        return jsonify({"success": True, "stats": {}, "scheduler": job_manager.get_stats()})
+
+    try:
+        return jsonify({
+            "success": True,
+            "running": job.state == "running",
+            "scanId": job.scan_id,
+            "stats": job.fuzzer.get_stats(),
+            "scheduler": job_manager.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting fuzzing stats: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+def scheduler_gauges():
+    stats = job_manager.get_stats()
+    return {
+        "active_scans": ("Scans currently running", stats["activeScans"]),
+        "queued_scans": ("Scans waiting for a free slot", stats["queuedScans"]),
+        "in_flight_requests": ("Probes currently in flight", stats["inFlight"]),
+        "stream_subscribers": ("Open /api/stream connections", event_hub.subscriber_count())
+    }
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Stage timing histograms and counters in the Prometheus text format"""
+    return Response(default_metrics.prometheus(scheduler_gauges()), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/summary', methods=['GET'])
+def get_metrics_summary():
+    """The same metrics as JSON, with per-stage percentiles for the dashboard"""
+    try:
+        summary = default_metrics.summary()
+        stats = job_manager.get_stats()
+        summary["scheduler"] = {
+            "activeScans": stats["activeScans"],
+            "queuedScans": stats["queuedScans"],
+            "inFlight": stats["inFlight"],
+            "streamSubscribers": event_hub.subscriber_count()
+        }
+        return jsonify({"success": True, "metrics": summary})
+    except Exception as e:
+        logger.error(f"Error getting metrics: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    """Training progress and the model versions currently loaded"""
+    try:
+        # Trained models are read from the manifest's version directory once one is published
+        default_registry.get_models(ANOMALY_MODEL_PATH, CLASSIFIER_MODEL_PATH)
+        anomaly_path, classifier_path = default_registry.model_paths(ANOMALY_MODEL_PATH, CLASSIFIER_MODEL_PATH)
+        return jsonify({
+            "success": True,
+            "training": model_trainer.get_status(),
+            "models": {
+                "anomaly": default_registry.version(anomaly_path),
+                "classifier": default_registry.version(classifier_path),
+                "anomalyPath": anomaly_path,
+                "classifierPath": classifier_path
+            },
+            "registry": default_registry.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting model status: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/models/train', methods=['POST'])
+def train_models():
+    """Start a training round on the rows stored since the last one"""
+    if not result_store.exists():
+        return jsonify({"success": False, "message": "No dataset available for training"}), 400
+    if not model_trainer.train():
+        return jsonify({"success": False, "message": "A training round is already running"}), 409
+    return jsonify({"success": True, "message": "Training started"}), 202
+
 @app.route('/api/anomaly-analysis', methods=['GET'])
 def get_anomaly_analysis():
     try:
         # Check if we have ML models and dataset
-        if not os.path.exists(DATASET_FILE):
+        if not result_store.exists():
             return jsonify({
                 "success": False, 
                 "message": "No dataset available for analysis"
             }), 400
-            
-        # Example of running ML analysis on the dataset
-        df = pd.read_csv(DATASET_FILE)
-        
-        # If models exist, use them for prediction
-        results = {
-            "anomalyData": [],
-            "vulnerabilityData": []
-        }
-        
-        # Get counts for vulnerability types (example)
-        vuln_counts = df['label'].value_counts().to_dict()
-        for label, count in vuln_counts.items():
-            results["vulnerabilityData"].append({
-                "name": label,
-                "value": int(count)
-            })
-            
-        # Try to use ML models if available
+
+        top = min(max(request.args.get('top', 5, type=int), 1), MAX_ANOMALY_TOP)
+        scan_id = request.args.get('scanId')
+        # Label counts need no models, so they are reported even when scoring fails
+        labels = anomaly_aggregator.label_summary(scan_id=scan_id)
         try:
-            if os.path.exists(ANOMALY_MODEL_PATH) and os.path.exists(CLASSIFIER_MODEL_PATH):
-                anomaly_detector = joblib.load(ANOMALY_MODEL_PATH)
-                classifier = joblib.load(CLASSIFIER_MODEL_PATH)
-                
-                # Example of preparing features and making predictions
-                features = df[['response_code', 'body_word_count_changed']].values
-                
-                # Convert boolean to int
-                features[:, 1] = features[:, 1].astype(int)
-                
-                # Make predictions
-                anomaly_scores = anomaly_detector.decision_function(features)
-                predictions = classifier.predict(features)
-                
-                # Process results for frontend visualization
-                unique_payloads = df['payload'].unique()
-                for i, payload in enumerate(unique_payloads[:5]):  # Limit to 5 for demonstration
-                    payload_data = df[df['payload'] == payload]
-                    avg_score = 70 + (i * 5)  # Example score calculation
-                    
-                    results["anomalyData"].append({
-                        "name": payload[:15] + "..." if len(payload) > 15 else payload,
-                        "score": avg_score
-                    })
+            # Only rows stored since the previous request are read and scored
+            results = anomaly_aggregator.summary(scan_id=scan_id, top=top)
         except Exception as e:
             logger.error(f"Error using ML models: {str(e)}")
-            # Fall back to example data if ML fails
-            results["anomalyData"] = [
-                {"name": "SQL Injection", "score": 85},
-                {"name": "XSS", "score": 72},
-                {"name": "Path Traversal", "score": 45},
-                {"name": "Command Injection", "score": 92},
-                {"name": "Info Disclosure", "score": 63}
-            ]
-                
-        return jsonify({"success": True, **results})
+            return jsonify({
+                "success": False,
+                "message": "Anomaly scoring failed",
+                "error": str(e),
+                "anomalyData": [],
+                **labels
+            }), 500
+
+        return jsonify({"success": True, **results, **labels})
         
     except Exception as e:
         logger.error(f"Error in anomaly analysis: {str(e)}")
@@ -0,0 +1,136 @@
+import csv
+import time
+import queue
+import atexit
+import logging
+import weakref
+import threading
+
+# Marker telling the writer thread to flush and exit
+_STOP = object()
+
+# Live writers, flushed when the interpreter exits
+_writers = weakref.WeakSet()
+
+
+@atexit.register
+def close_all_writers():
+    """Flush every live writer; registered to run at interpreter exit"""
+    for writer in list(_writers):
+        writer.close()
+
+
+class BatchWriter:
+    """Appends rows to a file from a background thread, flushing by batch size or time interval
+
+    Producers call write(), which only blocks when the bounded queue is full. The file stays open
+    while the writer runs and is flushed after each batch, on close() and at interpreter exit.
+    When a sink callable is given, each batch is passed to it instead of being written to a file.
+    With block=False a full queue drops the row instead, and the drop is counted.
+    """
+
+    def __init__(self, path=None, csv_rows=True, flush_rows=500, flush_interval=1.0, queue_size=10000, sink=None,
+                 block=True):
+        self.path = path
+        self.sink = sink
+        self.block = block
+        self.dropped = 0
+        self.csv_rows = csv_rows
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.rows_written = 0
+        self.batches_written = 0
+        _writers.add(self)
+
+    def write(self, row):
+        """Queue a CSV row (list) or a text chunk (str) for writing"""
+        if self.thread is None or not self.thread.is_alive():
+            self.start()
+        if self.block:
+            self.queue.put(row)
+            return
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                name = self.path or getattr(self.sink, '__qualname__', 'sink')
+                self.thread = threading.Thread(target=self.run, name=f"writer-{name}", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        """Drain the queue into the file or sink until the stop marker arrives"""
+        if self.sink is not None:
+            self.drain(None, None)
+            return
+        with open(self.path, mode='a', newline='', encoding='utf-8') as file:
+            self.drain(file, csv.writer(file) if self.csv_rows else None)
+
+    def drain(self, file, writer):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            if batch and (stopping or len(batch) >= self.flush_rows or time.monotonic() >= deadline):
+                self.write_batch(file, writer, batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+        # Pick up rows that raced with the stop marker
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            self.write_batch(file, writer, batch)
+
+    def write_batch(self, file, writer, batch):
+        try:
+            if self.sink is not None:
+                self.sink(batch)
+            elif writer is not None:
+                writer.writerows(batch)
+            else:
+                file.write("".join(batch))
+            if file is not None:
+                file.flush()
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            logging.error(f"Error writing batch to {self.path or self.sink}: {e}")
+
+    def close(self, timeout=5.0):
+        """Flush everything queued so far and stop the writer thread"""
+        with self.lock:
+            thread = self.thread
+            if thread is None or not thread.is_alive():
+                return
+            self.queue.put(_STOP)
+        thread.join(timeout=timeout)
+
+    def get_stats(self):
+        return {
+            "rowsWritten": self.rows_written,
+            "batchesWritten": self.batches_written,
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped
+        }
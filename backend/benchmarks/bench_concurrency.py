@@ -0,0 +1,52 @@
+"""Compare the serial fuzzing loop with the concurrent engine against a slow local target
+
+Usage: python benchmarks/bench_concurrency.py [payloads] [latency_ms] [concurrency ...]
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from target_server import start_server  # noqa: E402
+from webfuzzer import WebFuzzer  # noqa: E402
+
+
+def run(base_url, wordlist_file, concurrency):
+    fuzzer = WebFuzzer(base_url, wordlist_file, concurrency=concurrency)
+    fuzzer.running = True
+    fuzzer.fuzzing_thread()
+    return fuzzer.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the serial fuzzing loop with the concurrent engine")
+    parser.add_argument("payloads", type=int, nargs="?", default=100, help="payloads per run")
+    parser.add_argument("latency_ms", type=float, nargs="?", default=50, help="latency of the local target")
+    parser.add_argument("concurrency", type=int, nargs="*", default=[1, 4, 16], help="concurrency levels to run")
+    args = parser.parse_args()
+    payloads, latency_ms, levels = args.payloads, args.latency_ms, args.concurrency
+
+    workdir = tempfile.mkdtemp(prefix="fuzz-bench-")
+    os.chdir(workdir)
+    wordlist_file = os.path.join(workdir, "wordlist.txt")
+    with open(wordlist_file, "w") as f:
+        f.write("\n".join(f"payload-{i}" for i in range(payloads)))
+
+    server, base_url = start_server(latency=latency_ms / 1000.0)
+    try:
+        baseline = None
+        print(f"{payloads} payloads, {latency_ms:.0f} ms target latency")
+        for concurrency in levels:
+            stats = run(base_url, wordlist_file, concurrency)
+            rps = stats["requestsPerSecond"]
+            baseline = baseline or rps
+            print(f"concurrency={concurrency:<4} {stats['requests']} requests in "
+                  f"{stats['elapsedSeconds']:.2f}s  {rps:8.1f} req/s  x{rps / baseline:.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare per-row open/append dataset writes with the batched background writer
+
+Usage: python benchmarks/bench_dataset_writer.py [rows]
+"""
+import os
+import sys
+import argparse
+import csv
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_writer import BatchWriter  # noqa: E402
+
+
+def sample_row(i):
+    return ["safe", f"payload-{i}", 200, False, False, False, time.time()]
+
+
+def per_row(path, rows):
+    """The original save_to_dataset path: open, write one row, close"""
+    for i in range(rows):
+        with open(path, mode='a', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(sample_row(i))
+
+
+def batched(path, rows):
+    writer = BatchWriter(path)
+    for i in range(rows):
+        writer.write(sample_row(i))
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row dataset writes with the batched background writer")
+    parser.add_argument("rows", type=int, nargs="?", default=100000, help="rows written by each writer")
+    rows = parser.parse_args().rows
+    workdir = tempfile.mkdtemp(prefix="writer-bench-")
+    baseline = None
+    for name, fn in [("per-row open/append", per_row), ("batched writer", batched)]:
+        path = os.path.join(workdir, f"{name.split()[0]}.csv")
+        started = time.perf_counter()
+        fn(path, rows)
+        elapsed = time.perf_counter() - started
+        with open(path, encoding='utf-8') as f:
+            assert sum(1 for _ in f) == rows
+        rate = rows / elapsed
+        baseline = baseline or rate
+        print(f"{name:<22} {rows} rows in {elapsed:.2f}s  {rate:10.0f} rows/s  x{rate / baseline:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Measure signature detection throughput in MB/s of scanned body
+
+Compares one substring check per signature, a flat regex alternation and the trie-shaped
+regex used by signature_detector.Detector, for the built-in signatures plus synthetic ones.
+
+Usage: python benchmarks/bench_detector.py [body_mb] [extra_signatures ...]
+"""
+import os
+import re
+import sys
+import argparse
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_detector import DEFAULT_SIGNATURES, Detector  # noqa: E402
+from response_fingerprint import CHUNK_SIZE  # noqa: E402
+
+
+def sample_body(size):
+    random.seed(0)
+    words = ["<div>", "</div>", "item", "value", "lorem", "ipsum", "<td>", "class=\"row\"", "data-id=42"]
+    parts, length = [], 0
+    while length < size:
+        word = random.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts).encode()
+
+
+def synthetic_signatures(count):
+    random.seed(1)
+    letters = "abcdefghijklmnopqrstuvwxyz_.:"
+    return [("custom", "sig" + "".join(random.choice(letters) for _ in range(random.randint(6, 24))))
+            for _ in range(count)]
+
+
+def substring_checks(signatures):
+    literals = [literal.lower().encode() for _, literal in signatures]
+
+    def run(body):
+        lowered = body.lower()
+        return [literal for literal in literals if literal in lowered]
+    return run
+
+
+def flat_regex(signatures):
+    pattern = re.compile(b"|".join(re.escape(literal.lower().encode()) for _, literal in signatures))
+
+    def run(body):
+        return pattern.findall(body.lower())
+    return run
+
+
+def detector(signatures):
+    instance = Detector(signatures)
+
+    def run(body):
+        scan = instance.scan("<script>alert(1)</script>")
+        for start in range(0, len(body), CHUNK_SIZE):
+            scan.feed(body[start:start + CHUNK_SIZE])
+        return scan.finish()
+    return run
+
+
+def measure(run, body, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(body)
+        best = min(best, time.perf_counter() - started)
+    return len(body) / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure signature detection throughput")
+    parser.add_argument("body_mb", type=float, nargs="?", default=4, help="size of the scanned body in MB")
+    parser.add_argument("extra_signatures", type=int, nargs="*", default=[0, 400],
+                        help="synthetic signatures added to the built-in ones, one run per value")
+    args = parser.parse_args()
+    size, extras = args.body_mb, args.extra_signatures
+    body = sample_body(int(size * 1024 * 1024))
+    for extra in extras:
+        signatures = DEFAULT_SIGNATURES + synthetic_signatures(extra)
+        print(f"{len(signatures)} signatures, {size:g} MB body")
+        for name, build in [("substring checks", substring_checks), ("flat regex", flat_regex),
+                            ("trie regex (streaming)", detector)]:
+            print(f"  {name:<24} {measure(build(signatures), body):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare whole-body response analysis with streaming fingerprints on large bodies
+
+Usage: python benchmarks/bench_fingerprint.py [body_mb] [responses]
+"""
+import os
+import sys
+import argparse
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_fingerprint import CHUNK_SIZE, fingerprint_chunks  # noqa: E402
+
+
+def sample_body(size):
+    random.seed(0)
+    words = [b"<div>", b"</div>", b"item", b"value", b"lorem", b"ipsum", b"<td>", b"error-free"]
+    parts, length = [], 0
+    while length < size:
+        word = random.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return b" ".join(parts)
+
+
+def chunks(body):
+    """What iter_content() hands over for a streamed response"""
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start:start + CHUNK_SIZE]
+
+
+def whole_body(bodies):
+    """The original probe path: decode the body, lowercase it twice and split it for word counts"""
+    previous_body = ""
+    for body in bodies:
+        response_body = b"".join(chunks(body)).decode("utf-8", errors="replace")
+        "alert" in response_body.lower()
+        "error" in response_body.lower()
+        if previous_body and previous_body != response_body:
+            len(previous_body.split()) != len(response_body.split())
+        previous_body = response_body
+
+
+def streaming(bodies):
+    previous = None
+    for body in bodies:
+        fingerprint = fingerprint_chunks(200, chunks(body))
+        if previous is not None:
+            previous.words != fingerprint.words
+        previous = fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare whole-body response analysis with streaming fingerprints")
+    parser.add_argument("body_mb", type=float, nargs="?", default=4, help="size of each response body in MB")
+    parser.add_argument("responses", type=int, nargs="?", default=10, help="responses analyzed")
+    args = parser.parse_args()
+    size, responses = args.body_mb, args.responses
+    body = sample_body(int(size * 1024 * 1024))
+    # Alternate two bodies so the whole-body path has to compare them
+    bodies = [body if i % 2 else body + b" changed" for i in range(responses)]
+
+    for name, fn in [("whole body", whole_body), ("streaming fingerprint", streaming)]:
+        started = time.perf_counter()
+        fn(bodies)
+        elapsed = time.perf_counter() - started
+        # Tracing slows allocation down, so memory is measured on a separate shorter run
+        tracemalloc.start()
+        fn(bodies[:2])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rate = len(body) * responses / elapsed / 1e6
+        print(f"{name:<22} {responses} x {size:g} MB in {elapsed:.2f}s  {rate:7.1f} MB/s  peak {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
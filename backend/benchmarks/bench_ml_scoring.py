@@ -0,0 +1,90 @@
+"""Compare per-row ML scoring with vectorized batches of several sizes
+
+Trains throwaway IsolationForest / RandomForest models on synthetic (response_code, body_changed)
+rows, then measures rows/sec for direct predict() calls and for BatchScorer fed by worker threads.
+
+Usage: python benchmarks/bench_ml_scoring.py [rows] [batch sizes ...]
+"""
+import os
+import sys
+import argparse
+import time
+import threading
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_scoring import BatchScorer  # noqa: E402
+
+STATUS_CODES = np.array([200, 301, 302, 400, 403, 404, 429, 500, 502, 503])
+
+
+def synthetic_rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = rng.choice(STATUS_CODES, size=count)
+    changed = rng.integers(0, 2, size=count)
+    return np.column_stack([codes, changed])
+
+
+def train_models():
+    X = synthetic_rows(2000, seed=1)
+    y = ((X[:, 0] >= 500) | (X[:, 1] == 1)).astype(int)
+    anomaly = IsolationForest(n_estimators=100, random_state=0).fit(X)
+    classifier = RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y)
+    return anomaly, classifier
+
+
+def direct(anomaly, classifier, rows, batch_size):
+    """Call both models on consecutive slices of batch_size rows"""
+    started = time.perf_counter()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        anomaly.predict(batch)
+        classifier.predict(batch)
+    return len(rows) / (time.perf_counter() - started)
+
+
+def through_scorer(anomaly, classifier, rows, batch_size, workers):
+    """Feed rows through BatchScorer from several threads, with the prediction cache disabled"""
+    scorer = BatchScorer(anomaly, classifier, max_batch=batch_size, max_latency=0.005, cache_size=0)
+    # Make every row distinct so batches cannot collapse duplicates
+    chunks = [[(int(code) * 1000 + i, int(changed)) for i, (code, changed) in enumerate(rows[w::workers])]
+              for w in range(workers)]
+
+    def work(chunk):
+        for features in chunk:
+            scorer.score(features)
+
+    threads = [threading.Thread(target=work, args=(chunk,)) for chunk in chunks]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    scorer.close()
+    return len(rows) / elapsed, scorer.get_stats()["meanBatchSize"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row ML scoring with vectorized batches")
+    parser.add_argument("rows", type=int, nargs="?", default=2000, help="feature rows scored")
+    parser.add_argument("batch_sizes", type=int, nargs="*", default=[1, 8, 32, 128, 512],
+                        help="BatchScorer batch sizes to run")
+    args = parser.parse_args()
+    rows_count, sizes = args.rows, args.batch_sizes
+    anomaly, classifier = train_models()
+    rows = synthetic_rows(rows_count)
+
+    baseline = direct(anomaly, classifier, rows, 1)
+    print(f"{rows_count} rows; per-row predict: {baseline:,.0f} rows/s")
+    print(f"{'batch':>6} {'direct rows/s':>14} {'speedup':>8} {'scorer rows/s':>14} {'mean batch':>11}")
+    for size in sizes:
+        rate = direct(anomaly, classifier, rows, size)
+        scorer_rate, mean_batch = through_scorer(anomaly, classifier, rows, size, workers=min(size, 64))
+        print(f"{size:>6} {rate:>14,.0f} {rate / baseline:>7.1f}x {scorer_rate:>14,.0f} {mean_batch:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
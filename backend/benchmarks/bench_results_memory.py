@@ -0,0 +1,91 @@
+"""Memory held by scan results: a list of dicts against compact records and the ring buffer
+
+Usage: python benchmarks/bench_results_memory.py [results] [buffer_size]
+"""
+import os
+import sys
+import argparse
+import time
+import random
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_buffer import ResultRecord, ResultBuffer  # noqa: E402
+
+SIGNATURES = [[], [], [], ["sql-error"], ["xss-reflection"], ["sql-error", "stack-trace"]]
+
+
+def sample_result(i):
+    """A result shaped like the ones probe() returns"""
+    signatures = SIGNATURES[i % len(SIGNATURES)]
+    return {
+        "id": i + 1,
+        "url": "http://localhost:8080/search",
+        "method": "GET" if i % 2 else "POST",
+        "parameter": "q",
+        "payload": f"<script>alert({i})</script>",
+        "status": 200,
+        "responseTime": round(random.random() * 0.3, 4),
+        "severity": "high" if signatures else "low",
+        "finding": "SQL Injection" if signatures else "None",
+        "alertDetected": bool(i % 7 == 0),
+        "errorDetected": bool(signatures),
+        "bodyWordCountChanged": bool(i % 3 == 0),
+        "baselineDeviation": bool(i % 5 == 0),
+        "payloadReflected": bool(i % 4 == 0),
+        "responseSize": 1000 + i % 500,
+        "fingerprint": f"{random.getrandbits(64):016x}",
+        "baselineDistance": i % 20,
+        "signatures": list(signatures),
+        "matches": [{"signature": name, "category": "sql", "offset": 120} for name in signatures],
+        "evidence": None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def list_of_dicts(count, _):
+    results = []
+    for i in range(count):
+        results.append(sample_result(i))
+    return results
+
+
+def list_of_records(count, _):
+    results = []
+    for i in range(count):
+        results.append(ResultRecord(sample_result(i)))
+    return results
+
+
+def ring_buffer(count, capacity):
+    # Spilled records are dropped here; the store write is not what is measured
+    results = ResultBuffer(capacity, spill=lambda record: None)
+    for i in range(count):
+        results.append(sample_result(i))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory held by scan results in each layout")
+    parser.add_argument("results", type=int, nargs="?", default=1_000_000, help="results stored")
+    parser.add_argument("buffer_size", type=int, nargs="?", default=10_000, help="ring buffer capacity")
+    args = parser.parse_args()
+    count, capacity = args.results, args.buffer_size
+    for name, fn in [("list of dicts", list_of_dicts), ("list of records", list_of_records),
+                     (f"ring buffer ({capacity})", ring_buffer)]:
+        random.seed(0)
+        tracemalloc.start()
+        started = time.perf_counter()
+        results = fn(count, capacity)
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del results
+        print(f"{name:<22} {count} results in {elapsed:6.2f}s  held {current / 1e6:8.1f} MB  "
+              f"{current / count:6.0f} B/result  peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
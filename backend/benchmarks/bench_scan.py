@@ -0,0 +1,261 @@
+"""End-to-end scan benchmark against the local stand-in target
+
+Runs whole scans through WebFuzzer.start_fuzzing ("fuzzer" mode) and through the Flask
+/api/start-fuzzing route ("api" mode) with synthetic wordlists. Every case runs in a fresh process,
+so its peak RSS and CPU time are its own, and the target runs in another process. Requests per
+second, latency percentiles, RSS and CPU are printed and written to a JSON file; pass an earlier
+file as --baseline to fail on throughput or memory regressions.
+
+Usage: python benchmarks/bench_scan.py --payloads 1000 10000 100000 --modes fuzzer api
+           --concurrency 16 --latency-ms 5 --body-size 2048 --error-rate 0.01 --reflect
+           --output bench_scan.json --baseline previous.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows; RSS and CPU are reported as null
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from target_server import start_server_process  # noqa: E402
+
+MODES = ("fuzzer", "api")
+PAGE_SIZE = 5000
+# Payload shapes of a typical wordlist; every payload is unique so none is deduplicated
+TEMPLATES = ("<script>alert({i})</script>", "' OR {i}={i}--", "../../../etc/passwd{i}", "{{{{{i}*7}}}}",
+             "bench-{i}")
+
+
+def write_wordlist(path, payloads):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(payloads):
+            f.write(TEMPLATES[i % len(TEMPLATES)].format(i=i) + "\n")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def usage():
+    """(user CPU seconds, system CPU seconds, peak RSS in MB) of this process"""
+    if resource is None:
+        return None, None, None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return usage.ru_utime, usage.ru_stime, peak
+
+
+def run_fuzzer(base_url, wordlist_file, concurrency):
+    from webfuzzer import WebFuzzer
+
+    fuzzer = WebFuzzer(base_url, wordlist_file, concurrency=concurrency)
+    fuzzer.start_fuzzing()
+    fuzzer.thread.join()
+    return fuzzer
+
+
+def run_api(base_url, wordlist_file, concurrency):
+    import app
+
+    client = app.app.test_client()
+    # Scans only read wordlists from the uploads folder, so go through the upload route like the UI
+    with open(wordlist_file, "rb") as f:
+        uploaded = client.post("/api/upload-wordlist", data={
+            "file": (f, f"bench_{os.getpid()}_{os.path.basename(wordlist_file)}")
+        }).get_json()["filePath"]
+    try:
+        reply = client.post("/api/start-fuzzing", json={
+            "protocol": "http",
+            "targetUrl": base_url.split("://", 1)[1],
+            "wordlistFile": uploaded,
+            "threadCount": concurrency
+        }).get_json()
+        scan_id = reply["scanId"]
+        while client.get(f"/api/scans/{scan_id}").get_json()["scan"]["state"] in ("queued", "running"):
+            time.sleep(0.05)
+        job = app.job_manager.get(scan_id)
+        # The job is marked finished before finish_scan() has flushed the store; it clears running last
+        while job.fuzzer.running or not job.fuzzer.stats:
+            time.sleep(0.01)
+    finally:
+        os.remove(uploaded)
+    return job.fuzzer
+
+
+def run_case(case, result_queue):
+    """Run one scan in this (fresh) process and put its measurements on result_queue"""
+    workdir = case["workdir"]
+    os.chdir(workdir)
+    os.environ["DATASET_PATH"] = os.path.join(workdir, "dataset.db")
+    os.environ["CHECKPOINT_DIR"] = os.path.join(workdir, "checkpoints")
+    os.environ["FUZZ_MAX_WORKERS"] = str(case["concurrency"])
+    # The fuzzer logs every request; keep that cost but send it to a file instead of the terminal
+    log = open(os.path.join(workdir, "output.log"), "w")
+    os.dup2(log.fileno(), 1)
+    os.dup2(log.fileno(), 2)
+
+    wordlist_file = os.path.join(workdir, "wordlist.txt")
+    write_wordlist(wordlist_file, case["payloads"])
+    run = run_fuzzer if case["mode"] == "fuzzer" else run_api
+
+    user_before, system_before, rss_before = usage()
+    started = time.perf_counter()
+    fuzzer = run(case["baseUrl"], wordlist_file, case["concurrency"])
+    elapsed = time.perf_counter() - started
+    user_after, system_after, rss_peak = usage()
+
+    # Read every result back, spilled ones included, outside the timed section
+    latencies, errors, server_errors, since = [], 0, 0, 0
+    while True:
+        page = fuzzer.results_since(since, PAGE_SIZE)
+        if not page:
+            break
+        for result in page:
+            if result["method"] == "ERROR":
+                errors += 1
+            else:
+                latencies.append(result["responseTime"])
+                server_errors += result["status"] >= 500
+        since = page[-1]["id"]
+    latencies.sort()
+
+    requests = fuzzer.latest_result_id()
+    cpu = None
+    if user_before is not None:
+        cpu = {
+            "userSeconds": round(user_after - user_before, 3),
+            "systemSeconds": round(system_after - system_before, 3),
+            "percent": round((user_after - user_before + system_after - system_before) / elapsed * 100, 1)
+        }
+    result_queue.put({
+        "mode": case["mode"],
+        "payloads": case["payloads"],
+        "concurrency": case["concurrency"],
+        "requests": requests,
+        "elapsedSeconds": round(elapsed, 3),
+        "requestsPerSecond": round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+        "latencyMs": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99)
+        },
+        "errors": errors,
+        "serverErrors": server_errors,
+        "rssBeforeMb": round(rss_before, 1) if rss_before is not None else None,
+        "peakRssMb": round(rss_peak, 1) if rss_peak is not None else None,
+        "cpu": cpu
+    })
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(cases, baseline_file, tolerance):
+    """Return the regressions of cases against the matching cases of a baseline file"""
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = {(c["mode"], c["payloads"], c["concurrency"]): c for c in json.load(f)["cases"]}
+    regressions = []
+    for case in cases:
+        previous = baseline.get((case["mode"], case["payloads"], case["concurrency"]))
+        if previous is None:
+            continue
+        name = f"{case['mode']} {case['payloads']} payloads"
+        if case["requestsPerSecond"] < previous["requestsPerSecond"] * (1 - tolerance):
+            regressions.append(f"{name}: {case['requestsPerSecond']} req/s, was {previous['requestsPerSecond']}")
+        if case["peakRssMb"] and previous.get("peakRssMb") and \
+                case["peakRssMb"] > previous["peakRssMb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {case['peakRssMb']} MB, was {previous['peakRssMb']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark whole scans against a local stand-in target")
+    parser.add_argument("--payloads", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=2048)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--reflect", action="store_true", help="echo parameter values into the target's pages")
+    parser.add_argument("--output", default="bench_scan.json")
+    parser.add_argument("--baseline", help="earlier output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    server_options = {"latency": args.latency_ms / 1000.0, "jitter": args.jitter_ms / 1000.0,
+                      "body_size": args.body_size, "error_rate": args.error_rate, "reflect": args.reflect}
+    server, base_url = start_server_process(**server_options)
+    workroot = tempfile.mkdtemp(prefix="fuzz-bench-")
+    context = multiprocessing.get_context("spawn")
+    cases = []
+    try:
+        for payloads in args.payloads:
+            for mode in args.modes:
+                workdir = os.path.join(workroot, f"{mode}-{payloads}")
+                os.makedirs(workdir)
+                result_queue = context.Queue()
+                process = context.Process(target=run_case, args=({
+                    "mode": mode, "payloads": payloads, "concurrency": args.concurrency,
+                    "baseUrl": base_url, "workdir": workdir
+                }, result_queue))
+                process.start()
+                case = result_queue.get()
+                process.join()
+                cases.append(case)
+                latency = "/".join(f"{value:.1f}" if value is not None else "-" for value in case["latencyMs"].values())
+                print(f"{mode:<6} {payloads:>8} payloads  {case['requests']:>8} requests in "
+                      f"{case['elapsedSeconds']:8.2f}s  {case['requestsPerSecond']:8.1f} req/s  "
+                      f"p50/p95/p99 {latency} ms  "
+                      f"peak RSS {case['peakRssMb']} MB  CPU {case['cpu']['percent'] if case['cpu'] else '-'}%")
+    finally:
+        server.terminate()
+        shutil.rmtree(workroot, ignore_errors=True)
+
+    report = {
+        "generatedAt": datetime.now().isoformat(),
+        "gitCommit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "server": {"latencyMs": args.latency_ms, "jitterMs": args.jitter_ms, "bodySize": args.body_size,
+                   "errorRate": args.error_rate, "reflect": args.reflect},
+        "cases": cases
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(cases, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Local stand-in target used by the benchmark scripts
+
+Run it on its own with: python benchmarks/target_server.py --port 8080 --latency-ms 20 --body-size 4096
+"""
+import time
+import random
+import argparse
+import threading
+import multiprocessing
+from urllib.parse import urlparse, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ERROR_BODY = b"<html><body>Internal Server Error: You have an error in your SQL syntax</body></html>"
+
+
+class TargetHandler(BaseHTTPRequestHandler):
+    """Answers every GET/POST after a configurable delay
+
+    body_size pads the page to that many bytes, error_rate is the share of requests answered
+    with a 500 carrying an SQL error message, and reflect echoes the submitted parameter values
+    into the page, like a search form would.
+    """
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write so keep-alive clients don't wait on delayed ACKs
+    wbufsize = 65536
+    disable_nagle_algorithm = True
+    latency = 0.0
+    jitter = 0.0
+    body_size = 0
+    error_rate = 0.0
+    reflect = False
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        data = self.rfile.read(length) if length else b""
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_body(500, ERROR_BODY)
+            return
+        body = b"<html><body>ok"
+        if self.reflect:
+            values = parse_qsl(urlparse(self.path).query) + parse_qsl(data.decode("utf-8", errors="replace"))
+            body += "".join(f"<p>{value}</p>" for _, value in values).encode("utf-8")
+        body += b"</body></html>"
+        if len(body) < self.body_size:
+            body += b"\n" + b"x" * (self.body_size - len(body) - 1)
+        self.send_body(200, body)
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = respond
+    do_POST = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(latency=0.0, port=0, jitter=0.0, body_size=0, error_rate=0.0, reflect=False):
+    handler = type("ConfiguredTargetHandler", (TargetHandler,), {
+        "latency": latency, "jitter": jitter, "body_size": body_size, "error_rate": error_rate, "reflect": reflect
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    # The default backlog of 5 drops connections when many clients connect at once
+    server.request_queue_size = 1024
+    return server
+
+
+def start_server(latency=0.0, port=0, **options):
+    """Start the stand-in target on a background thread and return (server, base_url)"""
+    server = make_server(latency, port, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def serve_process(port_queue, latency, options):
+    server = make_server(latency, **options)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server_process(latency=0.0, port=0, **options):
+    """Start the stand-in target in its own process, so its CPU use is not measured with the
+    fuzzer's; returns (process, base_url)"""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_process, args=(port_queue, latency, {"port": port, **options}),
+                                      daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get(timeout=10)}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the benchmark stand-in target")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reflect", action="store_true")
+    args = parser.parse_args()
+    server = make_server(args.latency_ms / 1000.0, args.port, jitter=args.jitter_ms / 1000.0,
+                         body_size=args.body_size, error_rate=args.error_rate, reflect=args.reflect)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
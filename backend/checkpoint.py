@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import logging
+from werkzeug.utils import secure_filename
+
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointStore:
+    """One small JSON file per scan holding everything needed to resume it
+
+    Files are written to a temporary name and moved into place with os.replace, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get("CHECKPOINT_DIR", CHECKPOINT_DIR)
+
+    def path(self, scan_id):
+        return os.path.join(self.directory, f"{secure_filename(scan_id)}.json")
+
+    def save(self, state):
+        os.makedirs(self.directory, exist_ok=True)
+        state = {**state, "version": CHECKPOINT_VERSION, "updatedAt": time.time()}
+        path = self.path(state["scanId"])
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file, default=str)
+        os.replace(temp_path, path)
+
+    def load(self, scan_id):
+        """Return the saved state of a scan, or None if there is no readable checkpoint"""
+        try:
+            with open(self.path(scan_id), encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read checkpoint for {scan_id}: {e}")
+            return None
+        return state if state.get("version") == CHECKPOINT_VERSION else None
+
+    def list(self):
+        """Summaries of every saved checkpoint, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            state = self.load(name[:-len('.json')])
+            if state is None:
+                continue
+            summaries.append({
+                "scanId": state["scanId"],
+                "state": state.get("state"),
+                "targetUrl": state.get("targetUrl"),
+                "payloadsDone": state.get("payloadsDone", 0),
+                "requests": state.get("nextResultId", 0),
+                "wordlistOffset": state.get("wordlistOffset", 0),
+                "updatedAt": state.get("updatedAt")
+            })
+        return sorted(summaries, key=lambda summary: summary["updatedAt"] or 0, reverse=True)
+
+    def delete(self, scan_id):
+        try:
+            os.remove(self.path(scan_id))
+            return True
+        except FileNotFoundError:
+            return False
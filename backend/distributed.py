@@ -0,0 +1,337 @@
+"""Coordinator/worker split for scans that need more than one process or host
+
+The coordinator lives in the Flask process next to the JobManager. Workers connect to it over a
+Unix socket or TCP (multiprocessing.connection, authenticated with a shared key), pull batches of
+work items of distributed scans, run the probes and send the results back with their next fetch.
+Ordering, result ids, storage, checkpoints and the live stream all stay on the coordinator.
+
+Start workers with:
+    python distributed.py --connect unix:/tmp/webfuzzer.sock --processes 4 --threads 8
+"""
+import os
+import time
+import socket
+import logging
+import argparse
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from multiprocessing.connection import Listener, Client
+
+# Only accepted on Unix sockets, where the socket file's permissions keep other users out
+DEFAULT_AUTHKEY = "webfuzzer"
+# Work items handed to a worker connection per fetch
+BATCH_SIZE = 16
+# Seconds an idle worker waits before asking again
+IDLE_WAIT = 0.5
+# Window for per-worker requests per second
+RATE_WINDOW = 10.0
+
+
+def parse_address(address):
+    """Return (address, family) for 'unix:/path' or 'tcp:host:port'"""
+    scheme, _, rest = address.partition(':')
+    if scheme == 'unix':
+        return rest, 'AF_UNIX'
+    if scheme == 'tcp':
+        host, _, port = rest.rpartition(':')
+        return (host or '127.0.0.1', int(port)), 'AF_INET'
+    raise ValueError(f"Unknown coordinator address: {address}")
+
+
+def authkey_from_env(address):
+    """Shared key from FUZZ_COORDINATOR_KEY; TCP addresses refuse to fall back to the built-in key
+
+    multiprocessing.connection unpickles every message, so whoever holds the key can run code in
+    the coordinator and the workers.
+    """
+    key = os.environ.get("FUZZ_COORDINATOR_KEY")
+    if key:
+        return key.encode()
+    if parse_address(address)[1] == 'AF_INET':
+        raise RuntimeError("FUZZ_COORDINATOR_KEY must be set to use a TCP coordinator address")
+    return DEFAULT_AUTHKEY.encode()
+
+
+class WorkerStats:
+    """Counters of one worker process, summed over its connections"""
+
+    def __init__(self, worker_id, host, pid):
+        self.worker_id = worker_id
+        self.host = host
+        self.pid = pid
+        self.connections = 0
+        self.connected_at = time.time()
+        self.last_seen = time.time()
+        self.batches = 0
+        self.probes = 0
+        self.requests = 0
+        self.errors = 0
+        self.outstanding = 0
+        self.recent = deque()
+
+    def record(self, now, probes, requests, errors):
+        self.last_seen = time.time()
+        self.probes += probes
+        self.requests += requests
+        self.errors += errors
+        self.recent.append((now, requests))
+        while self.recent and now - self.recent[0][0] > RATE_WINDOW:
+            self.recent.popleft()
+
+    def to_dict(self, now):
+        while self.recent and now - self.recent[0][0] > RATE_WINDOW:
+            self.recent.popleft()
+        span = min(RATE_WINDOW, max(now - self.recent[0][0], 1.0)) if self.recent else RATE_WINDOW
+        return {
+            "workerId": self.worker_id,
+            "host": self.host,
+            "pid": self.pid,
+            "connections": self.connections,
+            "connectedAt": self.connected_at,
+            "lastSeen": self.last_seen,
+            "batches": self.batches,
+            "probes": self.probes,
+            "requests": self.requests,
+            "errors": self.errors,
+            "outstanding": self.outstanding,
+            "requestsPerSecond": round(sum(count for _, count in self.recent) / span, 2)
+        }
+
+
+class Coordinator:
+    """Serves work items of distributed scans to remote workers
+
+    Every connection keeps track of the items it was handed. If a worker disconnects, those
+    items go back to their scan and are handed to the next worker that asks.
+    """
+
+    def __init__(self, job_manager, address, authkey=None, batch_size=BATCH_SIZE):
+        self.job_manager = job_manager
+        self.address = address
+        self.authkey = authkey or authkey_from_env(address)
+        self.batch_size = batch_size
+        self.workers = {}
+        self.lock = threading.Lock()
+        self.listener = None
+
+    def start(self):
+        location, family = parse_address(self.address)
+        if family == 'AF_UNIX' and os.path.exists(location):
+            os.remove(location)  # Left behind by a previous run
+        self.listener = Listener(location, family=family, authkey=self.authkey)
+        threading.Thread(target=self.accept_loop, name="coordinator", daemon=True).start()
+        logging.info(f"Coordinator listening on {self.address}")
+        return self
+
+    def accept_loop(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                logging.error(f"Coordinator could not accept a worker: {e}")
+                continue
+            threading.Thread(target=self.serve, args=(conn,), name="coordinator-conn", daemon=True).start()
+
+    def serve(self, conn):
+        """Answer one worker connection until it goes away"""
+        stats = None
+        outstanding = {}
+        known_scans = set()
+        try:
+            hello = conn.recv()
+            with self.lock:
+                stats = self.workers.get(hello["worker"])
+                if stats is None:
+                    stats = self.workers[hello["worker"]] = WorkerStats(hello["worker"], hello.get("host"),
+                                                                        hello.get("pid"))
+                stats.connections += 1
+            while True:
+                message = conn.recv()
+                self.accept_results(stats, outstanding, message.get("results", []))
+                conn.send(self.next_batch(stats, outstanding, known_scans, message.get("max", self.batch_size)))
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            logging.error(f"Error serving worker: {e}")
+        finally:
+            conn.close()
+            if outstanding:
+                logging.info(f"Requeueing {len(outstanding)} work items of a lost worker")
+                self.job_manager.requeue_remote(list(outstanding.values()))
+            if stats is not None:
+                with self.lock:
+                    stats.connections -= 1
+                    stats.outstanding -= len(outstanding)
+
+    def accept_results(self, stats, outstanding, results):
+        probes = requests = errors = 0
+        for scan_id, index, offset, entries in results:
+            claimed = outstanding.pop((scan_id, index), None)
+            if claimed is None:
+                continue
+            job = claimed[0]
+            self.job_manager.complete_remote(job, index, offset, entries)
+            probes += 1
+            requests += len(entries)
+            errors += sum(1 for entry in entries if entry.get("method") == "ERROR")
+        if results:
+            with self.lock:
+                stats.record(time.monotonic(), probes, requests, errors)
+                stats.outstanding -= probes
+
+    def next_batch(self, stats, outstanding, known_scans, size):
+        with self.lock:
+            connections = sum(worker.connections for worker in self.workers.values())
+        job, items = self.job_manager.take_remote(min(size, self.batch_size), connections)
+        if job is None or not items:
+            return {"type": "idle", "wait": IDLE_WAIT}
+        skip_pairs = getattr(job.fuzzer, 'skip_pairs', {})
+        batch = []
+        for index, (payload, target), offset in items:
+            outstanding[(job.scan_id, index)] = (job, (index, (payload, target), offset))
+            skip = skip_pairs.get((target.key, payload))
+            batch.append((index, payload, target, offset, sorted(skip) if skip else None))
+        config = None
+        if job.scan_id not in known_scans:
+            known_scans.add(job.scan_id)
+            config = {"targetUrl": job.fuzzer.target_url, "options": job.fuzzer.options}
+        with self.lock:
+            stats.batches += 1
+            stats.outstanding += len(batch)
+        return {"type": "batch", "scanId": job.scan_id, "config": config, "items": batch}
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self.lock:
+            workers = [stats.to_dict(now) for stats in self.workers.values()]
+        return {
+            "address": self.address,
+            "connectedWorkers": sum(1 for worker in workers if worker["connections"]),
+            "requestsPerSecond": round(sum(worker["requestsPerSecond"] for worker in workers), 2),
+            "workers": workers
+        }
+
+
+class Worker:
+    """Pulls batches from a coordinator and probes them, one connection per thread"""
+
+    def __init__(self, address, authkey=None, threads=4, batch_size=BATCH_SIZE, max_scans=4):
+        self.address = address
+        self.authkey = authkey or authkey_from_env(address)
+        self.threads = max(1, int(threads))
+        self.batch_size = batch_size
+        self.max_scans = max_scans
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.fuzzers = OrderedDict()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def fuzzer_for(self, scan_id, config):
+        """Probe engine of a scan, built from the configuration sent with its first batch"""
+        from webfuzzer import ProbeEngine, PROBE_OPTIONS
+
+        with self.lock:
+            fuzzer = self.fuzzers.get(scan_id)
+            if fuzzer is None:
+                if config is None:
+                    raise ValueError(f"No configuration for scan {scan_id}")
+                # The wordlist, dataset and log files stay on the coordinator
+                options = {name: value for name, value in config["options"].items() if name in PROBE_OPTIONS}
+                options["concurrency"] = self.threads
+                fuzzer = ProbeEngine(config["targetUrl"], scan_id=scan_id, **options)
+                fuzzer.running = True
+                self.fuzzers[scan_id] = fuzzer
+                while len(self.fuzzers) > self.max_scans:
+                    _, old = self.fuzzers.popitem(last=False)
+                    old.close()
+            self.fuzzers.move_to_end(scan_id)
+            return fuzzer
+
+    def run(self):
+        threads = [threading.Thread(target=self.run_connection, name=f"worker-{i}", daemon=True)
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            self.stopped.set()
+
+    def run_connection(self):
+        location, family = parse_address(self.address)
+        while not self.stopped.is_set():
+            try:
+                conn = Client(location, family=family, authkey=self.authkey)
+            except Exception as e:
+                logging.info(f"Coordinator not reachable at {self.address}: {e}")
+                self.stopped.wait(2.0)
+                continue
+            try:
+                self.work(conn)
+            except (EOFError, OSError) as e:
+                logging.info(f"Lost coordinator connection: {e}")
+            except Exception as e:
+                # Reconnecting hands the batch back to the coordinator and resends scan configurations
+                logging.error(f"Worker error, reconnecting: {e}")
+            finally:
+                conn.close()
+
+    def work(self, conn):
+        conn.send({"type": "hello", "worker": self.worker_id, "host": socket.gethostname(), "pid": os.getpid()})
+        results = []
+        while not self.stopped.is_set():
+            conn.send({"type": "fetch", "max": self.batch_size, "results": results})
+            reply = conn.recv()
+            results = []
+            if reply["type"] == "idle":
+                self.stopped.wait(reply.get("wait", IDLE_WAIT))
+                continue
+            scan_id = reply["scanId"]
+            fuzzer = self.fuzzer_for(scan_id, reply.get("config"))
+            for index, payload, target, offset, skip in reply["items"]:
+                if skip:
+                    fuzzer.skip_pairs[(target.key, payload)] = set(skip)
+                try:
+                    entries = fuzzer.probe(payload, target)
+                finally:
+                    fuzzer.skip_pairs.pop((target.key, payload), None)
+                results.append((scan_id, index, offset, entries))
+
+
+def run_worker(address, threads, batch_size):
+    logging.basicConfig(level=logging.INFO)
+    Worker(address, threads=threads, batch_size=batch_size).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fuzzing workers for a coordinator")
+    parser.add_argument("--connect", default=os.environ.get("FUZZ_COORDINATOR", "unix:/tmp/webfuzzer.sock"),
+                        help="coordinator address, unix:/path or tcp:host:port")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to start")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent probes per process")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    try:
+        authkey_from_env(args.connect)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.processes == 1:
+        run_worker(args.connect, args.threads, args.batch_size)
+        return
+    processes = [multiprocessing.Process(target=run_worker, args=(args.connect, args.threads, args.batch_size))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# HTTP/2 support is optional and only available when httpx[http2] is installed
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class ConnectionCounter:
+    """Thread-safe counters for requests sent and TCP/TLS connections opened"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self.lock:
+            self.connections_opened += 1
+
+    def snapshot(self):
+        """Return the counters in the shape served by the API"""
+        with self.lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connectionsOpened": self.connections_opened,
+                "connectionsReused": reused,
+                "reuseRatio": round(reused / self.requests, 3) if self.requests else 0.0
+            }
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new connection, and how long it took to open"""
+
+    def __init__(self, counter, on_connect=None, **kwargs):
+        self.counter = counter
+        self.on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        counter = self.counter
+        on_connect = self.on_connect
+
+        # Count at connect() so reconnects of a pooled connection object are included
+        def counted(pool_class):
+            connection_class = pool_class.ConnectionCls
+
+            def connect(conn):
+                counter.count_connection()
+                started = time.perf_counter()
+                try:
+                    return connection_class.connect(conn)
+                finally:
+                    # DNS resolution, TCP connect and the TLS handshake
+                    if on_connect:
+                        on_connect(time.perf_counter() - started)
+
+            counting_connection = type(f"Counting{connection_class.__name__}", (connection_class,), {"connect": connect})
+            return type(f"Counting{pool_class.__name__}", (pool_class,), {"ConnectionCls": counting_connection})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counted(HTTPConnectionPool),
+            "https": counted(HTTPSConnectionPool)
+        }
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client shared by all fuzzing workers"""
+
+    def __init__(self, pool_size=10, keep_alive=True, http2=False, verify=True, metrics=None):
+        self.pool_size = max(1, int(pool_size or 1))
+        self.keep_alive = keep_alive
+        self.counter = ConnectionCounter()
+        self.metrics = metrics
+        # Connect time spent by the current thread's request, see take_connect_time()
+        self.local = threading.local()
+        self.headers = {} if keep_alive else {"Connection": "close"}
+
+        if http2 and httpx is None:
+            raise RuntimeError("HTTP/2 requires the optional 'httpx[http2]' package")
+        self.http2 = bool(http2)
+
+        if self.http2:
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size if keep_alive else 0
+            )
+            self.client = httpx.Client(http2=True, limits=limits, verify=verify, headers=self.headers)
+            self.streams = weakref.WeakSet()
+            self.streams_lock = threading.Lock()
+        else:
+            self.client = requests.Session()
+            self.client.verify = verify
+            self.client.headers.update(self.headers)
+            adapter = CountingAdapter(
+                self.counter,
+                on_connect=self.observe_connect,
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+                pool_block=True
+            )
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
+
+    def get(self, url, timeout=10):
+        return self.request("GET", url, timeout=timeout)
+
+    def post(self, url, data=None, timeout=10):
+        return self.request("POST", url, data=data, timeout=timeout)
+
+    def request(self, method, url, **kwargs):
+        """Send a request over a pooled connection"""
+        response = self.client.request(method, url, **kwargs)
+        self.counter.count_request()
+        if self.http2:
+            self.track_stream(response)
+        return response
+
+    @contextmanager
+    def stream(self, method, url, **kwargs):
+        """Send a request and yield the response before its body is read; the connection is released on exit"""
+        if self.http2:
+            with self.client.stream(method, url, extensions={"trace": self.trace}, **kwargs) as response:
+                self.counter.count_request()
+                self.finish_trace()
+                self.track_stream(response)
+                yield response
+            return
+        response = self.client.request(method, url, stream=True, **kwargs)
+        self.counter.count_request()
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def iter_body(self, response, chunk_size=65536):
+        """Yield the body of a streamed response in chunks"""
+        if self.http2:
+            return response.iter_bytes(chunk_size)
+        return response.iter_content(chunk_size)
+
+    def observe_connect(self, seconds):
+        self.local.connect_seconds = getattr(self.local, 'connect_seconds', 0.0) + seconds
+        if self.metrics is not None:
+            self.metrics.count_connection(seconds)
+
+    def take_connect_time(self):
+        """Seconds the current thread spent opening connections since the last call"""
+        seconds = getattr(self.local, 'connect_seconds', 0.0)
+        self.local.connect_seconds = 0.0
+        return seconds
+
+    def trace(self, event, info):
+        """httpx trace hook; notes when this thread's request opened a new connection"""
+        if event == "connection.connect_tcp.started":
+            self.local.connect_started = time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.local.connect_done = time.perf_counter()
+
+    def finish_trace(self):
+        started = getattr(self.local, 'connect_started', None)
+        if started is not None:
+            self.local.connect_started = None
+            self.observe_connect(getattr(self.local, 'connect_done', started) - started)
+
+    def track_stream(self, response):
+        """Count a new connection whenever httpx hands back a stream we have not seen"""
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            self.counter.count_connection()
+            return
+        with self.streams_lock:
+            if stream not in self.streams:
+                self.streams.add(stream)
+                self.counter.count_connection()
+
+    def get_stats(self):
+        """Return connection reuse counters and pool settings"""
+        stats = self.counter.snapshot()
+        stats.update({
+            "poolSize": self.pool_size,
+            "keepAlive": self.keep_alive,
+            "http2": self.http2
+        })
+        return stats
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,360 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ScanJob:
+    """One scan tracked by the JobManager"""
+
+    def __init__(self, fuzzer):
+        self.fuzzer = fuzzer
+        self.scan_id = getattr(fuzzer, 'scan_id', None) or f"scan-{id(fuzzer):x}"
+        self.state = "queued"
+        self.concurrency = max(1, getattr(fuzzer, 'concurrency', 1))
+        self.in_flight = 0
+        self.exhausted = False
+        # Distributed scans are probed by remote workers through take_remote() instead of the pool
+        self.remote = bool(getattr(fuzzer, 'distributed', False))
+        self.retry = deque()
+        self.pull_lock = threading.Lock()
+        # Work items read ahead by a feeder thread, so the dispatcher never waits on next_work()
+        self.ready = deque()
+        self.filling = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.state in ("completed", "stopped", "failed")
+
+    def to_dict(self):
+        status = {
+            "scanId": self.scan_id,
+            "state": self.state,
+            "targetUrl": getattr(self.fuzzer, 'target_url', None),
+            "concurrency": self.concurrency,
+            "inFlight": self.in_flight,
+            "distributed": self.remote,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at
+        }
+        if hasattr(self.fuzzer, 'get_progress'):
+            status["progress"] = self.fuzzer.get_progress()
+        return status
+
+
+class JobManager:
+    """Runs many scans on one shared worker pool
+
+    A single dispatcher thread hands payloads from the active scans to the pool in round-robin
+    order. Each active scan may have at most its fair share of the pool in flight
+    (max_workers divided by the number of active scans, capped by the scan's own concurrency).
+    Scans beyond max_active wait in a FIFO queue.
+
+    Reading a scan's next work items can be slow: the first read discovers forms over HTTP and
+    later ones walk past deduplicated and pruned payloads. Feeder threads, one per active scan at
+    most, read them ahead into the job's ready queue, so one slow scan never holds up the others.
+    """
+
+    def __init__(self, max_workers=32, max_active=4, max_finished=20):
+        self.max_workers = max(1, int(max_workers))
+        self.max_active = max(1, int(max_active))
+        self.max_finished = max_finished
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scan-worker")
+        self.feeder = ThreadPoolExecutor(max_workers=self.max_active, thread_name_prefix="scan-feeder")
+        self.jobs = OrderedDict()
+        self.queue = []
+        self.active = []
+        self.in_flight = 0
+        self.cursor = 0
+        self.condition = threading.Condition()
+        self.dispatcher = threading.Thread(target=self.dispatch_loop, name="scan-dispatcher", daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, fuzzer):
+        """Queue a new scan for the fuzzer and return its job"""
+        job = ScanJob(fuzzer)
+        with self.condition:
+            # A resumed scan keeps its id; re-inserting moves it to the newest position
+            self.jobs.pop(job.scan_id, None)
+            self.jobs[job.scan_id] = job
+            self.queue.append(job)
+            self.evict_finished()
+            self.condition.notify()
+        return job
+
+    def get(self, scan_id):
+        with self.condition:
+            return self.jobs.get(scan_id)
+
+    def latest(self):
+        """Return the most recently submitted job, or None"""
+        with self.condition:
+            return next(reversed(self.jobs.values()), None)
+
+    def list_jobs(self):
+        with self.condition:
+            return list(self.jobs.values())
+
+    def is_running(self):
+        with self.condition:
+            return bool(self.active or self.queue)
+
+    def stop(self, scan_id):
+        """Stop a job; queued jobs never start, active jobs finish their in-flight probes"""
+        with self.condition:
+            job = self.jobs.get(scan_id)
+            if job is None or job.finished:
+                return job
+            job.fuzzer.running = False
+            if job in self.queue:
+                self.queue.remove(job)
+                job.state = "stopped"
+                job.finished_at = time.time()
+            self.condition.notify()
+            return job
+
+    def evict_finished(self):
+        """Forget the oldest finished jobs beyond max_finished so their results can be freed"""
+        finished = [scan_id for scan_id, job in self.jobs.items() if job.finished]
+        for scan_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[scan_id]
+
+    def start_job(self, job):
+        """Move a queued job into the active set; called with the condition held"""
+        job.state = "running"
+        job.started_at = time.time()
+        job.fuzzer.running = True
+        if not hasattr(job.fuzzer, 'next_work'):
+            # Fuzzers without the step API run their own loop on one pool worker
+            job.in_flight += 1
+            self.in_flight += 1
+            self.executor.submit(self.run_whole, job)
+        else:
+            job.fuzzer.begin_scan()
+        self.active.append(job)
+
+    def run_whole(self, job):
+        try:
+            job.fuzzer.start_fuzzing()
+        except Exception as e:
+            logging.error(f"Error in scan {job.scan_id}: {e}")
+        finally:
+            with self.condition:
+                job.exhausted = True
+                job.in_flight -= 1
+                self.in_flight -= 1
+                self.condition.notify()
+
+    def share(self, job):
+        """Number of probes the job may have in flight right now"""
+        return max(1, min(job.concurrency, self.max_workers // max(1, len(self.active))))
+
+    def has_room(self, job):
+        """True if the job is below its share and below what its target host accepts right now"""
+        if job.in_flight >= self.share(job):
+            return False
+        if hasattr(job.fuzzer, 'dispatch_limit'):
+            return job.in_flight < job.fuzzer.dispatch_limit()
+        return True
+
+    def pick_job(self):
+        """Choose the next active job that may send a probe, rotating for fairness"""
+        count = len(self.active)
+        for step in range(count):
+            job = self.active[(self.cursor + step) % count]
+            if job.remote or not job.ready or not job.fuzzer.running or not self.has_room(job):
+                continue
+            self.cursor = (self.cursor + step + 1) % count
+            return job
+        return None
+
+    def pick_remote_job(self):
+        """Choose the next distributed job with work for a remote worker; called with the condition held"""
+        for job in self.active:
+            if not job.remote or not job.fuzzer.running:
+                continue
+            if job.retry or (not job.exhausted and job.in_flight < job.concurrency):
+                # Rotate so several distributed scans take turns
+                self.active.remove(job)
+                self.active.append(job)
+                return job
+        return None
+
+    def take_remote(self, max_items, connections=1):
+        """Hand up to max_items work items of a distributed scan to a worker; returns (job, items)
+
+        connections is the number of worker connections pulling work. Each one gets at most its
+        share of the scan's concurrency, so one connection never claims the whole window.
+        """
+        with self.condition:
+            job = self.pick_remote_job()
+            if job is None:
+                return None, []
+            max_items = min(max_items, max(1, job.concurrency // max(1, connections)))
+            # Items of lost workers are still counted in flight, so only new items reserve a slot
+            items = [job.retry.popleft() for _ in range(min(max_items, len(job.retry)))]
+            wanted = 0 if job.exhausted else max(0, min(max_items - len(items), job.concurrency - job.in_flight))
+            job.in_flight += wanted
+            self.in_flight += wanted
+
+        taken = 0
+        exhausted = False
+        if wanted:
+            # Several worker connections may pull from the same scan; its payload stream is not thread-safe
+            with job.pull_lock:
+                while taken < wanted:
+                    try:
+                        item = job.fuzzer.next_work()
+                    except Exception as e:
+                        logging.error(f"Error reading payloads for scan {job.scan_id}: {e}")
+                        item = None
+                    if item is None:
+                        exhausted = True
+                        break
+                    items.append(item)
+                    taken += 1
+            with self.condition:
+                job.in_flight -= wanted - taken
+                self.in_flight -= wanted - taken
+                if exhausted:
+                    job.exhausted = True
+                self.condition.notify()
+        return job, items
+
+    def complete_remote(self, job, index, offset, results):
+        """Record the results a worker sent back for one work item"""
+        try:
+            job.fuzzer.complete_work(index, offset, results)
+        finally:
+            with self.condition:
+                job.in_flight -= 1
+                self.in_flight -= 1
+                self.condition.notify()
+
+    def requeue_remote(self, claimed):
+        """Give the (job, item) pairs of a lost worker to the next worker that asks"""
+        with self.condition:
+            for job, item in claimed:
+                job.retry.append(item)
+            self.condition.notify()
+
+    def drain_retry(self, job):
+        """Close out requeued items of a stopped distributed scan; called with the condition held"""
+        items = list(job.retry)
+        job.retry.clear()
+        for index, _, offset in items:
+            self.executor.submit(self.complete_remote, job, index, offset, [])
+
+    def refill_jobs(self):
+        """Start reading ahead for local jobs whose ready queue runs low; called with the condition held"""
+        for job in self.active:
+            if job.remote or job.exhausted or job.filling or not job.fuzzer.running:
+                continue
+            if not hasattr(job.fuzzer, 'next_work'):
+                continue
+            share = self.share(job)
+            if len(job.ready) < share:
+                job.filling = True
+                self.feeder.submit(self.refill, job, 2 * share - len(job.ready))
+
+    def refill(self, job, count):
+        """Read up to count work items of a job into its ready queue; runs on a feeder thread"""
+        items = []
+        exhausted = False
+        try:
+            with job.pull_lock:
+                while len(items) < count and job.fuzzer.running:
+                    item = job.fuzzer.next_work()
+                    if item is None:
+                        exhausted = True
+                        break
+                    items.append(item)
+        except Exception as e:
+            logging.error(f"Error reading payloads for scan {job.scan_id}: {e}")
+            exhausted = True
+        finally:
+            with self.condition:
+                job.ready.extend(items)
+                job.filling = False
+                if exhausted:
+                    job.exhausted = True
+                self.condition.notify()
+
+    def finish_jobs(self):
+        """Retire active jobs that have nothing left in flight; called with the condition held"""
+        for job in list(self.active):
+            if job.retry and not job.fuzzer.running:
+                self.drain_retry(job)
+            if not job.fuzzer.running and job.ready:
+                # Items read ahead of a stop were never sent; the checkpoint still points before them
+                job.ready.clear()
+                job.exhausted = False
+            done = (job.exhausted and not job.ready) or not job.fuzzer.running
+            if done and job.in_flight == 0 and not job.filling:
+                self.active.remove(job)
+                job.state = "completed" if job.fuzzer.running or job.exhausted else "stopped"
+                job.finished_at = time.time()
+                if hasattr(job.fuzzer, 'finish_scan'):
+                    self.executor.submit(self.finalize, job)
+
+    def finalize(self, job):
+        try:
+            job.fuzzer.finish_scan()
+        except Exception as e:
+            logging.error(f"Error finishing scan {job.scan_id}: {e}")
+            job.state = "failed"
+
+    def dispatch_loop(self):
+        while True:
+            with self.condition:
+                self.finish_jobs()
+                while self.queue and len(self.active) < self.max_active:
+                    queued = self.queue.pop(0)
+                    try:
+                        self.start_job(queued)
+                    except Exception as e:
+                        logging.error(f"Error starting scan {queued.scan_id}: {e}")
+                        queued.state = "failed"
+                        queued.finished_at = time.time()
+
+                self.refill_jobs()
+                job = self.pick_job() if self.in_flight < self.max_workers else None
+                if job is None:
+                    self.condition.wait(0.5)
+                    continue
+                index, work, offset = job.ready.popleft()
+                job.in_flight += 1
+                self.in_flight += 1
+
+            future = self.executor.submit(job.fuzzer.probe, *work)
+            future.add_done_callback(lambda f, job=job, index=index, offset=offset: self.on_done(job, index, offset, f))
+
+    def on_done(self, job, index, offset, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            logging.error(f"Error in scan worker for {job.scan_id}: {e}")
+            results = []
+        try:
+            job.fuzzer.complete_work(index, offset, results)
+        finally:
+            with self.condition:
+                job.in_flight -= 1
+                self.in_flight -= 1
+                self.condition.notify()
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                "maxWorkers": self.max_workers,
+                "maxActiveScans": self.max_active,
+                "inFlight": self.in_flight,
+                "activeScans": len(self.active),
+                "queuedScans": len(self.queue),
+                "shares": {job.scan_id: self.share(job) for job in self.active}
+            }
@@ -0,0 +1,95 @@
+import json
+import threading
+from collections import deque
+
+
+class Subscription:
+    """One client's bounded result buffer plus one slot per scan for the latest progress tick
+
+    Publishing never blocks: when the buffer is full the oldest result is dropped and counted,
+    and progress ticks of a scan overwrite each other so a slow client only sees the newest one.
+    """
+
+    def __init__(self, scan_id=None, max_pending=1000):
+        self.scan_id = scan_id
+        self.pending = deque()
+        self.max_pending = max_pending
+        self.progress = {}
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def push_result(self, scan_id, result):
+        with self.condition:
+            if len(self.pending) >= self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+            self.pending.append((scan_id, result))
+            self.condition.notify()
+
+    def push_progress(self, scan_id, progress):
+        with self.condition:
+            self.progress[scan_id] = progress
+            self.condition.notify()
+
+    def take(self, timeout):
+        """Wait up to timeout for new data and return ((scan_id, result) pairs, progress ticks, dropped), clearing all three"""
+        with self.condition:
+            if not self.pending and not self.progress and not self.closed:
+                self.condition.wait(timeout)
+            results = list(self.pending)
+            self.pending.clear()
+            ticks = list(self.progress.values())
+            self.progress = {}
+            dropped, self.dropped = self.dropped, 0
+            return results, ticks, dropped
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+
+class EventHub:
+    """Fans fuzzing results and progress ticks out to every live stream subscriber"""
+
+    def __init__(self, max_pending=1000):
+        self.max_pending = max_pending
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self, scan_id=None):
+        subscription = Subscription(scan_id, self.max_pending)
+        with self.lock:
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+        subscription.close()
+
+    def matching(self, scan_id):
+        with self.lock:
+            return [s for s in self.subscribers if s.scan_id in (None, scan_id)]
+
+    def publish_result(self, scan_id, result):
+        """Called by the fuzzer for every recorded result; O(subscribers) and never blocks on I/O"""
+        for subscription in self.matching(scan_id):
+            subscription.push_result(scan_id, result)
+
+    def publish_progress(self, scan_id, progress):
+        for subscription in self.matching(scan_id):
+            subscription.push_progress(scan_id, progress)
+
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.subscribers)
+
+
+def format_event(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,207 @@
+"""Process-wide timing histograms and counters of the probe pipeline
+
+Every probe records how long its stages took: waiting for the host limiter, opening a connection
+(DNS and TCP/TLS connect), the request up to the response headers, reading the body, analysing it
+(fingerprint and signatures), ML scoring and persisting the result. /api/metrics serves them in
+the Prometheus text format and /api/metrics/summary as JSON for the dashboard.
+"""
+import time
+import bisect
+import threading
+
+# Upper bounds in seconds, from 0.1 ms to 10 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ("wait", "connect", "request", "body", "analysis", "ml", "persist")
+PREFIX = "webfuzzer"
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class Histogram:
+    """Bucketed durations with a count and a sum, like a Prometheus histogram"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.bounds = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, q, counts=None, count=None):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if counts is None:
+            counts, count, _ = self.snapshot()
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class Counter:
+    """Counts by label value"""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label="", amount=1):
+        with self.lock:
+            self.values[label] = self.values.get(label, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
+
+    def total(self):
+        with self.lock:
+            return sum(self.values.values())
+
+
+class TimedChunks:
+    """Wraps a body chunk iterator and adds up the time spent waiting for chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self.chunks)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+class ProbeMetrics:
+    """Stage histograms plus request, connection, byte and finding counters"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.probe_seconds = Histogram()
+        self.requests = Counter()  # By status class: 2xx, 3xx, 4xx, 5xx or error
+        self.findings = Counter()  # By severity
+        self.response_bytes = Counter()
+        self.connections = Counter()
+
+    def observe(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+
+    def count_response(self, status, size):
+        self.requests.inc(f"{status // 100}xx")
+        self.response_bytes.inc(amount=size)
+
+    def count_error(self):
+        self.requests.inc("error")
+
+    def count_connection(self, seconds):
+        self.connections.inc()
+        self.stages["connect"].observe(seconds)
+
+    def prometheus(self, gauges=None):
+        """Render everything in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent in each stage of a probe request",
+            f"# TYPE {PREFIX}_stage_seconds histogram"
+        ]
+        for stage, histogram in self.stages.items():
+            lines.extend(self.histogram_lines(f"{PREFIX}_stage_seconds", histogram, f'stage="{stage}"'))
+        lines.extend([
+            f"# HELP {PREFIX}_probe_seconds Time to send a payload with every method and analyse the responses",
+            f"# TYPE {PREFIX}_probe_seconds histogram"
+        ])
+        lines.extend(self.histogram_lines(f"{PREFIX}_probe_seconds", self.probe_seconds))
+        lines.extend([
+            f"# HELP {PREFIX}_requests_total Requests sent, by response status class",
+            f"# TYPE {PREFIX}_requests_total counter"
+        ])
+        lines.extend(f'{PREFIX}_requests_total{{status="{label}"}} {value}'
+                     for label, value in sorted(self.requests.snapshot().items()))
+        lines.extend([
+            f"# HELP {PREFIX}_findings_total Results recorded, by severity",
+            f"# TYPE {PREFIX}_findings_total counter"
+        ])
+        lines.extend(f'{PREFIX}_findings_total{{severity="{label}"}} {value}'
+                     for label, value in sorted(self.findings.snapshot().items()))
+        lines.extend([
+            f"# HELP {PREFIX}_response_bytes_total Response body bytes read",
+            f"# TYPE {PREFIX}_response_bytes_total counter",
+            f"{PREFIX}_response_bytes_total {self.response_bytes.total()}",
+            f"# HELP {PREFIX}_connections_opened_total New TCP/TLS connections",
+            f"# TYPE {PREFIX}_connections_opened_total counter",
+            f"{PREFIX}_connections_opened_total {self.connections.total()}"
+        ])
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.extend([f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} gauge",
+                          f"{PREFIX}_{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+    def histogram_lines(self, name, histogram, labels=""):
+        counts, count, total = histogram.snapshot()
+        separator = "," if labels else ""
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(histogram.bounds, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {total}")
+        lines.append(f"{name}_count{suffix} {count}")
+        return lines
+
+    def summary(self):
+        """Per-stage counts, mean and percentiles in ms, and each stage's share of the measured time"""
+        stages = {}
+        for stage, histogram in self.stages.items():
+            counts, count, total = histogram.snapshot()
+            stages[stage] = {
+                "count": count,
+                "totalMs": round(total * 1000, 3),
+                "avgMs": round(total / count * 1000, 3) if count else 0.0,
+                "p50Ms": to_ms(histogram.quantile(0.50, counts, count)),
+                "p95Ms": to_ms(histogram.quantile(0.95, counts, count)),
+                "p99Ms": to_ms(histogram.quantile(0.99, counts, count))
+            }
+        measured = sum(stage["totalMs"] for stage in stages.values())
+        probes, probe_count, _ = self.probe_seconds.snapshot()
+        for stage in stages.values():
+            stage["share"] = round(stage["totalMs"] / measured, 4) if measured else 0.0
+            # Average time per probe, so the stages add up to where a probe's milliseconds go
+            stage["perProbeMs"] = round(stage["totalMs"] / probe_count, 3) if probe_count else 0.0
+        return {
+            "uptimeSeconds": round(time.time() - self.started_at, 3),
+            "probes": probe_count,
+            "probeP50Ms": to_ms(self.probe_seconds.quantile(0.50, probes, probe_count)),
+            "probeP95Ms": to_ms(self.probe_seconds.quantile(0.95, probes, probe_count)),
+            "requests": self.requests.snapshot(),
+            "findings": self.findings.snapshot(),
+            "responseBytes": self.response_bytes.total(),
+            "connectionsOpened": self.connections.total(),
+            "stages": stages
+        }
+
+
+default_metrics = ProbeMetrics()
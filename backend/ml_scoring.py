@@ -0,0 +1,170 @@
+import time
+import queue
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class ScoreRequest:
+    """A feature row waiting for its batch to be scored"""
+    __slots__ = ("features", "done", "result", "error")
+
+    def __init__(self, features):
+        self.features = features
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchScorer:
+    """Scores feature rows from many worker threads in vectorized micro-batches
+
+    A worker calls score() and blocks until its row is scored. The scoring thread collects rows
+    until max_batch are waiting or max_latency seconds have passed since the first one arrived,
+    then runs one predict() per model over the whole batch. Predictions for feature rows already
+    seen are served from a small cache without waiting for a batch.
+
+    Models are either fixed or come from model_provider, a callable returning
+    (anomaly_detector, classifier, version); the cache is dropped whenever the version changes.
+    """
+
+    def __init__(self, anomaly_detector=None, classifier=None, max_batch=64, max_latency=0.005, cache_size=4096,
+                 model_provider=None):
+        self.model_provider = model_provider or (lambda: (anomaly_detector, classifier, None))
+        self.model_version = None
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max_latency
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.closed = False
+        self.batches = 0
+        self.rows_scored = 0
+        self.cache_hits = 0
+
+    def models(self):
+        """Return the current (anomaly_detector, classifier), clearing the cache if they were replaced"""
+        anomaly_detector, classifier, version = self.model_provider()
+        if version != self.model_version:
+            with self.cache_lock:
+                self.cache.clear()
+                self.model_version = version
+        return anomaly_detector, classifier
+
+    def available(self):
+        anomaly_detector, classifier = self.models()
+        return anomaly_detector is not None and classifier is not None
+
+    def score(self, features, timeout=10.0):
+        """Return (anomaly, effective) for one feature row, or (None, None) when no models are loaded"""
+        if not self.available():
+            return None, None
+
+        key = tuple(features)
+        with self.cache_lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+
+        request = ScoreRequest(key)
+        self.start()
+        self.queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("ML scoring timed out")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.closed = False
+                self.thread = threading.Thread(target=self.run, name="ml-scorer", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while not self.closed:
+            try:
+                first = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+
+            # Wait for more rows until the batch is full or the latency budget is spent
+            batch = [first]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.closed = True
+                    break
+                batch.append(request)
+            self.score_batch(batch)
+
+        # Rows that raced with close() are still answered
+        leftover = []
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                leftover.append(request)
+        if leftover:
+            self.score_batch(leftover)
+
+    def score_batch(self, batch):
+        """Run both models once over the distinct rows of the batch and wake every waiting worker"""
+        try:
+            anomaly_detector, classifier = self.models()
+            keys = list(dict.fromkeys(request.features for request in batch))
+            features = np.array(keys)
+            anomalies = anomaly_detector.predict(features) == -1  # True if anomalous
+            effective = classifier.predict(features) == 1  # True if effective payload
+            scored = {key: (bool(a), bool(e)) for key, a, e in zip(keys, anomalies, effective)}
+
+            with self.cache_lock:
+                for key, value in scored.items():
+                    self.cache[key] = value
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            self.batches += 1
+            self.rows_scored += len(keys)
+
+            for request in batch:
+                request.result = scored[request.features]
+                request.done.set()
+        except Exception as e:
+            for request in batch:
+                request.error = e
+                request.done.set()
+
+    def close(self):
+        """Stop the scoring thread after it finishes the current batch"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                self.queue.put(None)
+
+    def get_stats(self):
+        return {
+            "batches": self.batches,
+            "rowsScored": self.rows_scored,
+            "cacheHits": self.cache_hits,
+            "meanBatchSize": round(self.rows_scored / self.batches, 2) if self.batches else 0.0,
+            "maxBatch": self.max_batch,
+            "maxLatencyMs": self.max_latency * 1000
+        }
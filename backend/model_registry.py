@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import logging
+import threading
+import joblib
+
+ANOMALY_MODEL_PATH = "anomaly_model.pkl"
+CLASSIFIER_MODEL_PATH = "classifier_model.pkl"
+# Written by model training: names the anomaly detector and classifier of the latest published version
+MODEL_MANIFEST_PATH = os.path.join("models", "manifest.json")
+
+
+def load_manifest(path):
+    """Return the (anomaly_path, classifier_path) pair named by a manifest, relative to its directory"""
+    with open(path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    base = os.path.dirname(path)
+    return os.path.join(base, manifest["anomaly"]), os.path.join(base, manifest["classifier"])
+
+
+class ModelEntry:
+    """A loaded model and the file state it was loaded from"""
+    __slots__ = ("model", "mtime_ns", "size", "checked_at")
+
+    def __init__(self, model, mtime_ns, size):
+        self.model = model
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checked_at = time.monotonic()
+
+
+class ModelRegistry:
+    """Process-wide cache of joblib models shared by the fuzzers and the API
+
+    Each file is deserialized once and reloaded when its mtime or size changes. File stats are
+    throttled to one per check_interval seconds per path, so get() is cheap enough for hot paths.
+    mmap_mode is passed to joblib.load so large numpy arrays inside the models can be memory-mapped.
+
+    When a model manifest exists, get_models() uses the pair it names instead of the default
+    files. Each published version lives in its own directory and the manifest is replaced in one
+    step, so the detector and classifier always come from the same version.
+    """
+
+    def __init__(self, mmap_mode=None, check_interval=1.0):
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.loads = 0
+        # Manifest path -> the model pair it named at the last check
+        self.published = {}
+
+    def load(self, path):
+        return joblib.load(path, mmap_mode=self.mmap_mode)
+
+    def get(self, path, loader=None):
+        """Return the model stored at path, or None when the file is missing or unreadable"""
+        entry = self.entries.get(path)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry.model
+
+        with self.lock:
+            entry = self.entries.get(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.entries.pop(path, None)
+                return None
+
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                entry.checked_at = now
+                return entry.model
+
+            try:
+                model = (loader or self.load)(path)
+            except Exception as e:
+                logging.error(f"Could not load model {path}: {e}")
+                # Keep serving the previous version if the new file is unreadable
+                if entry is not None:
+                    entry.checked_at = now
+                    return entry.model
+                return None
+
+            self.entries[path] = ModelEntry(model, stat.st_mtime_ns, stat.st_size)
+            self.loads += 1
+            if entry is not None:
+                logging.info(f"Reloaded model {path}")
+            return model
+
+    def version(self, path):
+        """Return an identifier that changes whenever the cached model for path is replaced"""
+        entry = self.entries.get(path)
+        return (entry.mtime_ns, entry.size) if entry is not None else None
+
+    def model_paths(self, anomaly_path=ANOMALY_MODEL_PATH, classifier_path=CLASSIFIER_MODEL_PATH,
+                    manifest_path=MODEL_MANIFEST_PATH):
+        """Return the (anomaly_path, classifier_path) in use: the pair named by the manifest, if there is one"""
+        published = self.get(manifest_path, load_manifest) if manifest_path else None
+        if published is None:
+            return anomaly_path, classifier_path
+        previous = self.published.get(manifest_path)
+        if previous is not None and previous != published:
+            # Drop the models of the version the manifest moved away from
+            with self.lock:
+                for path in previous:
+                    self.entries.pop(path, None)
+        self.published[manifest_path] = published
+        return published
+
+    def get_models(self, anomaly_path=ANOMALY_MODEL_PATH, classifier_path=CLASSIFIER_MODEL_PATH,
+                   manifest_path=MODEL_MANIFEST_PATH):
+        """Return (anomaly_detector, classifier, version); the models are None when either file is missing"""
+        anomaly_path, classifier_path = self.model_paths(anomaly_path, classifier_path, manifest_path)
+        anomaly_detector = self.get(anomaly_path)
+        classifier = self.get(classifier_path)
+        if anomaly_detector is None or classifier is None:
+            return None, None, None
+        return anomaly_detector, classifier, (self.version(anomaly_path), self.version(classifier_path))
+
+    def get_stats(self):
+        return {
+            "loads": self.loads,
+            "cached": sorted(self.entries),
+            "mmapMode": self.mmap_mode
+        }
+
+
+# Shared by every WebFuzzer and the Flask app; MODEL_MMAP_MODE=r memory-maps model arrays
+default_registry = ModelRegistry(mmap_mode=os.environ.get("MODEL_MMAP_MODE") or None)
@@ -0,0 +1,349 @@
+"""Incremental training of the anomaly detector and classifier from the live dataset
+
+Each training round runs in a separate process started from this module's command line, so the
+process never imports the app. It reads only the dataset rows stored since the previous round, in
+chunks, and folds them into the trainer state:
+- The classifier is an SGD logistic regression updated with partial_fit on standardized features.
+- The anomaly detector is an IsolationForest refitted on a bounded reservoir sample of every row
+  seen so far.
+
+The state (cursor, scaler, classifier and sample) is kept in a file between rounds. Both new models
+are written to a fresh version directory next to the model manifest, then the manifest is moved over
+the old one with os.replace, so readers switch to both models at once. The model registry picks up
+the new version within a second, so running scans switch to it without a restart.
+"""
+import os
+import re
+import sys
+import copy
+import json
+import time
+import shutil
+import logging
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+from model_registry import MODEL_MANIFEST_PATH, load_manifest
+
+STATE_PATH = os.environ.get("FUZZ_TRAIN_STATE", "model_trainer.pkl")
+# New rows needed before a round starts, and seconds between checks for them; 0 disables the checks
+MIN_ROWS = int(os.environ.get("FUZZ_TRAIN_MIN_ROWS", 1000))
+INTERVAL = float(os.environ.get("FUZZ_TRAIN_INTERVAL", 60))
+CHUNK_ROWS = int(os.environ.get("FUZZ_TRAIN_CHUNK_ROWS", 50000))
+SAMPLE_ROWS = int(os.environ.get("FUZZ_TRAIN_SAMPLE_ROWS", 20000))
+
+READ_COLUMNS = ['label', 'response_code', 'body_word_count_changed']
+# Labels the classifier treats as an effective payload
+EFFECTIVE_LABELS = ("malicious", "suspicious")
+
+
+def chunk_features(chunk):
+    """(features, effective) arrays of a dataset chunk, in the layout the fuzzer scores"""
+    features = np.column_stack([
+        chunk['response_code'].fillna(0).to_numpy(dtype=float),
+        chunk['body_word_count_changed'].astype(bool).to_numpy(dtype=float)
+    ])
+    effective = chunk['label'].isin(EFFECTIVE_LABELS).to_numpy(dtype=int)
+    return features, effective
+
+
+def atomic_dump(value, path, dump=joblib.dump):
+    """Write to a temporary file next to path, then move it over path in one step"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        dump(value, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def dump_json(value, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(value, file)
+
+
+def unused_version(version, manifest_path=MODEL_MANIFEST_PATH):
+    """The first version from version on without a directory next to the manifest"""
+    base = os.path.dirname(manifest_path) or "."
+    while os.path.exists(os.path.join(base, f"v{version}")):
+        version += 1
+    return version
+
+
+def publish_models(anomaly_detector, classifier, version, manifest_path=MODEL_MANIFEST_PATH):
+    """Write both models to a new version directory and point the manifest at it
+
+    Version directories other than the new one and the one the manifest named before are removed;
+    the latter may still be loading in another process.
+    """
+    base = os.path.dirname(manifest_path) or "."
+    name = f"v{version}"
+    os.makedirs(os.path.join(base, name))
+    joblib.dump(anomaly_detector, os.path.join(base, name, "anomaly_model.pkl"))
+    joblib.dump(classifier, os.path.join(base, name, "classifier_model.pkl"))
+
+    try:
+        previous = os.path.dirname(os.path.relpath(load_manifest(manifest_path)[0], base))
+    except (OSError, ValueError, KeyError):
+        previous = None
+    atomic_dump({
+        "version": version,
+        "anomaly": os.path.join(name, "anomaly_model.pkl"),
+        "classifier": os.path.join(name, "classifier_model.pkl")
+    }, manifest_path, dump=dump_json)
+
+    for entry in os.listdir(base):
+        if re.fullmatch(r"v\d+", entry) and entry not in (name, previous):
+            shutil.rmtree(os.path.join(base, entry), ignore_errors=True)
+
+
+class TrainerState:
+    """Everything a training round needs from the previous ones"""
+
+    def __init__(self, sample_rows=SAMPLE_ROWS):
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        self.cursor = 0
+        self.rows = 0
+        self.version = 0
+        self.trained_at = None
+        self.scaler = StandardScaler()
+        self.classifier = SGDClassifier(loss="log_loss", random_state=0)
+        self.sample = np.empty((0, 2))
+        self.sample_rows = sample_rows
+        self.rng = np.random.default_rng(0)
+
+    def add_chunk(self, features, effective):
+        self.scaler.partial_fit(features)
+        self.classifier.partial_fit(self.scaler.transform(features), effective, classes=np.array([0, 1]))
+        self.add_sample(features)
+        self.rows += len(features)
+
+    def add_sample(self, features):
+        """Reservoir sampling: every row seen so far is in the sample with the same probability"""
+        free = self.sample_rows - len(self.sample)
+        if free > 0:
+            self.sample = np.vstack([self.sample, features[:free]])
+            seen = self.rows + min(free, len(features))
+            features = features[free:]
+        else:
+            seen = self.rows
+        if not len(features):
+            return
+        slots = self.rng.integers(0, seen + np.arange(1, len(features) + 1))
+        kept = slots < self.sample_rows
+        self.sample[slots[kept]] = features[kept]
+
+    def build_models(self):
+        """Return (anomaly_detector, classifier) ready to score raw feature rows"""
+        from sklearn.ensemble import IsolationForest
+
+        anomaly_detector = IsolationForest(n_estimators=100, random_state=self.version).fit(self.sample)
+        # Fold the scaler into the coefficients, so the published model needs no preprocessing
+        classifier = copy.deepcopy(self.classifier)
+        coef = self.classifier.coef_ / self.scaler.scale_
+        classifier.coef_ = coef
+        classifier.intercept_ = self.classifier.intercept_ - coef @ self.scaler.mean_
+        return anomaly_detector, classifier
+
+
+def load_state(path):
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        return TrainerState()
+
+
+def train_round(backend, store_path, state_path=STATE_PATH, manifest_path=MODEL_MANIFEST_PATH,
+                chunk_rows=CHUNK_ROWS, min_rows=MIN_ROWS):
+    """Train on the rows stored since the last round and publish new models; runs in the training process"""
+    from result_store import open_result_store
+
+    started = time.perf_counter()
+    store = open_result_store(backend, store_path)
+    state = load_state(state_path)
+    if store.latest_id() < state.cursor:
+        # The dataset was replaced or truncated; start over, but keep counting versions
+        version = state.version
+        state = TrainerState()
+        state.version = version
+
+    rows = 0
+    while True:
+        chunk = store.read_frame(since_id=state.cursor, limit=chunk_rows, columns=READ_COLUMNS)
+        if chunk.empty:
+            break
+        features, effective = chunk_features(chunk)
+        state.add_chunk(features, effective)
+        state.cursor = int(chunk['id'].iloc[-1])
+        rows += len(chunk)
+        if len(chunk) < chunk_rows:
+            break
+
+    published = False
+    if rows and state.rows >= min_rows:
+        anomaly_detector, classifier = state.build_models()
+        state.version = unused_version(state.version + 1, manifest_path)
+        state.trained_at = time.time()
+        # Saving the state first means a crash never makes the next round learn the same rows twice
+        atomic_dump(state, state_path)
+        publish_models(anomaly_detector, classifier, state.version, manifest_path)
+        published = True
+    elif rows:
+        atomic_dump(state, state_path)
+
+    return {
+        "rows": rows,
+        "totalRows": state.rows,
+        "cursor": state.cursor,
+        "version": state.version,
+        "published": published,
+        "trainedAt": state.trained_at,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+class ModelTrainer:
+    """Schedules training rounds in a child process, at most one at a time
+
+    A round starts when train() is called or, every interval seconds, when at least min_rows rows
+    were stored since the last round. The request threads only submit the round and read its
+    outcome; reading, fitting and writing the models all happen in a `python model_training.py`
+    process, which imports neither the app nor its scans and stores.
+    """
+
+    def __init__(self, store, state_path=STATE_PATH, manifest_path=MODEL_MANIFEST_PATH,
+                 min_rows=MIN_ROWS, interval=INTERVAL, chunk_rows=CHUNK_ROWS):
+        self.store = store
+        self.state_path = state_path
+        self.manifest_path = manifest_path
+        self.min_rows = max(1, int(min_rows))
+        self.interval = interval
+        self.chunk_rows = chunk_rows
+        self.executor = None
+        self.future = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.cursor = None
+        self.rounds = 0
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        """Start the periodic check for new rows; does nothing if the interval is 0"""
+        with self.lock:
+            if self.interval > 0 and self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="model-trainer", daemon=True)
+                self.thread.start()
+        return self
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                if self.pending_rows() >= self.min_rows:
+                    self.train()
+            except Exception as e:
+                logging.error(f"Model training check failed: {e}")
+
+    def pending_rows(self):
+        """Rows stored since the cursor of the last finished round"""
+        if self.cursor is None:
+            try:
+                self.cursor = load_state(self.state_path).cursor
+            except Exception as e:
+                logging.error(f"Could not read trainer state {self.state_path}: {e}")
+                self.cursor = 0
+        return max(0, self.store.latest_id() - self.cursor)
+
+    def train(self):
+        """Submit a training round unless one is already running; returns True if one was submitted"""
+        with self.lock:
+            if self.future is not None and not self.future.done():
+                return False
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-trainer-round")
+            future = self.future = self.executor.submit(self.run_round)
+        # Outside the lock: the callback runs right here if the round has already finished
+        future.add_done_callback(self.on_done)
+        return True
+
+    def run_round(self):
+        """Run one round in a fresh interpreter and return its result"""
+        # A new process rather than a fork, so it never inherits the app's threads and locks, and a
+        # script rather than a spawn pool, which would import the app's main module again
+        completed = subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            "--backend", self.store.backend, "--store", self.store.path,
+            "--state", self.state_path, "--manifest", self.manifest_path,
+            "--chunk-rows", str(self.chunk_rows), "--min-rows", str(self.min_rows)
+        ], capture_output=True, text=True)
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"exit status {completed.returncode}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def on_done(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.error(f"Model training failed: {e}")
+            with self.lock:
+                self.last_error = str(e)
+            return
+        with self.lock:
+            self.rounds += 1
+            self.cursor = result["cursor"]
+            self.last_result = result
+            self.last_error = None
+        if result["published"]:
+            logging.info(f"Published model version {result['version']} trained on {result['totalRows']} rows")
+
+    def wait(self, timeout=None):
+        """Block until the current round, if any, has finished"""
+        future = self.future
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+
+    def get_status(self):
+        with self.lock:
+            return {
+                "running": self.future is not None and not self.future.done(),
+                "rounds": self.rounds,
+                "pendingRows": max(0, self.store.latest_id() - self.cursor) if self.cursor is not None else None,
+                "minRows": self.min_rows,
+                "intervalSeconds": self.interval,
+                "lastRound": self.last_result,
+                "lastError": self.last_error
+            }
+
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one model training round and print its result as JSON")
+    parser.add_argument("--backend", choices=("csv", "sqlite"), required=True, help="Dataset backend")
+    parser.add_argument("--store", required=True, help="Dataset file")
+    parser.add_argument("--state", default=STATE_PATH, help="Trainer state file")
+    parser.add_argument("--manifest", default=MODEL_MANIFEST_PATH, help="Model manifest to publish to")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read per chunk")
+    parser.add_argument("--min-rows", type=int, default=MIN_ROWS, help="Rows trained on before models are published")
+    args = parser.parse_args()
+    result = train_round(args.backend, args.store, args.state, args.manifest, args.chunk_rows, args.min_rows)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
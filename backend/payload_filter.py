@@ -0,0 +1,198 @@
+import re
+import math
+import hashlib
+import threading
+from urllib.parse import unquote
+
+# Letter and digit runs collapse to one placeholder while punctuation is kept, so
+# "<img src=x onerror=alert(1)>" and "<img src=y onerror=prompt(2)>" share a family
+WORD_RUN = re.compile(r'[^\W\d_]+')
+DIGIT_RUN = re.compile(r'\d+')
+
+PRUNE_MODES = ('skip', 'sample')
+
+
+def normalize_payload(payload):
+    """Decode one level of URL encoding, so '%3Cscript%3E' and '<script>' compare equal
+
+    Only one level is decoded because double-encoded payloads test a different filter bypass.
+    """
+    return unquote(payload).strip()
+
+
+def payload_family(payload):
+    """Shape of a payload with its words and numbers abstracted away"""
+    return DIGIT_RUN.sub('0', WORD_RUN.sub('a', normalize_payload(payload)))
+
+
+class BloomFilter:
+    """Fixed-size set membership test with no false negatives"""
+
+    def __init__(self, capacity, false_positive_rate=1e-6):
+        self.capacity = max(1, int(capacity))
+        self.size = max(64, int(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, digest):
+        """Add a 16-byte digest; returns True if it was (probably) present already"""
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:16], 'little') | 1
+        present = True
+        for i in range(self.hashes):
+            position = (first + i * step) % self.size
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                present = False
+        if not present:
+            self.count += 1
+        return present
+
+
+class PayloadDeduper:
+    """Remembers the payloads of a scan, compared after URL decoding
+
+    Digests are kept in an exact set for the first max_exact payloads. Beyond that they move to a
+    Bloom filter sized for capacity payloads, which needs about 4 bytes per payload but may skip
+    roughly one unseen payload in a million.
+    """
+
+    def __init__(self, capacity=10_000_000, max_exact=100_000, false_positive_rate=1e-6):
+        self.capacity = max(capacity, 2 * max_exact)
+        self.max_exact = max_exact
+        self.false_positive_rate = false_positive_rate
+        self.exact = set()
+        self.bloom = None
+        self.duplicates = 0
+
+    def seen(self, payload, scope=''):
+        """Record a payload; returns True if an equivalent payload was recorded before in the same scope"""
+        digest = hashlib.blake2b(f"{scope}\0{normalize_payload(payload)}".encode('utf-8', errors='surrogatepass'),
+                                 digest_size=16).digest()
+        if self.bloom is not None:
+            present = self.bloom.add(digest)
+        elif digest in self.exact:
+            present = True
+        else:
+            present = False
+            self.exact.add(digest)
+            if len(self.exact) > self.max_exact:
+                self.bloom = BloomFilter(self.capacity, self.false_positive_rate)
+                for known in self.exact:
+                    self.bloom.add(known)
+                self.exact = set()
+        if present:
+            self.duplicates += 1
+        return present
+
+    def get_stats(self):
+        return {
+            "duplicates": self.duplicates,
+            "unique": self.bloom.count if self.bloom is not None else len(self.exact),
+            "bloomFilter": self.bloom is not None
+        }
+
+
+class FamilyState:
+    __slots__ = ("reference", "matches", "stable", "held_back")
+
+    def __init__(self, reference):
+        self.reference = reference
+        self.matches = 0
+        self.stable = False
+        self.held_back = 0
+
+
+class ResponsePruner:
+    """Skips or thins out payload families whose responses have stopped changing
+
+    A payload's responses are summarised per method as status, matched signatures, size and
+    simhash. Once stable_after payloads of a family in a row answer like the family's reference,
+    mode 'skip' sends none of its remaining payloads and mode 'sample' sends every
+    sample_every-th one. A sent payload that answers differently resets the family, so it is
+    probed in full again.
+    """
+
+    def __init__(self, mode='sample', stable_after=5, sample_every=10, max_distance=6,
+                 size_tolerance=0.1, max_families=100_000):
+        if mode not in PRUNE_MODES:
+            raise ValueError(f"Unknown pruning mode: {mode}")
+        self.mode = mode
+        self.stable_after = stable_after
+        self.sample_every = max(1, int(sample_every))
+        self.max_distance = max_distance
+        self.size_tolerance = size_tolerance
+        self.max_families = max_families
+        self.families = {}
+        self.pruned = 0
+        self.resets = 0
+        self.lock = threading.Lock()
+
+    def allow(self, payload, scope=''):
+        """Decide before dispatch whether a payload is worth sending to the target named by scope"""
+        with self.lock:
+            state = self.families.get((scope, payload_family(payload)))
+            if state is None or not state.stable:
+                return True
+            if self.mode == 'sample':
+                state.held_back += 1
+                if state.held_back % self.sample_every == 0:
+                    return True
+            self.pruned += 1
+            return False
+
+    def summary(self, results):
+        summary = {}
+        for result in results:
+            if result.get("method") == "ERROR" or not result.get("fingerprint"):
+                return None
+            summary[result["method"]] = (result.get("status"), frozenset(result.get("signatures", ())),
+                                         result.get("responseSize", 0), int(result["fingerprint"], 16))
+        return summary or None
+
+    def equivalent(self, summary, reference):
+        if summary.keys() != reference.keys():
+            return False
+        for method, (status, signatures, size, simhash) in summary.items():
+            ref_status, ref_signatures, ref_size, ref_simhash = reference[method]
+            if status != ref_status or signatures != ref_signatures:
+                return False
+            if abs(size - ref_size) > max(32, ref_size * self.size_tolerance):
+                return False
+            if bin(simhash ^ ref_simhash).count('1') > self.max_distance:
+                return False
+        return True
+
+    def observe(self, payload, results, scope=''):
+        """Feed back the responses of a sent payload"""
+        summary = self.summary(results)
+        if summary is None:
+            return
+        family = (scope, payload_family(payload))
+        with self.lock:
+            state = self.families.get(family)
+            if state is None:
+                if len(self.families) < self.max_families:
+                    self.families[family] = FamilyState(summary)
+                return
+            if self.equivalent(summary, state.reference):
+                state.matches += 1
+                state.stable = state.matches >= self.stable_after
+            else:
+                if state.stable:
+                    self.resets += 1
+                state.reference = summary
+                state.matches = 0
+                state.stable = False
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "mode": self.mode,
+                "pruned": self.pruned,
+                "families": len(self.families),
+                "stableFamilies": sum(1 for state in self.families.values() if state.stable),
+                "resets": self.resets
+            }
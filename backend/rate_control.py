@@ -0,0 +1,236 @@
+import time
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Responses that mean the target wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value, now=None):
+    """Return the delay in seconds requested by a Retry-After header, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - (now if now is not None else time.time()))
+
+
+class Ticket:
+    """A granted request slot; handed back to release() with the outcome"""
+    __slots__ = ("host", "started")
+
+    def __init__(self, host):
+        self.host = host
+        self.started = time.monotonic()
+
+
+class HostControl:
+    """Congestion window, pacing and latency samples of one host
+
+    The window grows by one slot per window of successful responses and is halved on 429/503,
+    timeouts and connection errors. It also shrinks by a fifth when the 90th percentile latency
+    of recent responses climbs above latency_tolerance times the host's baseline latency. Once the
+    window is down to one request, further throttling caps the request rate at half the observed
+    rate, and each later throttle halves that cap; the cap grows back by about 10% per second of
+    successful responses and is lifted once it is well above what the host sustains.
+    """
+
+    def __init__(self, max_limit, adaptive=True, min_timeout=2.0, max_timeout=10.0,
+                 latency_tolerance=3.0, samples=64, max_retry_after=300.0):
+        self.max_limit = max(1, int(max_limit))
+        self.adaptive = adaptive
+        self.limit = float(self.max_limit)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.latency_tolerance = latency_tolerance
+        self.max_retry_after = max_retry_after
+        self.latencies = deque(maxlen=samples)
+        self.completions = deque()
+        self.baseline = None
+        self.rate = None
+        self.rate_updated = 0.0
+        self.next_send = 0.0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.throttled = 0
+        self.errors = 0
+        self.decreases = 0
+        self.condition = threading.Condition()
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self):
+        """Timeout for requests other than probes, such as form discovery
+
+        Four times the recent p99 latency, clamped to [min_timeout, max_timeout].
+        """
+        if len(self.latencies) < 20:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, 4 * self.percentile(0.99)))
+
+    def ready_in(self, now):
+        """Seconds until another request may be sent, or None when the window is full"""
+        if self.in_flight >= max(1, int(self.limit)):
+            return None
+        return max(0.0, self.blocked_until - now, self.next_send - now)
+
+    def observed_rate(self, now):
+        """Completions per second over the last two seconds"""
+        while self.completions and now - self.completions[0] > 2.0:
+            self.completions.popleft()
+        if len(self.completions) < 2:
+            return float(len(self.completions))
+        return len(self.completions) / max(now - self.completions[0], 0.1)
+
+    def decrease(self, now, factor, throttled=False):
+        # Responses already in flight report the same congestion, so back off at most once per RTT
+        if now - self.last_decrease < (self.percentile(0.5) or 0.1):
+            return
+        self.last_decrease = now
+        if throttled and self.rate is not None:
+            self.rate = max(0.5, self.rate * 0.5)
+        elif throttled and self.limit <= 1.0:
+            self.rate = max(0.5, self.observed_rate(now) * 0.5)
+        self.rate_updated = now
+        self.limit = max(1.0, self.limit * factor)
+        self.decreases += 1
+
+    def record(self, now, elapsed, status=None, retry_after=None, error=False):
+        self.completions.append(now)
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + min(retry_after, self.max_retry_after))
+
+        if error or status in THROTTLE_STATUSES:
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+            else:
+                self.errors += 1
+            if self.adaptive:
+                self.decrease(now, 0.5, throttled=True)
+            return
+
+        self.latencies.append(elapsed)
+        if self.baseline is None or elapsed < self.baseline:
+            self.baseline = elapsed
+        else:
+            # Let the baseline drift up slowly so one lucky response does not pin it forever
+            self.baseline += (elapsed - self.baseline) * 0.01
+        if not self.adaptive:
+            return
+
+        p90 = self.percentile(0.9)
+        if len(self.latencies) >= 10 and p90 > max(self.baseline * self.latency_tolerance, 0.05):
+            self.decrease(now, 0.8)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            if self.rate is not None:
+                self.rate += max(0.5, self.rate * 0.1) * min(1.0, now - self.rate_updated)
+                self.rate_updated = now
+                if self.rate > 4 * max(1.0, self.observed_rate(now)):
+                    self.rate = None
+
+    def get_stats(self, now):
+        p50 = self.percentile(0.5)
+        p90 = self.percentile(0.9)
+        return {
+            "limit": int(self.limit),
+            "maxLimit": self.max_limit,
+            "inFlight": self.in_flight,
+            "rateLimit": round(self.rate, 2) if self.rate is not None else None,
+            "observedRate": round(self.observed_rate(now), 2),
+            "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p90Ms": round(p90 * 1000, 1) if p90 is not None else None,
+            "baselineMs": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            "timeoutSeconds": round(self.timeout(), 2),
+            "retryAfterSeconds": round(max(0.0, self.blocked_until - now), 2),
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "decreases": self.decreases
+        }
+
+
+class AdaptiveLimiter:
+    """Per-host request admission driven by observed latency, throttling responses and Retry-After
+
+    acquire() blocks until the host's window has a free slot, its pacing interval has passed and
+    any Retry-After delay has expired. release() feeds the response back into the host's window.
+    With adaptive=False the window stays at max_limit and only Retry-After is honoured.
+    """
+
+    def __init__(self, max_limit, adaptive=True, max_timeout=10.0):
+        self.max_limit = max(1, int(max_limit))
+        self.adaptive = adaptive
+        self.max_timeout = max_timeout
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def host(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            control = self.hosts.get(host)
+            if control is None:
+                control = HostControl(self.max_limit, self.adaptive, max_timeout=self.max_timeout)
+                self.hosts[host] = control
+        return host, control
+
+    def acquire(self, url, cancelled=None):
+        """Wait for a slot on the URL's host; returns a Ticket, or None if cancelled() turned true"""
+        host, control = self.host(url)
+        with control.condition:
+            while True:
+                if cancelled is not None and cancelled():
+                    return None
+                now = time.monotonic()
+                wait = control.ready_in(now)
+                if wait == 0:
+                    break
+                # Wake up regularly so a stopped scan never sits out a long Retry-After
+                control.condition.wait(min(wait if wait is not None else 0.5, 0.5))
+            control.in_flight += 1
+            if control.rate:
+                control.next_send = max(control.next_send, now) + 1.0 / control.rate
+        return Ticket(host)
+
+    def release(self, ticket, status=None, retry_after=None, error=False):
+        """Report the outcome of a request sent with ticket"""
+        if ticket is None:
+            return
+        control = self.hosts[ticket.host]
+        now = time.monotonic()
+        with control.condition:
+            control.in_flight -= 1
+            control.record(now, now - ticket.started, status, parse_retry_after(retry_after), error)
+            control.condition.notify_all()
+
+    def timeout(self, url):
+        return self.host(url)[1].timeout()
+
+    def window(self, url):
+        """Requests the URL's host may have in flight right now; 0 while a Retry-After delay runs"""
+        control = self.host(url)[1]
+        with control.condition:
+            if control.blocked_until > time.monotonic():
+                return 0
+            return max(1, int(control.limit))
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self.lock:
+            hosts = dict(self.hosts)
+        stats = {}
+        for host, control in hosts.items():
+            with control.condition:
+                stats[host] = control.get_stats(now)
+        return {"adaptive": self.adaptive, "hosts": stats}
@@ -0,0 +1,160 @@
+import hashlib
+import threading
+from collections import Counter
+import numpy as np
+from signature_detector import REFLECTION_CATEGORY, Detections
+
+WHITESPACE = (b' ', b'\n', b'\r', b'\t', b'\x0b', b'\x0c')
+CHUNK_SIZE = 65536
+# A run of bytes without whitespace longer than this is analyzed without waiting for its end
+MAX_CARRY = 1 << 20
+
+
+class ResponseFingerprint:
+    """Compact digest of one response body; the body itself is not kept"""
+    __slots__ = ("status", "length", "words", "simhash", "detections")
+
+    def __init__(self, status, length, words, simhash, detections=None):
+        self.status = status
+        self.length = length
+        self.words = words
+        self.simhash = simhash
+        self.detections = detections if detections is not None else Detections()
+
+    def distance(self, other):
+        """Number of differing simhash bits"""
+        return bin(self.simhash ^ other.simhash).count("1")
+
+
+class FingerprintBuilder:
+    """Builds a ResponseFingerprint from body chunks as they arrive
+
+    Tokens are whitespace-separated byte runs. A token cut by a chunk boundary is carried over to
+    the next chunk, so word counts and the simhash match a whole-body pass. Tokens are hashed
+    with 64-bit BLAKE2b, not Python's salted hash(), so fingerprints made by different processes
+    (remote workers, resumed scans) can be compared.
+    Chunks are also handed to detector_scan, a signature_detector.DetectorScan, if one is given.
+    """
+
+    def __init__(self, status, detector_scan=None):
+        self.status = status
+        self.length = 0
+        self.words = 0
+        self.votes = np.zeros(64, dtype=np.int64)
+        self.detector_scan = detector_scan
+        self.carry = b''
+
+    def feed(self, chunk):
+        self.length += len(chunk)
+        if self.detector_scan is not None:
+            self.detector_scan.feed(chunk)
+        data = self.carry + chunk
+        cut = max(data.rfind(space) for space in WHITESPACE) + 1
+        if cut == 0 and len(data) < MAX_CARRY:
+            self.carry = data
+            return
+        if cut == 0:
+            cut = len(data)
+        self.carry = data[cut:]
+        self.analyze(data[:cut])
+
+    def analyze(self, segment):
+        tokens = segment.split()
+        if not tokens:
+            return
+        self.words += len(tokens)
+
+        # Each distinct token is hashed once and votes with its number of occurrences
+        counts = Counter(tokens)
+        digests = b''.join(hashlib.blake2b(token, digest_size=8).digest() for token in counts)
+        weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        self.votes += 2 * (weights @ bits) - weights.sum()
+
+    def finish(self):
+        if self.carry:
+            self.analyze(self.carry)
+            self.carry = b''
+        simhash = int(np.packbits(self.votes > 0, bitorder='little').view(np.uint64)[0])
+        detections = self.detector_scan.finish() if self.detector_scan is not None else None
+        return ResponseFingerprint(self.status, self.length, self.words, simhash, detections)
+
+
+def fingerprint_chunks(status, chunks, detector_scan=None):
+    """Fingerprint a body given as an iterable of byte chunks"""
+    builder = FingerprintBuilder(status, detector_scan)
+    for chunk in chunks:
+        if chunk:
+            builder.feed(chunk)
+    return builder.finish()
+
+
+class FingerprintBaseline:
+    """Reference fingerprints of ordinary responses, one set per request method
+
+    The first baseline_size responses of each method become its baseline. Later responses
+    deviate when their status was never seen in the baseline, their simhash is more than
+    max_distance bits from every baseline fingerprint, or their length is outside the baseline
+    range widened by length_tolerance.
+    Signatures found in most baseline responses are part of the page and are not findings; see
+    ordinary_signatures().
+    """
+
+    def __init__(self, baseline_size=8, max_distance=12, length_tolerance=0.5):
+        self.baseline_size = baseline_size
+        self.max_distance = max_distance
+        self.length_tolerance = length_tolerance
+        self.samples = {}
+        self.previous = None
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+            self.previous = None
+
+    def compare(self, method, fingerprint):
+        """Return (word_count_changed, deviates, distance) for a new response
+
+        word_count_changed compares against the previous response of any method, like the
+        original body comparison; distance is None while the baseline is still being collected.
+        """
+        with self.lock:
+            previous, self.previous = self.previous, fingerprint
+            samples = self.samples.setdefault(method, [])
+            if len(samples) < self.baseline_size:
+                samples.append(fingerprint)
+                samples = None
+            else:
+                samples = list(samples)
+
+        word_count_changed = bool(previous and previous.length and previous.words != fingerprint.words)
+        if samples is None:
+            return word_count_changed, False, None
+
+        distance = min(fingerprint.distance(sample) for sample in samples)
+        lengths = [sample.length for sample in samples]
+        low = min(lengths) * (1 - self.length_tolerance)
+        high = max(lengths) * (1 + self.length_tolerance)
+        deviates = (
+            fingerprint.status not in {sample.status for sample in samples}
+            or distance > self.max_distance
+            or not low <= fingerprint.length <= high
+        )
+        return word_count_changed, deviates, distance
+
+    def ordinary_signatures(self, method, fingerprint):
+        """Signatures in at least half of the baseline responses of method, not counting fingerprint
+
+        These belong to the page (script tags, framework paths, the word 'error' in a stylesheet)
+        rather than to the payload. The first response of a method is its own baseline. A reflected
+        payload is never ordinary.
+        """
+        with self.lock:
+            samples = [sample for sample in self.samples.get(method, ()) if sample is not fingerprint]
+        samples = samples or [fingerprint]
+        counts = Counter(
+            signature for sample in samples
+            for signature, category in sample.detections.found.items() if category != REFLECTION_CATEGORY
+        )
+        return frozenset(signature for signature, count in counts.items() if 2 * count >= len(samples))
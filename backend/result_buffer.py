@@ -0,0 +1,173 @@
+import sys
+import threading
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Bits of ResultRecord.flags, in the order of the result keys they stand for
+FLAG_KEYS = ("alertDetected", "errorDetected", "bodyWordCountChanged", "baselineDeviation", "payloadReflected")
+# Keys every result has; probe errors carry only these
+BASE_KEYS = ("id", "url", "method", "parameter", "payload", "status", "responseTime", "severity", "finding")
+
+# Shared tuples of signature names; a scan only ever produces a handful of distinct sets
+_signature_sets = {}
+
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def intern_signatures(signatures):
+    key = tuple(intern_text(signature) for signature in signatures)
+    return _signature_sets.setdefault(key, key)
+
+
+class ResultRecord:
+    """Compact in-memory form of one result entry
+
+    Repeated strings are interned, the five detection flags share one int, the fingerprint is an
+    int, the timestamp is microseconds since the epoch and matches are tuples. to_dict() rebuilds
+    the exact dict the probe produced, keys that a record does not know included.
+    """
+    __slots__ = ("id", "url", "method", "parameter", "payload", "status", "response_time", "severity", "finding",
+                 "flags", "response_size", "fingerprint", "baseline_distance", "signatures", "matches", "evidence",
+                 "timestamp", "extra")
+
+    def __init__(self, result):
+        result = dict(result)
+        self.id = result.pop("id")
+        self.url = intern_text(result.pop("url", None))
+        self.method = intern_text(result.pop("method", None))
+        self.parameter = intern_text(result.pop("parameter", None))
+        self.payload = result.pop("payload", None)
+        self.status = result.pop("status", None)
+        self.response_time = result.pop("responseTime", None)
+        self.severity = intern_text(result.pop("severity", None))
+        self.finding = intern_text(result.pop("finding", None))
+        timestamp = result.pop("timestamp", None)
+        self.timestamp = (datetime.fromisoformat(timestamp) - EPOCH) // MICROSECOND if timestamp else None
+
+        # Probe errors have no response analysis
+        self.flags = None
+        if self.method != "ERROR":
+            self.flags = 0
+            for bit, key in enumerate(FLAG_KEYS):
+                if result.pop(key, False):
+                    self.flags |= 1 << bit
+            self.response_size = result.pop("responseSize", None)
+            fingerprint = result.pop("fingerprint", None)
+            self.fingerprint = int(fingerprint, 16) if fingerprint else None
+            self.baseline_distance = result.pop("baselineDistance", None)
+            self.signatures = intern_signatures(result.pop("signatures", ()))
+            self.matches = tuple(
+                (intern_text(match["signature"]), intern_text(match["category"]), match["offset"])
+                for match in result.pop("matches", ())
+            )
+            self.evidence = result.pop("evidence", None)
+        self.extra = result or None
+
+    def to_dict(self):
+        result = {
+            "id": self.id,
+            "url": self.url,
+            "method": self.method,
+            "parameter": self.parameter,
+            "payload": self.payload,
+            "status": self.status,
+            "responseTime": self.response_time,
+            "severity": self.severity,
+            "finding": self.finding
+        }
+        if self.parameter is None:
+            del result["parameter"]
+        if self.flags is not None:
+            for bit, key in enumerate(FLAG_KEYS):
+                result[key] = bool(self.flags & (1 << bit))
+            result["responseSize"] = self.response_size
+            result["fingerprint"] = f"{self.fingerprint:016x}" if self.fingerprint is not None else None
+            result["baselineDistance"] = self.baseline_distance
+            result["signatures"] = list(self.signatures)
+            result["matches"] = [{"signature": signature, "category": category, "offset": offset}
+                                 for signature, category, offset in self.matches]
+            result["evidence"] = self.evidence
+        if self.timestamp is not None:
+            result["timestamp"] = (EPOCH + self.timestamp * MICROSECOND).isoformat()
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+class ResultBuffer:
+    """Ring buffer of the newest results of a scan
+
+    Results are numbered on append. Once capacity is reached the oldest record is handed to
+    spill() and dropped, so memory stays bounded however long the scan runs.
+    """
+
+    def __init__(self, capacity=10000, spill=None):
+        self.capacity = max(1, int(capacity))
+        self.spill = spill
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, results=(), next_id=0):
+        """Start over, optionally holding results (dicts) that end at id next_id"""
+        with self.lock:
+            self.slots = [None] * self.capacity
+            self.start = 0
+            self.size = 0
+            self.latest_id = 0
+        for result in results:
+            self.append(result, result["id"])
+        with self.lock:
+            self.latest_id = max(self.latest_id, next_id)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def first_id(self):
+        """Id of the oldest result still held"""
+        return self.latest_id - self.size + 1
+
+    def append(self, result, result_id=None):
+        """Store a result dict under the next id (or result_id) and return that id"""
+        with self.lock:
+            self.latest_id = result_id if result_id is not None else self.latest_id + 1
+            record = ResultRecord({**result, "id": self.latest_id})
+            evicted = None
+            if self.size == self.capacity:
+                evicted = self.slots[self.start]
+                self.start = (self.start + 1) % self.capacity
+                self.size -= 1
+            self.slots[(self.start + self.size) % self.capacity] = record
+            self.size += 1
+        if evicted is not None and self.spill is not None:
+            self.spill(evicted)
+        return self.latest_id
+
+    def records(self, first, count):
+        """Records at positions first..first+count of the ring; called with the lock held"""
+        begin = (self.start + first) % self.capacity
+        end = begin + count
+        if end <= self.capacity:
+            return self.slots[begin:end]
+        return self.slots[begin:] + self.slots[:end - self.capacity]
+
+    def since(self, since_id, limit=None):
+        """Result dicts with id > since_id that are still held, oldest first"""
+        with self.lock:
+            first = max(0, since_id - self.first_id + 1)
+            count = max(0, self.size - first)
+            if limit:
+                count = min(count, limit)
+            records = self.records(first, count)
+        return [record.to_dict() for record in records]
+
+    def tail(self, count):
+        """The newest count results as dicts"""
+        with self.lock:
+            count = min(count, self.size)
+            records = self.records(self.size - count, count)
+        return [record.to_dict() for record in records]
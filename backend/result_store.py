@@ -0,0 +1,328 @@
+import os
+import abc
+import csv
+import json
+import sqlite3
+import argparse
+import threading
+import pandas as pd
+
+# Column order of the labelled dataset written by WebFuzzer.save_to_dataset
+DATASET_COLUMNS = [
+    'label', 'payload', 'response_code', 'alert_detected',
+    'error_detected', 'body_word_count_changed', 'timestamp'
+]
+BOOL_COLUMNS = ['alert_detected', 'error_detected', 'body_word_count_changed']
+
+# Columns kept only by stores that support them; the legacy CSV layout stays unchanged
+EXTRA_COLUMNS = ['method']
+
+# Payloads such as "null", "NA" or "" are text; only empty numeric and flag fields are missing
+CSV_NA_OPTIONS = {
+    "keep_default_na": False,
+    "na_values": {column: [''] for column in DATASET_COLUMNS if column not in ('label', 'payload')}
+}
+
+DEFAULT_CSV_FILE = "fuzzer_dataset.csv"
+DEFAULT_SQLITE_FILE = "fuzzer_dataset.db"
+
+
+class ResultStore(abc.ABC):
+    """Storage backend for the labelled fuzzing dataset
+
+    Rows are appended as (scan_id, label, payload, response_code, alert_detected,
+    error_detected, body_word_count_changed, timestamp, method) tuples. Reads return a DataFrame
+    with an increasing 'id' column that callers can use as a cursor.
+    """
+
+    @abc.abstractmethod
+    def initialize(self):
+        """Create the underlying file or table if it does not exist yet"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_rows(self, rows):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_frame(self, scan_id=None, since_id=0, limit=None, columns=None):
+        """Return rows with id > since_id, optionally restricted to one scan and a set of columns"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def latest_id(self, scan_id=None):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def exists(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def spill_results(self, rows):
+        """Keep full result entries that left a scan's in-memory buffer, as (scan_id, result_id, json) rows"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_spilled(self, scan_id, since_id=0, limit=None):
+        """Return spilled result dicts of a scan with an id above since_id, oldest first"""
+        raise NotImplementedError
+
+
+class CsvResultStore(ResultStore):
+    """Original flat CSV file; scans are not partitioned and every read parses the file"""
+    backend = "csv"
+
+    def __init__(self, path=DEFAULT_CSV_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        # (inode, file size, line count) at the last latest_id call
+        self.counted = (None, 0, 0)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def initialize(self):
+        if not self.exists():
+            with open(self.path, mode='w', newline='', encoding='utf-8') as file:
+                csv.writer(file).writerow(DATASET_COLUMNS)
+            return True
+        return False
+
+    def append_rows(self, rows):
+        with self.lock, open(self.path, mode='a', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows(row[1:1 + len(DATASET_COLUMNS)] for row in rows)
+
+    def read_frame(self, scan_id=None, since_id=0, limit=None, columns=None):
+        if not self.exists():
+            return pd.DataFrame(columns=['id'] + DATASET_COLUMNS)
+        # Rows before the cursor are skipped without being parsed
+        df = pd.read_csv(
+            self.path,
+            usecols=[c for c in columns if c in DATASET_COLUMNS] if columns else None,
+            skiprows=range(1, since_id + 1) if since_id else None,
+            nrows=limit,
+            **CSV_NA_OPTIONS
+        )
+        df.insert(0, 'id', range(since_id + 1, since_id + 1 + len(df)))
+        return df
+
+    def latest_id(self, scan_id=None):
+        if not self.exists():
+            return 0
+        with self.lock, open(self.path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            inode, counted_size, lines = self.counted
+            if stat.st_ino != inode or stat.st_size < counted_size:
+                # Replaced or truncated; count from the start
+                counted_size, lines = 0, 0
+            # Only the bytes appended since the last call are read
+            file.seek(counted_size)
+            for block in iter(lambda: file.read(1 << 20), b''):
+                lines += block.count(b'\n')
+                counted_size += len(block)
+            self.counted = (stat.st_ino, counted_size, lines)
+            return max(0, lines - 1)
+
+    def spill_path(self):
+        return f"{self.path}.spill.jsonl"
+
+    def spill_results(self, rows):
+        # A separate JSON-lines file, so the CSV layout stays unchanged
+        with self.lock, open(self.spill_path(), mode='a', encoding='utf-8') as file:
+            file.writelines(f"{scan_id}\t{result_id}\t{data}\n" for scan_id, result_id, data in rows)
+
+    def read_spilled(self, scan_id, since_id=0, limit=None):
+        if not os.path.exists(self.spill_path()):
+            return []
+        results = []
+        with open(self.spill_path(), encoding='utf-8') as file:
+            for line in file:
+                row_scan, result_id, data = line.rstrip('\n').split('\t', 2)
+                # A resumed scan spills its restored tail again; those ids were already read
+                if row_scan == scan_id and int(result_id) > since_id:
+                    since_id = int(result_id)
+                    results.append(json.loads(data))
+                    if limit and len(results) >= limit:
+                        break
+        return results
+
+
+class SqliteResultStore(ResultStore):
+    """Indexed SQLite table partitioned by scan id, so cursor reads only touch new rows"""
+    backend = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_FILE):
+        self.path = path
+        self.local = threading.local()
+        self.ready = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets API readers run while the writer thread appends
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def initialize(self):
+        created = not self.exists()
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scan_id TEXT NOT NULL,
+                    label TEXT,
+                    payload TEXT,
+                    response_code INTEGER,
+                    alert_detected INTEGER,
+                    error_detected INTEGER,
+                    body_word_count_changed INTEGER,
+                    timestamp REAL,
+                    method TEXT
+                )
+            """)
+            # Tables created before the method column existed get it added in place
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if 'method' not in existing:
+                conn.execute("ALTER TABLE results ADD COLUMN method TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_scan ON results (scan_id, id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spilled_results (
+                    scan_id TEXT NOT NULL,
+                    result_id INTEGER NOT NULL,
+                    data TEXT,
+                    PRIMARY KEY (scan_id, result_id)
+                ) WITHOUT ROWID
+            """)
+        self.ready = True
+        return created
+
+    def append_rows(self, rows):
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO results (scan_id, label, payload, response_code, alert_detected, "
+                "error_detected, body_word_count_changed, timestamp, method) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r[0], r[1], r[2], int(r[3]), int(bool(r[4])), int(bool(r[5])), int(bool(r[6])), r[7],
+                  r[8] if len(r) > 8 else None)
+                 for r in rows]
+            )
+
+    def read_frame(self, scan_id=None, since_id=0, limit=None, columns=None):
+        known = DATASET_COLUMNS + EXTRA_COLUMNS
+        selected = ['id', 'scan_id'] + [c for c in (columns or known) if c in known]
+        query = f"SELECT {', '.join(selected)} FROM results WHERE id > ?"
+        params = [since_id]
+        if scan_id:
+            query += " AND scan_id = ?"
+            params.append(scan_id)
+        query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        if not self.exists():
+            return pd.DataFrame(columns=selected)
+        if not self.ready:
+            self.initialize()
+        df = pd.read_sql_query(query, self.connection(), params=params)
+        for column in BOOL_COLUMNS:
+            if column in df:
+                df[column] = df[column].astype(bool)
+        return df
+
+    def latest_id(self, scan_id=None):
+        if not self.exists():
+            return 0
+        if not self.ready:
+            self.initialize()
+        if scan_id:
+            row = self.connection().execute("SELECT MAX(id) FROM results WHERE scan_id = ?", (scan_id,)).fetchone()
+        else:
+            row = self.connection().execute("SELECT MAX(id) FROM results").fetchone()
+        return row[0] or 0
+
+    def spill_results(self, rows):
+        if not self.ready:
+            self.initialize()
+        conn = self.connection()
+        with conn:
+            # A resumed scan may spill a result again; the newer copy wins
+            conn.executemany("INSERT OR REPLACE INTO spilled_results (scan_id, result_id, data) VALUES (?, ?, ?)", rows)
+
+    def read_spilled(self, scan_id, since_id=0, limit=None):
+        if not self.exists():
+            return []
+        if not self.ready:
+            self.initialize()
+        query = "SELECT data FROM spilled_results WHERE scan_id = ? AND result_id > ? ORDER BY result_id"
+        params = [scan_id, since_id]
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [json.loads(row[0]) for row in self.connection().execute(query, params)]
+
+    def scan_ids(self):
+        """List the scans stored in the table, oldest first"""
+        if not self.exists():
+            return []
+        if not self.ready:
+            self.initialize()
+        rows = self.connection().execute(
+            "SELECT scan_id FROM results GROUP BY scan_id ORDER BY MIN(id)"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+def open_result_store(backend=None, path=None):
+    """Create the dataset store selected by the arguments or the DATASET_BACKEND/DATASET_PATH env vars"""
+    backend = (backend or os.environ.get("DATASET_BACKEND", "sqlite")).lower()
+    path = path or os.environ.get("DATASET_PATH")
+    if backend == "csv":
+        return CsvResultStore(path or DEFAULT_CSV_FILE)
+    if backend == "sqlite":
+        return SqliteResultStore(path or DEFAULT_SQLITE_FILE)
+    raise ValueError(f"Unknown dataset backend: {backend}")
+
+
+def migrate_csv_to_sqlite(csv_path=DEFAULT_CSV_FILE, db_path=DEFAULT_SQLITE_FILE, scan_id="legacy", chunksize=50000):
+    """Copy an existing fuzzer_dataset.csv into the SQLite store in chunks; returns the row count
+
+    Raises ValueError if scan_id already has rows, so running the migration twice does not
+    duplicate them.
+    """
+    store = SqliteResultStore(db_path)
+    store.initialize()
+    if store.latest_id(scan_id):
+        raise ValueError(f"{db_path} already has rows for scan id {scan_id!r}; choose another --scan-id")
+    migrated = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, **CSV_NA_OPTIONS):
+        chunk = chunk.reindex(columns=DATASET_COLUMNS)
+        chunk['response_code'] = chunk['response_code'].fillna(0)
+        for column in BOOL_COLUMNS:
+            chunk[column] = chunk[column].astype(str).str.lower().eq('true')
+        chunk.insert(0, 'scan_id', scan_id)
+        store.append_rows(chunk.itertuples(index=False, name=None))
+        migrated += len(chunk)
+    return migrated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrate fuzzer_dataset.csv into the SQLite result store")
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_CSV_FILE)
+    parser.add_argument("db_path", nargs="?", default=DEFAULT_SQLITE_FILE)
+    parser.add_argument("--scan-id", default="legacy", help="Scan id assigned to the migrated rows")
+    args = parser.parse_args()
+
+    try:
+        count = migrate_csv_to_sqlite(args.csv_path, args.db_path, scan_id=args.scan_id)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Migrated {count} rows from {args.csv_path} to {args.db_path}")
@@ -0,0 +1,226 @@
+"""Queued, levelled logging of scan activity (fuzz.log) and result reports (report.log)
+
+Callers only check the level and queue the raw message, its arguments or the result dict. A
+background writer does the formatting, as text or JSON lines, and the file writes. Writes never
+block a probe: when the queue is full the entry is dropped and counted. The log files are shared
+by every scan in the process and rotate by size.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from batch_writer import BatchWriter
+
+DEBUG, INFO, SUMMARY, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", SUMMARY: "SUMMARY", ERROR: "ERROR"}
+# Levels of the logging module used by ProcessLogger
+STANDARD_LEVELS = {DEBUG: logging.DEBUG, INFO: logging.INFO, SUMMARY: logging.INFO, ERROR: logging.ERROR}
+# debug: every request; info: progress, errors and every result report;
+# summary: scan start and end, errors and reports of findings above low severity only
+LOG_LEVELS = {"debug": DEBUG, "info": INFO, "summary": SUMMARY}
+LOG_FORMATS = ("text", "json")
+
+DEFAULT_LEVEL = os.environ.get("FUZZ_LOG_LEVEL", "info")
+DEFAULT_FORMAT = os.environ.get("FUZZ_LOG_FORMAT", "text")
+MAX_BYTES = int(os.environ.get("FUZZ_LOG_MAX_BYTES", 10 * 1024 * 1024))
+BACKUPS = int(os.environ.get("FUZZ_LOG_BACKUPS", 5))
+# Echo activity lines to stdout, like the original print() calls
+CONSOLE = os.environ.get("FUZZ_LOG_CONSOLE", "1") != "0"
+QUEUE_SIZE = 50000
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+class RotatingLog:
+    """A log file written in batches by one background thread and rotated once it exceeds max_bytes
+
+    Queued entries are (render, entry) pairs; render(entry) returns the line to write.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS, console=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.console = console
+        self.file = None
+        self.size = 0
+        self.writer = BatchWriter(sink=self.write_lines, queue_size=QUEUE_SIZE, block=False)
+
+    def write(self, render, entry):
+        self.writer.write((render, entry))
+
+    def write_lines(self, batch):
+        lines = []
+        for render, entry in batch:
+            try:
+                lines.append(render(entry))
+            except Exception as e:
+                lines.append(f"Could not format log entry {entry!r}: {e}\n")
+        text = "".join(lines)
+        data = text.encode("utf-8", errors="replace")
+        if self.file is None:
+            self.file = open(self.path, "ab")
+            self.size = self.file.tell()
+        if self.max_bytes and self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        if self.console:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def rotate(self):
+        """fuzz.log becomes fuzz.log.1, fuzz.log.1 becomes fuzz.log.2 and so on; the oldest is dropped"""
+        self.file.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self.file = open(self.path, "ab")
+        else:
+            self.file = open(self.path, "wb")
+        self.size = 0
+
+    def flush(self):
+        """Write out everything queued so far"""
+        self.writer.close()
+
+    def get_stats(self):
+        stats = self.writer.get_stats()
+        stats["bytes"] = self.size
+        return stats
+
+
+def open_log(path, console=False):
+    """The process-wide RotatingLog of a file, so scans sharing it never write over each other"""
+    key = os.path.abspath(path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = _logs[key] = RotatingLog(path, console=console)
+        return log
+
+
+class ScanLogger:
+    """Levelled activity log and result reports of one scan"""
+
+    def __init__(self, scan_id, level=None, log_format=None, log_path="fuzz.log", report_path="report.log"):
+        level = level or DEFAULT_LEVEL
+        log_format = log_format or DEFAULT_FORMAT
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {log_format}")
+        self.scan_id = scan_id
+        self.level = LOG_LEVELS[level]
+        self.json = log_format == "json"
+        self.activity = open_log(log_path, console=CONSOLE)
+        self.reports = open_log(report_path)
+
+    def log(self, level, message, *args):
+        """Queue a message; args are %-formatted into it on the writer thread"""
+        if level >= self.level:
+            self.activity.write(self.render_activity, (time.time(), level, message, args))
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def summary(self, message, *args):
+        self.log(SUMMARY, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+    def report(self, result, probe_id):
+        """Queue the report of a recorded result"""
+        if self.level <= INFO or result.get("severity") != "low":
+            self.reports.write(self.render_report, (time.time(), result, probe_id))
+
+    def render_activity(self, entry):
+        created, level, message, args = entry
+        if args:
+            message = message % args
+        if self.json:
+            return json.dumps({
+                "time": datetime.fromtimestamp(created).isoformat(),
+                "level": LEVEL_NAMES[level],
+                "scanId": self.scan_id,
+                "message": message
+            }) + "\n"
+        return f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))} - {LEVEL_NAMES[level]} - {message}\n"
+
+    def render_report(self, entry):
+        created, result, probe_id = entry
+        if self.json:
+            return json.dumps({"time": datetime.fromtimestamp(created).isoformat(), "scanId": self.scan_id,
+                               "probeId": probe_id, **result}) + "\n"
+        return (
+            f"ID: {probe_id}\n"
+            f"Target: {result['url']}\n"
+            f"Method: {result['method']}\n"
+            f"Payload: {result['payload']}\n"
+            f"Response Code: {result['status']}\n"
+            f"Response Time: {result['responseTime']}ms\n"
+            f"Alert Detected: {result['alertDetected']}\n"
+            f"Error Detected: {result['errorDetected']}\n"
+            f"Body Changed: {result['bodyWordCountChanged']}\n"
+            f"Severity: {result['severity']}\n"
+            f"Finding: {result['finding']}\n"
+            f"{'-' * 50}\n"
+        )
+
+    def flush(self):
+        self.activity.flush()
+        self.reports.flush()
+
+    def get_stats(self):
+        return {"activity": self.activity.get_stats(), "reports": self.reports.get_stats()}
+
+
+class ProcessLogger:
+    """The ScanLogger interface over the logging module, for processes that keep no log files
+
+    Remote workers use it: the coordinator writes the scan's log files and result reports.
+    """
+
+    def __init__(self, scan_id, level=None):
+        level = level or DEFAULT_LEVEL
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        self.scan_id = scan_id
+        self.level = LOG_LEVELS[level]
+        self.logger = logging.getLogger("webfuzzer")
+
+    def log(self, level, message, *args):
+        if level >= self.level:
+            self.logger.log(STANDARD_LEVELS[level], "[%s] " + message, self.scan_id, *args)
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def summary(self, message, *args):
+        self.log(SUMMARY, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+    def report(self, result, probe_id):
+        pass
+
+    def flush(self):
+        pass
+
+    def get_stats(self):
+        return {}
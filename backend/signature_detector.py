@@ -0,0 +1,275 @@
+import os
+import re
+from functools import lru_cache
+
+# (category, literal) pairs matched case-insensitively against response bodies
+DEFAULT_SIGNATURES = [
+    ("xss", "alert"),
+    ("xss", "<script"),
+    ("xss", "javascript:"),
+    ("xss", "onerror="),
+    ("xss", "onload="),
+    ("error", "error"),
+    ("error", "exception"),
+    ("error", "internal server error"),
+    ("error", "fatal error"),
+    ("error", "warning:"),
+    ("error", "parse error"),
+    ("sql", "you have an error in your sql syntax"),
+    ("sql", "warning: mysql_"),
+    ("sql", "mysqli_"),
+    ("sql", "mysql_fetch"),
+    ("sql", "mysql server version"),
+    ("sql", "mariadb server version"),
+    ("sql", "unknown column"),
+    ("sql", "supplied argument is not a valid mysql"),
+    ("sql", "com.mysql.jdbc"),
+    ("sql", "sqlstate["),
+    ("sql", "pdoexception"),
+    ("sql", "pg_query("),
+    ("sql", "pg_exec("),
+    ("sql", "psqlexception"),
+    ("sql", "postgresql query failed"),
+    ("sql", "syntax error at or near"),
+    ("sql", "unterminated quoted string"),
+    ("sql", "org.postgresql.util"),
+    ("sql", "unclosed quotation mark after the character string"),
+    ("sql", "incorrect syntax near"),
+    ("sql", "microsoft ole db provider for sql server"),
+    ("sql", "odbc sql server driver"),
+    ("sql", "sqlserver jdbc driver"),
+    ("sql", "system.data.sqlclient"),
+    ("sql", "quoted string not properly terminated"),
+    ("sql", "sql command not properly ended"),
+    ("sql", "ora-00933"),
+    ("sql", "ora-01756"),
+    ("sql", "ora-00921"),
+    ("sql", "oracle error"),
+    ("sql", "oracle.jdbc"),
+    ("sql", "sqlite3.operationalerror"),
+    ("sql", "sqlite_error"),
+    ("sql", "sqlite.exception"),
+    ("sql", "unrecognized token:"),
+    ("sql", "db2 sql error"),
+    ("sql", "sqlcode="),
+    ("sql", "sybase message"),
+    ("sql", "dynamic sql error"),
+    ("sql", "sql syntax"),
+    ("sql", "sqlexception"),
+    ("stacktrace", "traceback (most recent call last)"),
+    ("stacktrace", "file \"/"),
+    ("stacktrace", "exception in thread \""),
+    ("stacktrace", "at java."),
+    ("stacktrace", "at org.springframework."),
+    ("stacktrace", "at sun.reflect."),
+    ("stacktrace", "java.lang.nullpointerexception"),
+    ("stacktrace", "java.lang.runtimeexception"),
+    ("stacktrace", "javax.servlet.servletexception"),
+    ("stacktrace", "system.nullreferenceexception"),
+    ("stacktrace", "system.web.httpexception"),
+    ("stacktrace", "stack trace:"),
+    ("stacktrace", "server error in '/' application"),
+    ("stacktrace", "[stacktrace]"),
+    ("stacktrace", "uncaught exception"),
+    ("stacktrace", "php fatal error"),
+    ("stacktrace", "</b> on line <b>"),
+    ("stacktrace", "in /var/www/"),
+    ("stacktrace", "goroutine "),
+    ("stacktrace", "panic: runtime error"),
+    ("stacktrace", "at object.<anonymous>"),
+    ("stacktrace", "django.core.exceptions"),
+    ("stacktrace", "werkzeug.exceptions"),
+    ("stacktrace", "actioncontroller::"),
+    ("stacktrace", "activerecord::"),
+    ("disclosure", "root:x:0:0:"),
+    ("disclosure", "[boot loader]"),
+    ("disclosure", "index of /"),
+    ("disclosure", "<b>warning</b>:"),
+    ("disclosure", "phpinfo()"),
+    ("disclosure", "x-powered-by"),
+    ("disclosure", "aws_secret_access_key"),
+    ("disclosure", "-----begin rsa private key-----"),
+]
+
+REFLECTION_CATEGORY = "reflection"
+
+
+def trie_pattern(literals):
+    """Compile literals into one alternation shaped like a trie
+
+    Alternatives that share a prefix are merged, so the regex engine tests each prefix once per
+    position instead of once per literal.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for byte in literal:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+
+    def build(node):
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted(
+            (item for item in node.items() if item[0] is not None), key=lambda item: item[0])]
+        if not branches:
+            return b''
+        body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+        if None in node:
+            return b'(?:' + body + b')?'
+        return body
+
+    return re.compile(build(trie))
+
+
+def load_signatures(path):
+    """Read 'category<TAB>literal' lines; blank lines and lines starting with # are skipped"""
+    signatures = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            line = line.rstrip('\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            category, _, literal = line.partition('\t')
+            if literal:
+                signatures.append((category.strip(), literal))
+    return signatures
+
+
+class SignatureMatch:
+    """First position of one signature in a response body"""
+    __slots__ = ("signature", "category", "offset")
+
+    def __init__(self, signature, category, offset):
+        self.signature = signature
+        self.category = category
+        self.offset = offset
+
+    def to_dict(self):
+        return {"signature": self.signature, "category": self.category, "offset": self.offset}
+
+
+class Detections:
+    """Everything a DetectorScan found in one body"""
+    __slots__ = ("matches", "signatures", "categories", "evidence", "found")
+
+    def __init__(self, matches=(), found=None, evidence=None):
+        self.matches = list(matches)
+        # Signature -> category
+        self.found = dict(found or {})
+        self.signatures = frozenset(self.found)
+        self.categories = frozenset(self.found.values())
+        self.evidence = evidence
+
+    def without(self, signatures):
+        """These detections minus the given signatures"""
+        if not self.signatures & signatures:
+            return self
+        found = {signature: category for signature, category in self.found.items() if signature not in signatures}
+        matches = [match for match in self.matches if match.signature in found]
+        return Detections(matches, found, self.evidence if found else None)
+
+
+class Detector:
+    """Single-pass multi-pattern matcher for error strings, stack traces and XSS markers
+
+    All signatures are compiled into one trie-shaped regex over lowercased bytes, so a body is
+    scanned once no matter how many signatures are loaded. Matches are leftmost-longest and do
+    not overlap, e.g. a MySQL syntax error is reported once and not also as 'error'.
+    """
+
+    def __init__(self, signatures=DEFAULT_SIGNATURES, max_matches=20, min_reflection=3, evidence_bytes=160):
+        self.categories = {}
+        for category, literal in signatures:
+            if literal:
+                self.categories.setdefault(literal.lower().encode('utf-8'), category)
+        self.pattern = trie_pattern(self.categories) if self.categories else None
+        self.overlap = max((len(literal) for literal in self.categories), default=1) - 1
+        self.max_matches = max_matches
+        self.min_reflection = min_reflection
+        self.evidence_bytes = evidence_bytes
+
+    def __len__(self):
+        return len(self.categories)
+
+    def scan(self, payload=None):
+        """Start scanning one body; payload, if given, is also searched for as a reflection"""
+        return DetectorScan(self, payload)
+
+    def search(self, body, payload=None):
+        """Scan a complete body and return its Detections"""
+        scan = self.scan(payload)
+        scan.feed(body)
+        return scan.finish()
+
+
+class DetectorScan:
+    """Streaming state of one body
+
+    A match is only reported once no later byte can extend it, i.e. when it starts at least
+    overlap bytes before the end of the data seen so far; the undecided tail is carried into the
+    next chunk. Results therefore match a whole-body scan for any chunk size.
+    """
+
+    def __init__(self, detector, payload=None):
+        self.detector = detector
+        reflection = (payload or '').lower().encode('utf-8')
+        self.reflection = reflection if len(reflection) >= detector.min_reflection else None
+        self.reflection_tail = b''
+        self.tail = b''
+        self.offset = 0
+        self.length = 0
+        self.matches = []
+        self.found = {}
+        self.evidence = None
+
+    def feed(self, chunk):
+        buffer = self.tail + chunk
+        self.scan_buffer(buffer, len(buffer) - self.detector.overlap)
+        if self.reflection and "payload" not in self.found:
+            self.find_reflection(chunk)
+        self.length += len(chunk)
+
+    def scan_buffer(self, buffer, cut):
+        """Report matches starting before cut and keep the rest of the buffer as the new tail"""
+        resume = max(cut, 0)
+        if self.detector.pattern is not None:
+            for match in self.detector.pattern.finditer(buffer.lower()):
+                if match.start() >= cut:
+                    break
+                literal = match.group()
+                self.record(literal.decode('utf-8', errors='replace'), self.detector.categories[literal],
+                            self.offset + match.start(), buffer, match.start())
+                resume = max(resume, match.end())
+        self.tail = buffer[resume:]
+        self.offset += resume
+
+    def find_reflection(self, chunk):
+        data = self.reflection_tail + chunk.lower()
+        position = data.find(self.reflection)
+        if position >= 0:
+            start = self.length - len(self.reflection_tail)
+            self.record("payload", REFLECTION_CATEGORY, start + position, data, position)
+        self.reflection_tail = data[max(0, len(data) - len(self.reflection) + 1):]
+
+    def record(self, signature, category, offset, context, position):
+        # Only the first position of each signature is kept
+        if signature not in self.found and len(self.matches) < self.detector.max_matches:
+            self.matches.append(SignatureMatch(signature, category, offset))
+        self.found.setdefault(signature, category)
+        if self.evidence is None:
+            start = max(0, position - self.detector.evidence_bytes // 2)
+            self.evidence = context[start:start + self.detector.evidence_bytes].decode('utf-8', errors='replace')
+
+    def finish(self):
+        if self.tail:
+            self.scan_buffer(self.tail, len(self.tail))
+        return Detections(self.matches, self.found, self.evidence)
+
+
+@lru_cache(maxsize=1)
+def default_detector():
+    """Shared detector for the built-in signatures plus any listed in DETECTOR_SIGNATURES_FILE"""
+    signatures = list(DEFAULT_SIGNATURES)
+    path = os.environ.get("DETECTOR_SIGNATURES_FILE")
+    if path:
+        signatures += load_signatures(path)
+    return Detector(signatures)
@@ -2,215 +2,230 @@
 import os
 import time
 import logging
-import requests
 import uuid
-import csv
-from urllib.parse import urlparse, parse_qs
+import json
 import threading
-import numpy as np
-import joblib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from http_client import HttpClient
+from wordlist import WordlistSource
+from batch_writer import BatchWriter
+from result_store import open_result_store
+from ml_scoring import BatchScorer
+from model_registry import default_registry
+from response_fingerprint import FingerprintBaseline, fingerprint_chunks
+from signature_detector import REFLECTION_CATEGORY, default_detector
+from rate_control import AdaptiveLimiter
+from checkpoint import CheckpointStore
+from payload_filter import PayloadDeduper, ResponsePruner
+from result_buffer import ResultBuffer
+from metrics import TimedChunks, default_metrics
+from scan_log import ScanLogger, ProcessLogger
+from work_queue import FuzzTarget, WorkQueue, discover_targets, parse_forms, MAX_FORM_PAGE_BYTES
 
 # Set up logging
 log_file = "fuzz.log"
 report_file = "report.log"
-dataset_file = "fuzzer_dataset.csv"
 
-class WebFuzzer:
-    def __init__(self, target_url, wordlist_file):
+# Minimum seconds between progress notifications to listeners
+PROGRESS_INTERVAL = 0.5
+# Signature categories that count as an error disclosure
+ERROR_CATEGORIES = frozenset({"error", "sql", "stacktrace"})
+# Every payload is sent with each of these methods
+METHODS = ('GET', 'POST')
+# Most recent results kept in a checkpoint so a resumed scan can show them right away
+CHECKPOINT_RESULT_TAIL = 200
+# Scan options a ProbeEngine takes; the others only matter to the scan that owns the wordlist
+PROBE_OPTIONS = ("concurrency", "per_host_limit", "pool_size", "keep_alive", "http2", "adaptive_rate",
+                 "request_timeout", "log_level", "ml_batch_size", "ml_batch_latency")
+
+
+class ProbeEngine:
+    """Sends payloads to a target and analyses the responses, without a wordlist, store or log files
+
+    WebFuzzer builds a whole scan on top of it; remote workers of distributed scans use it on its
+    own and send the result entries back to the coordinator.
+    """
+
+    def __init__(self, target_url, concurrency=1, per_host_limit=None, pool_size=None, keep_alive=True, http2=False,
+                 scan_id=None, ml_batch_size=64, ml_batch_latency=0.005, model_registry=None, detector=None,
+                 adaptive_rate=True, request_timeout=10.0, metrics=None, log_level=None, log_format=None):
         self.target_url = target_url
-        self.wordlist_file = wordlist_file
-        self.wordlist = []
-        self.previous_body = ""
-        self.params = {}
-        self.selected_params = []
+        # Fingerprints of ordinary responses that new responses are compared against
+        self.baseline = FingerprintBaseline()
+        # Signature matcher run over every body; the default one is compiled once per process
+        self.detector = detector or default_detector()
         self.running = False
-        self.results = []
-        self.thread = None
-        self.setup_logging()
-        
-        # Try to load ML models if they exist
-        try:
-            self.anomaly_detector = joblib.load("anomaly_model.pkl")
-            self.classifier = joblib.load("classifier_model.pkl")
-            self.ml_models_loaded = True
-            logging.info("ML models loaded successfully")
-        except:
-            self.ml_models_loaded = False
-            logging.info("ML models not found or could not be loaded")
-            
-        try:
-            self.load_wordlist()
-            self.initialize_dataset()
-        except Exception as e:
-            logging.error(f"Initialization error: {e}")
 
-    def setup_logging(self):
-        """Set up logging configuration"""
-        # Clear previous logs
-        if os.path.exists(log_file):
-            open(log_file, 'w').close()
-        if os.path.exists(report_file):
-            open(report_file, 'w').close()
-            
-        # Configure logging
-        logging.basicConfig(
-            filename=log_file, 
-            level=logging.INFO, 
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+        # Concurrency settings; concurrency=1 keeps the original serial loop
+        self.concurrency = max(1, int(concurrency or 1))
+        # Per-host window, pacing and timeout adapt to latency, 429/503 responses and Retry-After
+        self.host_limiter = AdaptiveLimiter(
+            int(per_host_limit or self.concurrency), adaptive=adaptive_rate, max_timeout=request_timeout
         )
+        # Probes always get the full timeout: a slow answer may be the payload's doing (a time-based
+        # SQL injection, say) rather than congestion, and must not turn into an error result
+        self.request_timeout = float(request_timeout or 10.0)
+        # Methods already sent for payloads a stopped run did not finish, keyed by payload
+        self.skip_pairs = {}
 
-    def log_activity(self, message):
-        """Log activities to the log file and print to console"""
-        logging.info(message)
-        print(message)
+        # Stage timings and counters shared by every scan in the process, served by /api/metrics
+        self.metrics = metrics or default_metrics
 
-    def log_report(self, report_data):
-        """Log detailed reports to a separate file"""
-        with open(report_file, 'a') as report:
-            report.write(report_data + "\n")
+        # One pooled keep-alive client is shared by every worker thread
+        self.http = HttpClient(pool_size=pool_size or self.concurrency, keep_alive=keep_alive, http2=http2,
+                               metrics=self.metrics)
+        self.scan_id = scan_id or uuid.uuid4().hex[:12]
+        self.setup_logging(log_level, log_format)
 
-    def load_wordlist(self):
-        """Load the wordlist from a file"""
-        if not os.path.exists(self.wordlist_file):
-            self.log_activity(f"Wordlist file not found: {self.wordlist_file}")
-            # Use a default set of test payloads
-            self.wordlist = ["<script>alert(1)</script>", "1' OR '1'='1", "admin' --", "' OR 1=1;--"]
-            self.log_activity(f"Using {len(self.wordlist)} default test payloads")
-            return
-            
-        with open(self.wordlist_file, 'r') as file:
-            self.wordlist = [line.strip() for line in file if line.strip()]
+        # ML models come from the process-wide registry, which reloads them when the files change
+        self.model_registry = model_registry or default_registry
+        self.ml_models_loaded = self.load_models()[0] is not None
+        if self.ml_models_loaded:
+            logging.info("ML models loaded successfully")
+        else:
+            logging.info("ML models not found or could not be loaded")
 
-        if not self.wordlist:
-            self.log_activity("Wordlist is empty or could not be loaded. Using defaults.")
-            self.wordlist = ["<script>alert(1)</script>", "1' OR '1'='1", "admin' --", "' OR 1=1;--"]
-        
-        self.log_activity(f"Loaded {len(self.wordlist)} payloads from wordlist.")
+        # Workers share one micro-batching scorer; the serial loop never waits for a batch to fill
+        self.scorer = BatchScorer(
+            model_provider=self.load_models,
+            max_batch=ml_batch_size,
+            max_latency=ml_batch_latency if self.concurrency > 1 else 0
+        )
 
-    def initialize_dataset(self):
-        """Ensure dataset file has headers"""
-        if not os.path.exists(dataset_file):
-            with open(dataset_file, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    'label', 'payload', 'response_code', 'alert_detected', 
-                    'error_detected', 'body_word_count_changed', 'timestamp'
-                ])
-            self.log_activity(f"Dataset file initialized: {dataset_file}")
-
-    def save_to_dataset(self, payload, response_code, alert_detected, error_detected, body_word_count_changed):
-        """Save labeled data to CSV file"""
-        # Assign label based on conditions
-        if response_code >= 500 or error_detected:
-            label = "malicious"
-        elif alert_detected:
-            label = "suspicious"
-        else:
-            label = "safe"
+    def setup_logging(self, level=None, log_format=None):
+        """Log through the logging module; WebFuzzer writes the scan's log files instead"""
+        self.log = ProcessLogger(self.scan_id, level)
 
-        with open(dataset_file, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                label, payload, response_code, alert_detected,
-                error_detected, body_word_count_changed, time.time()
-            ])
+    def load_models(self):
+        """Return (anomaly_detector, classifier, version) from the shared model registry"""
+        return self.model_registry.get_models()
 
     def analyze_with_ml(self, response_code, body_changed):
         """Analyze response using ML models if available"""
-        if not self.ml_models_loaded:
-            return None, None
-            
         try:
-            features = np.array([[response_code, int(body_changed)]])
-            
-            # Predict anomaly
-            anomaly = self.anomaly_detector.predict(features)[0]
-            anomaly_result = anomaly == -1  # True if anomalous
-            
-            # Predict classification
-            classification = self.classifier.predict(features)[0]
-            classification_result = classification == 1  # True if effective payload
-            
-            return anomaly_result, classification_result
+            # Predict anomaly and classification in a shared batch
+            return self.scorer.score((response_code, int(body_changed)))
         except Exception as e:
-            self.log_activity(f"Error in ML analysis: {e}")
+            self.log.error("Error in ML analysis: %s", e)
             return None, None
 
-    def fuzz_endpoint(self, payload, endpoint=None):
-        """Fuzz a specific endpoint with a payload"""
-        target = endpoint if endpoint else self.target_url
+    def probe(self, payload, target=None):
+        """Send the payload with every method and return the unnumbered result entries
+
+        target is a FuzzTarget, or an endpoint URL that gets the payload in a fuzz= parameter.
+        """
+        if not isinstance(target, FuzzTarget):
+            target = FuzzTarget.default(target or self.target_url)
+        endpoint = target.endpoint
         unique_id = str(uuid.uuid4())[:8]
-        
+        results = []
+        metrics = self.metrics
+        probe_started = time.perf_counter()
+
         try:
-            # Try both GET and POST requests
-            methods = ['GET', 'POST']
+            # Try both GET and POST requests, except those a previous run of the scan already sent
+            skip = self.skip_pairs.get((target.key, payload), ())
+            methods = [method for method in METHODS if method not in skip]
             for method in methods:
                 if not self.running:
-                    return  # Stop if fuzzing was halted
-                    
-                self.log_activity(f"[{unique_id}] Testing {method} {target} with payload: {payload}")
-                
-                if method == 'GET':
-                    # Add payload to URL parameters
-                    if '?' in target:
-                        url = f"{target}&fuzz={payload}"
+                    return results  # Stop if fuzzing was halted
+
+                self.log.debug("[%s] Testing %s %s [%s] with payload: %s", unique_id, method, endpoint, target.param,
+                               payload)
+
+                started = time.perf_counter()
+                ticket = self.host_limiter.acquire(endpoint, cancelled=lambda: not self.running)
+                if ticket is None:
+                    return results  # Stopped while waiting for the host to accept more requests
+                sent = time.perf_counter()
+                metrics.observe("wait", sent - started)
+                self.http.take_connect_time()
+                outcome = None
+                try:
+                    # GET carries the payload in the query string, POST in the form body
+                    url, request_args = target.request(method, payload)
+                    # The body is fingerprinted and scanned for signatures chunk by chunk, never held in memory
+                    with self.http.stream(method, url, timeout=self.request_timeout, **request_args) as response:
+                        # Time to the response headers, without opening a connection (its own stage)
+                        headers_at = time.perf_counter()
+                        metrics.observe("request", headers_at - sent - self.http.take_connect_time())
+                        chunks = TimedChunks(self.http.iter_body(response))
+                        fingerprint = fingerprint_chunks(response.status_code, chunks, self.detector.scan(payload))
+                    outcome = (response.status_code, response.headers.get('Retry-After'))
+                finally:
+                    # Timeouts and connection errors count against the host like a 503
+                    if outcome:
+                        self.host_limiter.release(ticket, *outcome)
                     else:
-                        url = f"{target}?fuzz={payload}"
-                    response = requests.get(url, timeout=10)
-                else:
-                    # Send payload in POST data
-                    data = {'fuzz': payload}
-                    response = requests.post(target, data=data, timeout=10)
-                
+                        self.host_limiter.release(ticket, error=True)
+
                 # Record response information
                 response_code = response.status_code
-                response_body = response.text
-                
-                # Analyze response
-                alert_detected = "alert" in response_body.lower()
-                error_detected = "error" in response_body.lower() or response_code >= 500
-                
-                # Check for changes in response body
-                body_changed = False
-                if self.previous_body and self.previous_body != response_body:
-                    prev_words = len(self.previous_body.split())
-                    curr_words = len(response_body.split())
-                    body_changed = prev_words != curr_words
-                
-                self.previous_body = response_body
-                
+                metrics.count_response(response_code, fingerprint.length)
+
+                # Compare with the previous response and the baseline of ordinary responses
+                body_changed, deviates, distance = self.baseline.compare(f"{method} {endpoint}", fingerprint)
+
+                # Analyze response; signatures most ordinary responses contain are part of the page,
+                # except XSS markers the reflected payload brought in
+                reflected = REFLECTION_CATEGORY in fingerprint.detections.categories
+                ordinary = self.baseline.ordinary_signatures(f"{method} {endpoint}", fingerprint)
+                if reflected:
+                    found = fingerprint.detections.found
+                    ordinary = frozenset(
+                        signature for signature in ordinary
+                        if found[signature] != "xss" or signature not in payload.lower()
+                    )
+                detections = fingerprint.detections.without(ordinary)
+                alert_detected = "xss" in detections.categories
+                error_detected = bool(detections.categories & ERROR_CATEGORIES) or response_code >= 500
+
+                # Reading the body and analysing it interleave; the time spent waiting for chunks is body read
+                scored_at = time.perf_counter()
+                metrics.observe("body", chunks.seconds)
+                metrics.observe("analysis", scored_at - headers_at - chunks.seconds)
+
                 # Use ML models for additional analysis
                 anomaly, effective = self.analyze_with_ml(response_code, body_changed)
-                
+                metrics.observe("ml", time.perf_counter() - scored_at)
+
                 # Determine severity based on findings
                 severity = 'low'
                 if response_code >= 500 or error_detected:
                     severity = 'critical'
-                elif alert_detected:
+                elif alert_detected or reflected:
                     severity = 'high'
-                elif anomaly or effective:
+                elif anomaly or effective or deviates:
                     severity = 'medium'
-                
+
                 # Generate finding description
                 finding = ""
-                if error_detected:
+                if "sql" in detections.categories:
+                    finding = "SQL error message disclosed"
+                elif "stacktrace" in detections.categories:
+                    finding = "Stack trace disclosed"
+                elif error_detected:
                     finding = "Server error detected"
                 elif alert_detected:
                     finding = "Possible XSS vulnerability"
+                elif reflected:
+                    finding = "Payload reflected in response"
                 elif anomaly:
                     finding = "Anomalous response detected"
                 elif effective:
                     finding = "Potentially effective payload"
+                elif deviates:
+                    finding = "Response differs from baseline"
                 else:
                     finding = "No issues detected"
-                
-                # Create result entry
-                result = {
-                    "id": len(self.results) + 1,
-                    "url": target,
+
+                # Create result entry; the id is assigned when it is recorded
+                results.append({
+                    "id": None,
+                    "url": endpoint,
                     "method": method,
+                    "parameter": target.param,
                     "payload": payload,
                     "status": response_code,
                     "responseTime": response.elapsed.total_seconds() * 1000,  # Convert to ms
@@ -219,72 +234,536 @@ class WebFuzzer:
                     "alertDetected": alert_detected,
                     "errorDetected": error_detected,
                     "bodyWordCountChanged": body_changed,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                # Add to results and save to dataset
-                self.results.append(result)
-                self.save_to_dataset(payload, response_code, alert_detected, error_detected, body_changed)
-                
-                # Log detailed report
-                report_data = (
-                    f"ID: {unique_id}\n"
-                    f"Target: {target}\n"
-                    f"Method: {method}\n"
-                    f"Payload: {payload}\n"
-                    f"Response Code: {response_code}\n"
-                    f"Response Time: {result['responseTime']}ms\n"
-                    f"Alert Detected: {alert_detected}\n"
-                    f"Error Detected: {error_detected}\n"
-                    f"Body Changed: {body_changed}\n"
-                    f"Severity: {severity}\n"
-                    f"Finding: {finding}\n"
-                    f"{'-' * 50}"
-                )
-                self.log_report(report_data)
-                
+                    "responseSize": fingerprint.length,
+                    "fingerprint": f"{fingerprint.simhash:016x}",
+                    "baselineDeviation": deviates,
+                    "baselineDistance": distance,
+                    "payloadReflected": reflected,
+                    "signatures": sorted(detections.signatures),
+                    "matches": [match.to_dict() for match in detections.matches],
+                    "evidence": detections.evidence,
+                    "timestamp": datetime.now().isoformat(),
+                    "probeId": unique_id
+                })
+
         except Exception as e:
-            self.log_activity(f"Error testing {target} with {payload}: {e}")
+            metrics.count_error()
+            self.log.error("Error testing %s [%s] with %s: %s", endpoint, target.param, payload, e)
             # Add error result
-            result = {
-                "id": len(self.results) + 1,
-                "url": target,
+            results.append({
+                "id": None,
+                "url": endpoint,
                 "method": "ERROR",
+                "parameter": target.param,
                 "payload": payload,
                 "status": 0,
                 "responseTime": 0,
                 "severity": "low",
                 "finding": f"Error during test: {str(e)}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "probeId": unique_id
+            })
+
+        metrics.probe_seconds.observe(time.perf_counter() - probe_started)
+        return results
+
+    def close(self):
+        """Stop probing and release the scorer and the connection pool"""
+        self.running = False
+        self.scorer.close()
+        self.http.close()
+
+
+class WebFuzzer(ProbeEngine):
+    def __init__(self, target_url, wordlist_file, concurrency=1, max_in_flight=None, per_host_limit=None,
+                 pool_size=None, keep_alive=True, http2=False, wordlist_offset=0, result_store=None, scan_id=None,
+                 ml_batch_size=64, ml_batch_latency=0.005, model_registry=None, detector=None,
+                 adaptive_rate=True, request_timeout=10.0, checkpoint_store=None, checkpoint_interval=5.0,
+                 resume_from=None, dedup=True, prune=None, endpoints=None, params=None, discover_forms=False,
+                 param_priority=None, distributed=False, result_buffer_size=10000, metrics=None,
+                 log_level=None, log_format=None):
+        self.wordlist_file = wordlist_file
+        self.wordlist = []
+        # Byte offset just past the last fully recorded payload, used to resume a scan; with several
+        # targets it is the lowest offset of any target and target_offsets holds each one
+        self.wordlist_offset = int(wordlist_offset or 0)
+        self.target_offsets = {}
+        # State saved by a previous run of this scan; it is applied when the scan begins
+        self.resume_state = resume_from
+        if resume_from:
+            scan_id = resume_from["scanId"]
+            self.wordlist_offset = int(resume_from.get("wordlistOffset", 0))
+            self.target_offsets = dict(resume_from.get("targetOffsets", {}))
+        super().__init__(
+            target_url, concurrency=concurrency, per_host_limit=per_host_limit, pool_size=pool_size,
+            keep_alive=keep_alive, http2=http2, scan_id=scan_id, ml_batch_size=ml_batch_size,
+            ml_batch_latency=ml_batch_latency, model_registry=model_registry, detector=detector,
+            adaptive_rate=adaptive_rate, request_timeout=request_timeout, metrics=metrics, log_level=log_level,
+            log_format=log_format
+        )
+        # Settings a resumed scan is rebuilt with
+        self.options = {
+            "concurrency": concurrency,
+            "max_in_flight": max_in_flight,
+            "per_host_limit": per_host_limit,
+            "pool_size": pool_size,
+            "keep_alive": keep_alive,
+            "http2": http2,
+            "adaptive_rate": adaptive_rate,
+            "request_timeout": request_timeout,
+            "dedup": dedup,
+            "prune": prune,
+            "endpoints": endpoints,
+            "params": params,
+            "discover_forms": discover_forms,
+            "param_priority": param_priority,
+            "distributed": distributed,
+            "result_buffer_size": result_buffer_size,
+            "log_level": log_level,
+            "log_format": log_format,
+            "ml_batch_size": ml_batch_size,
+            "ml_batch_latency": ml_batch_latency
+        }
+        # Every query parameter of target_url and endpoints is fuzzed, plus form fields found on
+        # those pages when discover_forms is set; params restricts fuzzing to the named parameters
+        self.endpoints = [self.target_url] + [endpoint for endpoint in (endpoints or []) if endpoint]
+        self.discover_forms = discover_forms
+        self.param_priority = param_priority or {}
+        self.params = {}
+        self.selected_params = list(params or [])
+        self.targets = []
+        # Distributed scans are probed by remote workers that pull work from the coordinator
+        self.distributed = distributed
+        self.thread = None
+
+        # Payloads queued or in flight at once in the concurrent loop
+        self.max_in_flight = max(self.concurrency, int(max_in_flight or self.concurrency))
+        self.results_lock = threading.Lock()
+        self.stats = {}
+        # Duplicate payloads are dropped before dispatch; prune ('skip' or 'sample') also thins out
+        # payload families whose responses stopped changing
+        self.dedup = dedup
+        self.prune = prune
+        self.deduper = None
+        self.pruner = ResponsePruner(prune) if prune else None
+
+        # Ids assigned by earlier runs of a resumed scan
+        self.result_base = 0
+        self.payloads_base = 0
+        self.incomplete = []
+
+        # Scan state is checkpointed every checkpoint_interval seconds and when the scan ends
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_lock = threading.Lock()
+        self.last_checkpoint = 0.0
+
+        # Live progress, also pushed to progress listeners at most every PROGRESS_INTERVAL seconds
+        self.payloads_done = 0
+        self.payloads_total = 0
+        self.next_index = 0
+        self.order_lock = threading.Lock()
+        self.started_at = None
+        self.last_progress_push = 0.0
+        self.result_listeners = []
+        self.progress_listeners = []
+
+        # Dataset rows are appended in batches by a background writer
+        self.result_store = result_store or open_result_store()
+        self.dataset_writer = BatchWriter(sink=self.result_store.append_rows)
+
+        # Only the newest result_buffer_size results stay in memory, as compact records; older ones
+        # are spilled to the store, where results_since() finds them
+        self.spill_writer = BatchWriter(sink=self.write_spilled)
+        self.results = ResultBuffer(result_buffer_size, spill=self.spill_writer.write)
+            
+        try:
+            self.load_wordlist()
+            self.initialize_dataset()
+        except Exception as e:
+            logging.error(f"Initialization error: {e}")
+
+    def setup_logging(self, level=None, log_format=None):
+        """Open the queued activity log and report log; both are shared by every scan and rotate by size"""
+        self.log = ScanLogger(self.scan_id, level, log_format, log_path=log_file, report_path=report_file)
+
+    def log_activity(self, message, *args):
+        """Log an activity to the log file and console; args are formatted into message lazily"""
+        self.log.info(message, *args)
+
+    def log_report(self, result, probe_id):
+        """Log the detailed report of a recorded result to a separate file"""
+        self.log.report(result, probe_id)
+
+    def flush_writers(self):
+        """Write out all queued dataset rows, log lines, reports and spilled results"""
+        self.dataset_writer.close()
+        self.log.flush()
+        self.spill_writer.close()
+
+    def load_wordlist(self):
+        """Open the wordlist as a lazy payload stream"""
+        self.wordlist = WordlistSource(self.wordlist_file, start_offset=self.wordlist_offset)
+
+        if self.wordlist.use_defaults:
+            if not os.path.exists(self.wordlist_file):
+                self.log.error("Wordlist file not found: %s", self.wordlist_file)
+            else:
+                self.log_activity("Wordlist is empty or could not be loaded. Using defaults.")
+            self.log_activity(f"Using {len(self.wordlist)} default test payloads")
+            return
+
+        resume = f" from byte offset {self.wordlist_offset}" if self.wordlist_offset else ""
+        self.log_activity(f"Streaming ~{len(self.wordlist)} payloads from wordlist{resume}.")
+
+    def initialize_dataset(self):
+        """Ensure the dataset store exists"""
+        if self.result_store.initialize():
+            self.log_activity(f"Dataset initialized: {self.result_store.path}")
+
+    def save_to_dataset(self, payload, response_code, alert_detected, error_detected, body_word_count_changed,
+                        method=None):
+        """Save labeled data to CSV file"""
+        # Assign label based on conditions
+        if response_code >= 500 or error_detected:
+            label = "malicious"
+        elif alert_detected:
+            label = "suspicious"
+        else:
+            label = "safe"
+
+        self.dataset_writer.write((
+            self.scan_id, label, payload, response_code, alert_detected,
+            error_detected, body_word_count_changed, time.time(), method
+        ))
+
+    def fuzz_endpoint(self, payload, endpoint=None):
+        """Fuzz a specific endpoint with a payload"""
+        self.record_results(self.probe(payload, endpoint))
+
+    def record_results(self, results):
+        """Number the results in order, then save them to the dataset and report"""
+        with self.results_lock:
+            for result in results:
+                started = time.perf_counter()
+                unique_id = result.pop("probeId")
+                result["id"] = self.results.append(result)
+                for callback in self.result_listeners:
+                    try:
+                        callback(self.scan_id, result)
+                    except Exception as e:
+                        logging.error(f"Error in result listener: {e}")
+                if result["method"] == "ERROR":
+                    continue
+                self.metrics.findings.inc(result["severity"])
+
+                self.save_to_dataset(
+                    result["payload"], result["status"], result["alertDetected"],
+                    result["errorDetected"], result["bodyWordCountChanged"], method=result["method"]
+                )
+
+                # Log detailed report; it is formatted on the log writer thread
+                self.log_report(result, unique_id)
+                self.metrics.observe("persist", time.perf_counter() - started)
+
+    def log_progress(self, done, total):
+        """Log scan progress every ten payloads and at the end"""
+        self.payloads_done = done
+        if done % 10 == 0 or done == total:
+            progress = min(100.0, (done / total) * 100) if total else 100.0
+            self.log.info("Progress: %.1f%% (%d/%d)", progress, done, total)
+
+        now = time.monotonic()
+        if self.progress_listeners and now - self.last_progress_push >= PROGRESS_INTERVAL:
+            self.last_progress_push = now
+            self.notify_progress()
+
+    def add_result_listener(self, callback):
+        """Register callback(scan_id, result), called for every recorded result; it must not block"""
+        self.result_listeners.append(callback)
+
+    def add_progress_listener(self, callback):
+        """Register callback(scan_id, progress), called with throttled progress snapshots"""
+        self.progress_listeners.append(callback)
+
+    def notify_progress(self):
+        progress = self.get_progress()
+        for callback in self.progress_listeners:
+            try:
+                callback(self.scan_id, progress)
+            except Exception as e:
+                logging.error(f"Error in progress listener: {e}")
+
+    def dispatch_limit(self):
+        """Probes the target host accepts right now; keeps scheduler workers from blocking on a throttled host"""
+        return self.host_limiter.window(self.target_url)
+
+    def get_progress(self):
+        """Return a snapshot of scan progress and live throughput"""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        requests_done = self.results.latest_id - self.result_base
+        # A resumed scan counts the payloads of its earlier runs as done
+        done = self.payloads_base + self.payloads_done
+        total = self.payloads_base + self.payloads_total
+        return {
+            "scanId": self.scan_id,
+            "running": self.running,
+            "payloadsDone": done,
+            "payloadsTotal": total,
+            "progress": round(min(100.0, done / total * 100), 1) if total else 0.0,
+            "requests": requests_done,
+            "requestsSaved": self.payloads_skipped() * len(METHODS),
+            "targets": len(self.targets),
+            "elapsedSeconds": round(elapsed, 3),
+            "requestsPerSecond": round(requests_done / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def begin_scan(self):
+        """Reset scan state and open the payload stream; the scan is then driven through next_work()"""
+        self.log.summary("Starting fuzzing on %s with %d payloads", self.target_url, len(self.wordlist))
+
+        # Clear previous results, or pick up where a checkpointed run of this scan stopped
+        resume = self.resume_state or {}
+        self.resume_state = None
+        self.result_base = resume.get("nextResultId", 0)
+        self.results.reset(resume.get("resultTail", []), self.result_base)
+        self.payloads_base = resume.get("payloadsDone", 0)
+        self.resume_total = resume.get("payloadsTotal")
+        self.skip_pairs = {(key, payload): set(methods) for payload, methods, key in resume.get("completedPairs", [])}
+        self.incomplete = []
+        self.dispatched = {}
+        self.baseline.reset()
+        self.payloads_done = 0
+        self.payloads_total = len(self.wordlist)
+        self.started_at = time.perf_counter()
+        self.deduper = None
+        self.pruner = ResponsePruner(self.prune) if self.prune else None
+        self.work = enumerate(self.generate_work())
+        self.pending = {}
+        self.next_index = 0
+        self.order_lock = threading.Lock()
+
+    def discover_page_forms(self, url):
+        """Fetch a page and return its forms; failures only cost the form targets"""
+        try:
+            with self.http.stream('GET', url, timeout=self.host_limiter.timeout(url)) as response:
+                body = bytearray()
+                for chunk in self.http.iter_body(response):
+                    body += chunk
+                    if len(body) >= MAX_FORM_PAGE_BYTES:
+                        break
+            return parse_forms(body.decode('utf-8', errors='replace'), url)
+        except Exception as e:
+            self.log.error("Could not discover forms on %s: %s", url, e)
+            return []
+
+    def resolve_targets(self):
+        """Work out the injection points of the scan; runs on the first next_work() call"""
+        forms = []
+        if self.discover_forms:
+            for url in self.endpoints:
+                forms.extend(self.discover_page_forms(url))
+        self.targets = discover_targets(self.endpoints, forms, self.selected_params, self.param_priority)
+        self.params = {}
+        for target in self.targets:
+            self.params.setdefault(target.endpoint, []).append(target.param)
+        self.log_activity(f"Fuzzing {len(self.targets)} parameter(s) on {len(self.params)} endpoint(s)")
+        return self.targets
+
+    def generate_work(self):
+        """Lazy stream of (target, payload, offset) over every target, high-value parameters first"""
+        targets = self.resolve_targets()
+        self.payloads_total = len(self.wordlist) * len(targets)
+        if self.resume_total:
+            # Targets resume from different offsets, so the total of the interrupted run is more accurate
+            self.payloads_total = max(0, self.resume_total - self.payloads_base)
+        if self.dedup:
+            self.deduper = PayloadDeduper(capacity=self.payloads_total)
+        yield from WorkQueue(targets, self.target_payloads)
+
+    def target_payloads(self, target):
+        """Payloads of one target from its resume offset, minus duplicates and pruned families"""
+        start = self.target_offsets.get(target.key, self.wordlist_offset)
+        for payload, offset in WordlistSource(self.wordlist_file, start_offset=start).iter_with_offsets():
+            if self.deduper is not None and self.deduper.seen(payload, target.key):
+                continue
+            if self.pruner is not None and (target.key, payload) not in self.skip_pairs \
+                    and not self.pruner.allow(payload, target.key):
+                continue
+            yield payload, offset
+
+    def payloads_skipped(self):
+        """Payloads that were filtered out instead of being sent"""
+        return (self.deduper.duplicates if self.deduper is not None else 0) + \
+            (self.pruner.pruned if self.pruner is not None else 0)
+
+    def next_work(self):
+        """Return the next (index, (payload, target), offset) to probe, or None when the work is exhausted
+
+        The middle item holds the arguments of probe().
+        """
+        item = next(self.work, None)
+        if item is None:
+            return None
+        index, (target, payload, offset) = item
+        self.dispatched[index] = (payload, target)
+        return index, (payload, target), offset
+
+    def complete_work(self, index, offset, results):
+        """Record a finished payload once every earlier payload is recorded, so ids follow wordlist order"""
+        with self.order_lock:
+            self.pending[index] = (results, offset)
+            while self.next_index in self.pending:
+                results, offset = self.pending.pop(self.next_index)
+                self.record_results(results)
+                self.mark_completed(*self.dispatched.pop(self.next_index), offset, results)
+                self.next_index += 1
+                self.log_progress(self.next_index + self.payloads_skipped(), self.payloads_total)
+            due = self.checkpoint_due()
+        if due:
+            self.save_checkpoint("running", wait=False)
+
+    def mark_completed(self, payload, target, offset, results):
+        """Advance the target's resume offset past a payload once all of its methods were sent; called in order"""
+        if self.pruner is not None:
+            self.pruner.observe(payload, results, target.key)
+        sent = {result["method"] for result in results} | self.skip_pairs.pop((target.key, payload), set())
+        if self.incomplete or not (sent.issuperset(METHODS) or "ERROR" in sent):
+            # A probe cut short by a stop; the offset stays before it so a resume sends the missing methods
+            self.incomplete.append((payload, sorted(sent.intersection(METHODS)), target.key))
+        else:
+            self.target_offsets[target.key] = offset
+            self.wordlist_offset = offset if len(self.targets) == 1 else min(
+                self.target_offsets.get(other.key, self.wordlist_offset) for other in self.targets)
+
+    def checkpoint_due(self):
+        if not self.checkpoint_interval:
+            return False
+        now = time.monotonic()
+        if now - self.last_checkpoint < self.checkpoint_interval:
+            return False
+        self.last_checkpoint = now
+        return True
+
+    def checkpoint_state(self, state):
+        """Snapshot what a resumed run needs"""
+        with self.order_lock:
+            return {
+                "scanId": self.scan_id,
+                "state": state,
+                "targetUrl": self.target_url,
+                "wordlistFile": self.wordlist_file,
+                "options": self.options,
+                "wordlistOffset": self.wordlist_offset,
+                "targetOffsets": dict(self.target_offsets),
+                "payloadsDone": self.payloads_base + self.next_index + self.payloads_skipped() - len(self.incomplete),
+                "payloadsTotal": self.payloads_base + self.payloads_total,
+                "completedPairs": [[payload, methods, key] for payload, methods, key in self.incomplete if methods],
+                "nextResultId": self.results.latest_id,
+                "resultTail": self.results.tail(CHECKPOINT_RESULT_TAIL)
             }
-            self.results.append(result)
 
-    def fuzzing_thread(self):
-        """Main fuzzing process that runs in a separate thread"""
+    def save_checkpoint(self, state, wait=True):
+        """Write a checkpoint; periodic saves are skipped while another one is still being written"""
+        if not self.checkpoint_lock.acquire(blocking=wait):
+            return
         try:
-            self.log_activity(f"Starting fuzzing on {self.target_url} with {len(self.wordlist)} payloads")
-            
-            # Clear previous results
-            self.results = []
-            
-            # Process each payload in the wordlist
-            for i, payload in enumerate(self.wordlist):
+            # Snapshot under the write lock so an older snapshot never overwrites a newer one
+            self.checkpoint_store.save(self.checkpoint_state(state))
+        except Exception as e:
+            logging.error(f"Could not save checkpoint for scan {self.scan_id}: {e}")
+        finally:
+            self.checkpoint_lock.release()
+
+    def finish_scan(self):
+        """Record throughput statistics, flush the writers and mark the scan as finished"""
+        try:
+            # Payloads filtered out after the last recorded one never pass through complete_work()
+            with self.order_lock:
+                self.payloads_done = self.next_index + self.payloads_skipped()
+            # Report throughput so serial and concurrent runs can be compared
+            elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+            requests_done = self.results.latest_id - self.result_base
+            self.stats = {
+                "concurrency": self.concurrency,
+                "requests": requests_done,
+                "elapsedSeconds": round(elapsed, 3),
+                "requestsPerSecond": round(requests_done / elapsed, 2) if elapsed > 0 else 0.0,
+                "wordlistOffset": self.wordlist_offset,
+                "connections": self.http.get_stats(),
+                "payloadFilter": self.get_filter_stats()
+            }
+            self.log.summary(
+                "Fuzzing process completed: %d requests in %ss (%s req/s, concurrency %d)",
+                self.stats['requests'], self.stats['elapsedSeconds'], self.stats['requestsPerSecond'], self.concurrency
+            )
+        finally:
+            self.flush_writers()
+            self.scorer.close()
+            if self.checkpoint_interval:
+                state = "completed" if self.running and not self.incomplete else "stopped"
+                self.save_checkpoint(state)
+            self.running = False
+            self.notify_progress()
+
+    def run_serial(self):
+        """Probe payloads one at a time"""
+        while True:
+            if not self.running:
+                self.log.summary("Fuzzing stopped by user")
+                break
+            item = self.next_work()
+            if item is None:
+                break
+            index, work, offset = item
+            self.complete_work(index, offset, self.probe(*work))
+
+    def run_concurrent(self):
+        """Probe payloads on a thread pool while keeping result ids in wordlist order"""
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+
+        def on_done(index, offset, future):
+            in_flight.release()
+            try:
+                results = future.result()
+            except Exception as e:
+                self.log.error("Error in fuzzing worker: %s", e)
+                results = []
+            self.complete_work(index, offset, results)
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fuzz")
+        try:
+            while True:
+                # Wait for a free in-flight slot, re-checking the stop flag while blocked
+                while not in_flight.acquire(timeout=0.1):
+                    if not self.running:
+                        break
                 if not self.running:
-                    self.log_activity("Fuzzing stopped by user")
+                    self.log.summary("Fuzzing stopped by user")
+                    break
+                item = self.next_work()
+                if item is None:
+                    in_flight.release()
                     break
-                    
-                self.fuzz_endpoint(payload)
-                
-                # Log progress
-                progress = ((i + 1) / len(self.wordlist)) * 100
-                if (i + 1) % 10 == 0 or (i + 1) == len(self.wordlist):
-                    self.log_activity(f"Progress: {progress:.1f}% ({i + 1}/{len(self.wordlist)})")
-                    
-            self.log_activity("Fuzzing process completed")
+                index, work, offset = item
+                future = executor.submit(self.probe, *work)
+                future.add_done_callback(lambda f, index=index, offset=offset: on_done(index, offset, f))
+        finally:
+            # Drop queued probes immediately when stopped, otherwise drain them
+            executor.shutdown(wait=True, cancel_futures=not self.running)
+
+    def fuzzing_thread(self):
+        """Main fuzzing process that runs in a separate thread"""
+        try:
+            self.begin_scan()
+            if self.concurrency > 1:
+                self.run_concurrent()
+            else:
+                self.run_serial()
         except Exception as e:
-            self.log_activity(f"Error in fuzzing thread: {e}")
+            self.log.error("Error in fuzzing thread: %s", e)
         finally:
-            self.running = False
+            self.finish_scan()
 
     def start_fuzzing(self):
         """Start the fuzzing process in a separate thread"""
@@ -312,6 +791,59 @@ class WebFuzzer:
             
         return {"status": "stopped", "message": "Fuzzing process stopped"}
         
+    def get_filter_stats(self):
+        """Payloads dropped as duplicates or pruned, and the requests that saved"""
+        return {
+            "deduplicated": self.deduper.duplicates if self.deduper is not None else 0,
+            "pruned": self.pruner.pruned if self.pruner is not None else 0,
+            "requestsSaved": self.payloads_skipped() * len(METHODS),
+            "dedup": self.deduper.get_stats() if self.deduper is not None else None,
+            "pruning": self.pruner.get_stats() if self.pruner is not None else None
+        }
+
     def get_results(self):
-        """Return current fuzzing results"""
-        return self.results
+        """Return the results still held in memory"""
+        return self.results.since(0)
+
+    def latest_result_id(self):
+        return self.results.latest_id
+
+    def results_since(self, since, limit=None):
+        """Results with an id above since, read from the store when they already left the buffer"""
+        first_id = self.results.first_id
+        if since + 1 >= first_id:
+            return self.results.since(since, limit)
+        wanted = first_id - 1 - since
+        older = self.result_store.read_spilled(self.scan_id, since, min(limit, wanted) if limit else wanted)
+        if len(older) < wanted:
+            # The rest is still queued for the store; never skip over it
+            return older
+        if limit and len(older) >= limit:
+            return older
+        newer = self.results.since(first_id - 1, limit - len(older) if limit else None)
+        # Results evicted since first_id was read are in the store now; the next call picks them up
+        if newer and newer[0]["id"] != first_id:
+            return older
+        return older + newer
+
+    def write_spilled(self, records):
+        """Store results evicted from the buffer; runs on the spill writer thread"""
+        self.result_store.spill_results(
+            [(self.scan_id, record.id, json.dumps(record.to_dict())) for record in records]
+        )
+
+    def get_stats(self):
+        """Return throughput statistics of the last scan and live connection counters"""
+        return {
+            **self.stats,
+            "scanId": self.scan_id,
+            "wordlistOffset": self.wordlist_offset,
+            "connections": self.http.get_stats(),
+            "rateControl": self.host_limiter.get_stats(),
+            "payloadFilter": self.get_filter_stats(),
+            "targets": [target.to_dict() for target in self.targets],
+            "targetOffsets": dict(self.target_offsets),
+            "datasetWriter": self.dataset_writer.get_stats(),
+            "logs": self.log.get_stats(),
+            "mlScoring": self.scorer.get_stats()
+        }
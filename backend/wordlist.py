@@ -0,0 +1,83 @@
+import os
+
+DEFAULT_PAYLOADS = ["<script>alert(1)</script>", "1' OR '1'='1", "admin' --", "' OR 1=1;--"]
+
+# Read size used when counting lines
+COUNT_CHUNK_SIZE = 1024 * 1024
+
+
+class WordlistSource:
+    """Lazily streams payloads from a wordlist file without loading it into memory"""
+
+    def __init__(self, path, start_offset=0, defaults=None):
+        self.path = path
+        self.start_offset = max(0, int(start_offset or 0))
+        self.defaults = list(DEFAULT_PAYLOADS if defaults is None else defaults)
+        self.use_defaults = not self.has_payloads()
+        self.total = None
+
+    def has_payloads(self):
+        """Check whether the file exists and holds at least one non-blank line"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, 'rb') as file:
+            return any(line.strip() for line in file)
+
+    def iter_with_offsets(self):
+        """Yield (payload, offset) pairs where offset is the byte position just after the payload's line
+
+        For the built-in defaults the offset is the payload index instead.
+        """
+        if self.use_defaults:
+            for i in range(self.start_offset, len(self.defaults)):
+                yield self.defaults[i], i + 1
+            return
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.start_offset)
+            offset = self.start_offset
+            for line in file:
+                offset += len(line)
+                payload = line.decode('utf-8', errors='replace').strip()
+                if payload:
+                    yield payload, offset
+
+    def __iter__(self):
+        for payload, _ in self.iter_with_offsets():
+            yield payload
+
+    def count(self):
+        """Estimate the payload count for progress reporting by counting lines in fixed-size chunks
+
+        Blank lines are included, so the estimate can be slightly higher than the number of payloads.
+        """
+        if self.total is not None:
+            return self.total
+        if self.use_defaults:
+            self.total = max(0, len(self.defaults) - self.start_offset)
+            return self.total
+
+        lines = 0
+        last = b"\n"
+        with open(self.path, 'rb') as file:
+            file.seek(self.start_offset)
+            while True:
+                chunk = file.read(COUNT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+        # A final line without a trailing newline still holds a payload
+        if last != b"\n":
+            lines += 1
+        self.total = lines
+        return self.total
+
+    def __len__(self):
+        return self.count()
+
+    def size(self):
+        """Return the file size in bytes, or 0 when the built-in defaults are used"""
+        if self.use_defaults:
+            return 0
+        return os.path.getsize(self.path)
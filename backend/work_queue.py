@@ -0,0 +1,201 @@
+import heapq
+from html.parser import HTMLParser
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, urljoin
+
+# Default weights of parameter names that commonly reach SQL queries, templates, file paths,
+# shell commands or redirects; every other parameter weighs 1
+HIGH_VALUE_PARAMS = {
+    "id": 5, "uid": 5, "file": 5, "path": 5, "include": 5, "cmd": 5, "exec": 5, "command": 5,
+    "url": 5, "redirect": 5, "q": 4, "query": 4, "search": 4, "user": 4, "username": 4,
+    "page": 4, "dir": 4, "template": 4, "next": 4, "return": 4, "callback": 4,
+    "s": 3, "keyword": 3, "name": 3, "email": 3, "sort": 3, "order": 3, "filter": 3,
+    "category": 3, "cat": 3, "view": 3, "action": 3, "lang": 2
+}
+# Anti-forgery tokens and framework state rarely matter and usually break the request when changed
+LOW_VALUE_PARAMS = {"csrf", "csrf_token", "csrfmiddlewaretoken", "_token", "authenticity_token",
+                    "__viewstate", "__eventvalidation", "__viewstategenerator"}
+# Parameter injected when a target has no parameters of its own
+DEFAULT_PARAM = "fuzz"
+# Input types that carry no user-controlled value
+SKIPPED_INPUT_TYPES = {"submit", "button", "image", "reset", "file"}
+MAX_FORM_PAGE_BYTES = 1024 * 1024
+
+
+def param_weight(name, priorities=None):
+    """Priority weight of a parameter; explicit priorities win over the built-in name heuristics"""
+    if priorities and name in priorities:
+        return max(0.1, float(priorities[name]))
+    lowered = name.lower()
+    if lowered in LOW_VALUE_PARAMS:
+        return 0.2
+    if lowered in HIGH_VALUE_PARAMS:
+        return float(HIGH_VALUE_PARAMS[lowered])
+    if lowered.endswith("_id") or lowered.endswith("id"):
+        return 4.0
+    return 1.0
+
+
+class FuzzTarget:
+    """One injection point: a parameter of an endpoint, sent in the query for GET and the body for POST
+
+    Other query and form parameters keep their original values. The payload itself is appended to
+    the URL unencoded, like the original fuzz= probes.
+    """
+    __slots__ = ("endpoint", "param", "source", "query", "form", "weight", "key")
+
+    def __init__(self, endpoint, param, source="query", query=(), form=None, weight=1.0):
+        self.endpoint = endpoint
+        self.param = param
+        self.source = source
+        self.query = list(query)
+        self.form = dict(form or {})
+        self.weight = weight
+        self.key = f"{source}:{param}@{endpoint}"
+
+    @classmethod
+    def default(cls, url):
+        return cls(url, DEFAULT_PARAM, "default")
+
+    def url(self):
+        return f"{self.endpoint}?{urlencode(self.query)}" if self.query else self.endpoint
+
+    def request(self, method, payload):
+        """Return (url, request kwargs) that place payload in this target's parameter"""
+        base = self.url()
+        if method == 'GET':
+            separator = '&' if '?' in base else '?'
+            return f"{base}{separator}{self.param}={payload}", {}
+        return base, {'data': {**self.form, self.param: payload}}
+
+    def to_dict(self):
+        return {"key": self.key, "endpoint": self.endpoint, "parameter": self.param,
+                "source": self.source, "weight": self.weight}
+
+
+class Form:
+    __slots__ = ("action", "method", "fields")
+
+    def __init__(self, action, method):
+        self.action = action
+        self.method = method
+        self.fields = {}
+
+
+class FormParser(HTMLParser):
+    """Collects the named fields of every <form> on a page"""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.forms = []
+        self.current = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            action = urljoin(self.base_url, attrs.get('action') or self.base_url)
+            self.current = Form(action, (attrs.get('method') or 'get').upper())
+            self.forms.append(self.current)
+        elif self.current is not None and tag in ('input', 'textarea', 'select'):
+            name = attrs.get('name')
+            if name and (attrs.get('type') or 'text').lower() not in SKIPPED_INPUT_TYPES:
+                self.current.fields.setdefault(name, attrs.get('value') or '')
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.current = None
+
+
+def parse_forms(html, base_url):
+    parser = FormParser(base_url)
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass  # Keep whatever was parsed before the markup broke
+    return [form for form in parser.forms if form.fields]
+
+
+def split_url(url):
+    """Return (endpoint without query, ordered query pairs)"""
+    parts = urlparse(url)
+    return urlunparse(parts._replace(query='', fragment='')), parse_qsl(parts.query, keep_blank_values=True)
+
+
+def discover_targets(urls, forms=(), selected=None, priorities=None):
+    """One target per query parameter of each URL and per field of each form, highest weight first
+
+    selected restricts fuzzing to those parameter names; selected names a URL lacks are added to
+    it as new query parameters. A URL without any parameter is fuzzed through DEFAULT_PARAM.
+    """
+    selected = [name for name in (selected or []) if name]
+    targets, keys = [], set()
+
+    def add(target):
+        if target.key not in keys:
+            keys.add(target.key)
+            target.weight = param_weight(target.param, priorities)
+            targets.append(target)
+
+    for url in urls:
+        endpoint, pairs = split_url(url)
+        names = list(dict.fromkeys(name for name, _ in pairs))
+        for name in names:
+            if not selected or name in selected:
+                add(FuzzTarget(endpoint, name, "query", query=[pair for pair in pairs if pair[0] != name]))
+        for name in selected:
+            if name not in names:
+                add(FuzzTarget(endpoint, name, "query", query=pairs))
+
+    for form in forms:
+        endpoint, pairs = split_url(form.action)
+        for name in form.fields:
+            if not selected or name in selected:
+                fields = {field: value for field, value in form.fields.items() if field != name}
+                add(FuzzTarget(endpoint, name, "form", query=pairs, form=fields))
+
+    if not targets:
+        for url in urls:
+            add(FuzzTarget.default(url))
+    # Stable sort keeps discovery order among equal weights
+    targets.sort(key=lambda target: -target.weight)
+    return targets
+
+
+class WorkQueue:
+    """Lazy (target x payload) stream ordered by target priority
+
+    Every target reads the payload stream through its own iterator, so memory grows with the
+    number of targets, not with the size of the cross product. Targets are interleaved by stride
+    scheduling: the next item comes from the target with the lowest pass value, which advances by
+    1/weight per item, so a weight 5 parameter gets five payloads for each one a weight 1
+    parameter gets, and high-value parameters finish first.
+    """
+
+    def __init__(self, targets, open_stream):
+        self.targets = list(targets)
+        self.open_stream = open_stream
+
+    def __iter__(self):
+        heap = [(0.0, -target.weight, i) for i, target in enumerate(self.targets)]
+        heapq.heapify(heap)
+        streams = {}
+        try:
+            while heap:
+                pass_value, order, i = heap[0]
+                target = self.targets[i]
+                stream = streams.get(i)
+                if stream is None:
+                    stream = streams[i] = iter(self.open_stream(target))
+                item = next(stream, None)
+                if item is None:
+                    heapq.heappop(heap)
+                    del streams[i]
+                    continue
+                heapq.heapreplace(heap, (pass_value + 1.0 / target.weight, order, i))
+                yield target, item[0], item[1]
+        finally:
+            for stream in streams.values():
+                close = getattr(stream, 'close', None)
+                if close:
+                    close()
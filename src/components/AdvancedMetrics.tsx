@@ -1,5 +1,5 @@
 
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Slider } from "@/components/ui/slider";
 import { Switch } from "@/components/ui/switch";
@@ -9,6 +9,21 @@ import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { Cpu, Server, Network, Gauge, Terminal, Shield, Clock, Settings2, Layers, FilterX } from 'lucide-react';
 import { toast } from "sonner";
+import { fuzzingService, MetricsSummary } from "@/services/fuzzingService";
+
+// Probe stages in pipeline order, as reported by /api/metrics/summary
+const STAGES: { key: string; label: string; color: string }[] = [
+  { key: 'wait', label: 'Rate limit wait', color: 'bg-slate-500' },
+  { key: 'connect', label: 'DNS / connect', color: 'bg-amber-500' },
+  { key: 'request', label: 'Request', color: 'bg-fuzzer-primary' },
+  { key: 'body', label: 'Body read', color: 'bg-blue-500' },
+  { key: 'analysis', label: 'Detection', color: 'bg-purple-500' },
+  { key: 'ml', label: 'ML scoring', color: 'bg-green-500' },
+  { key: 'persist', label: 'Persistence', color: 'bg-blue-600' }
+];
+
+// Refresh interval of the stage timings while a scan runs
+const METRICS_POLL_MS = 2000;
 
 interface AdvancedMetricsProps {
   isScanning: boolean;
@@ -22,6 +37,29 @@ interface AdvancedMetricsProps {
 }
 
 const AdvancedMetrics: React.FC<AdvancedMetricsProps> = ({ isScanning, metrics }) => {
+  const [timings, setTimings] = useState<MetricsSummary | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    const load = () => {
+      fuzzingService.getMetricsSummary().then((summary) => {
+        if (!cancelled && summary) {
+          setTimings(summary);
+        }
+      });
+    };
+    
+    load();
+    if (!isScanning) {
+      return () => { cancelled = true; };
+    }
+    const timer = setInterval(load, METRICS_POLL_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [isScanning]);
+
   const handleSettingChange = (setting: string, value: any) => {
     toast.success(`${setting} updated`, {
       description: `New value: ${value}`,
@@ -177,6 +215,64 @@ const AdvancedMetrics: React.FC<AdvancedMetricsProps> = ({ isScanning, metrics }
         </Card>
       </div>
 
+      {/* Probe Timing */}
+      <Card className="neo-blur frost-panel bg-card/30 border-border">
+        <CardHeader className="pb-2">
+          <CardTitle className="text-lg font-medium flex items-center gap-2">
+            <Clock className="h-5 w-5 text-fuzzer-primary" />
+            Probe Timing
+          </CardTitle>
+        </CardHeader>
+        <CardContent className="space-y-4">
+          {timings && timings.probes > 0 ? (
+            <>
+              <div className="flex h-2 w-full overflow-hidden rounded-full bg-secondary">
+                {STAGES.map((stage) => (
+                  <div
+                    key={stage.key}
+                    className={`h-full ${stage.color}`}
+                    style={{ width: `${(timings.stages[stage.key]?.share ?? 0) * 100}%` }}
+                    title={stage.label}
+                  ></div>
+                ))}
+              </div>
+              
+              <div className="grid grid-cols-5 gap-2 text-xs">
+                <span className="text-muted-foreground">Stage</span>
+                <span className="text-muted-foreground text-right">Per probe</span>
+                <span className="text-muted-foreground text-right">Avg</span>
+                <span className="text-muted-foreground text-right">p95</span>
+                <span className="text-muted-foreground text-right">p99</span>
+                {STAGES.map((stage) => {
+                  const timing = timings.stages[stage.key];
+                  return (
+                    <React.Fragment key={stage.key}>
+                      <span className="flex items-center gap-2">
+                        <span className={`inline-block h-2 w-2 rounded-full ${stage.color}`}></span>
+                        {stage.label}
+                      </span>
+                      <span className="font-mono text-right">{timing ? timing.perProbeMs.toFixed(2) : '-'} ms</span>
+                      <span className="font-mono text-right">{timing ? timing.avgMs.toFixed(2) : '-'} ms</span>
+                      <span className="font-mono text-right">{timing?.p95Ms != null ? timing.p95Ms.toFixed(1) : '-'} ms</span>
+                      <span className="font-mono text-right">{timing?.p99Ms != null ? timing.p99Ms.toFixed(1) : '-'} ms</span>
+                    </React.Fragment>
+                  );
+                })}
+              </div>
+              
+              <div className="text-xs text-muted-foreground flex flex-wrap gap-x-6 gap-y-1">
+                <span>Probes: <span className="font-mono">{timings.probes}</span></span>
+                <span>Probe p50/p95: <span className="font-mono">{timings.probeP50Ms?.toFixed(1) ?? '-'} / {timings.probeP95Ms?.toFixed(1) ?? '-'} ms</span></span>
+                <span>Connections opened: <span className="font-mono">{timings.connectionsOpened}</span></span>
+                <span>In flight: <span className="font-mono">{timings.scheduler.inFlight}</span></span>
+              </div>
+            </>
+          ) : (
+            <div className="text-xs text-muted-foreground">No probes timed yet</div>
+          )}
+        </CardContent>
+      </Card>
+
       {/* Advanced Settings Section */}
       <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
         <Card className="neo-blur frost-panel bg-card/30 border-border">
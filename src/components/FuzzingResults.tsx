@@ -280,6 +280,19 @@ const FuzzingResults: React.FC<FuzzingResultsProps> = ({ vulnerabilities }) => {
     return () => clearInterval(intervalId);
   }, []);
   
+  // Show results pushed by the backend as they arrive instead of waiting for the next poll
+  useEffect(() => {
+    const closeStream = fuzzingService.streamResults({
+      onResults: (results) => {
+        if (results.length > 0) {
+          setResultsData(results);
+        }
+      }
+    });
+    
+    return closeStream;
+  }, []);
+  
   // Fetch anomaly analysis when tab changes to "anomalies"
   useEffect(() => {
     if (activeTab === "anomalies") {
@@ -451,7 +464,7 @@ const FuzzingResults: React.FC<FuzzingResultsProps> = ({ vulnerabilities }) => {
                           <TableCell>
                             <div className="flex items-center gap-1">
                               <TimerOff className="h-3 w-3 text-muted-foreground" />
-                              <span>{result.responseTime} ms</span>
+                              <span>{result.responseTime === null ? '-' : `${result.responseTime} ms`}</span>
                             </div>
                           </TableCell>
                           <TableCell>{getSeverityBadge(result.severity)}</TableCell>
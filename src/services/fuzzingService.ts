@@ -24,7 +24,7 @@ export interface FuzzingResult {
   method: string;
   payload: string;
   status: number;
-  responseTime: number;
+  responseTime: number | null;
   severity: 'critical' | 'high' | 'medium' | 'low';
   finding: string;
   alertDetected?: boolean;
@@ -32,9 +32,55 @@ export interface FuzzingResult {
   bodyWordCountChanged?: boolean;
 }
 
+export interface StageTiming {
+  count: number;
+  totalMs: number;
+  avgMs: number;
+  p50Ms: number | null;
+  p95Ms: number | null;
+  p99Ms: number | null;
+  share: number;
+  perProbeMs: number;
+}
+
+export interface MetricsSummary {
+  uptimeSeconds: number;
+  probes: number;
+  probeP50Ms: number | null;
+  probeP95Ms: number | null;
+  requests: Record<string, number>;
+  findings: Record<string, number>;
+  responseBytes: number;
+  connectionsOpened: number;
+  stages: Record<string, StageTiming>;
+  scheduler: {
+    activeScans: number;
+    queuedScans: number;
+    inFlight: number;
+    streamSubscribers: number;
+  };
+}
+
+export interface ScanProgress {
+  scanId: string;
+  running: boolean;
+  payloadsDone: number;
+  payloadsTotal: number;
+  progress: number;
+  requests: number;
+  elapsedSeconds: number;
+  requestsPerSecond: number;
+}
+
 // Base URL for the Python backend (adjust as needed)
 const API_BASE_URL = "http://localhost:5000";
 
+// Rows requested per page from /api/fuzzing-results
+const RESULTS_PAGE_SIZE = 1000;
+
+// Results fetched so far; each poll only asks for rows after the cursor
+let resultsCache: { key: string; cursor: number; results: FuzzingResult[] } = { key: '', cursor: 0, results: [] };
+
 export const fuzzingService = {
   // Start a fuzzing scan with the provided parameters
   startScan: async (params: FuzzingParameters): Promise<{ success: boolean, message: string }> => {
@@ -53,6 +99,7 @@ export const fuzzingService = {
         throw new Error(data.message || 'Failed to start fuzzing scan');
       }
       
+      resultsCache = { key: '', cursor: 0, results: [] };
       return { success: true, message: data.message || 'Fuzzing scan started successfully' };
     } catch (error) {
       console.error('Error starting fuzzing scan:', error);
@@ -60,17 +107,46 @@ export const fuzzingService = {
     }
   },
 
-  // Get current fuzzing results
+  // Get current fuzzing results, fetching only the rows added since the last call
   getResults: async (): Promise<FuzzingResult[]> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/fuzzing-results`);
-      
-      if (!response.ok) {
-        throw new Error('Failed to fetch fuzzing results');
+      let hasMore = true;
+      while (hasMore) {
+        const since = resultsCache.cursor;
+        const response = await fetch(
+          `${API_BASE_URL}/api/fuzzing-results?since=${since}&limit=${RESULTS_PAGE_SIZE}`
+        );
+        
+        // Nothing new since the last poll
+        if (response.status === 304) {
+          break;
+        }
+        
+        if (!response.ok) {
+          throw new Error('Failed to fetch fuzzing results');
+        }
+        
+        const data = await response.json();
+        // The stream or another poll moved the cache while this page was in flight; ask again from there
+        if (since !== resultsCache.cursor) {
+          continue;
+        }
+        const key = `${data.source}:${data.scanId}`;
+        if (key !== resultsCache.key) {
+          // A different scan is being served, so its cursor starts over
+          const stale = resultsCache.cursor !== 0;
+          resultsCache = { key, cursor: 0, results: [] };
+          if (stale) {
+            continue;
+          }
+        }
+        
+        resultsCache.results = resultsCache.results.concat(data.results);
+        resultsCache.cursor = data.nextCursor;
+        hasMore = data.hasMore;
       }
       
-      const data = await response.json();
-      return data.results;
+      return [...resultsCache.results];
     } catch (error) {
       console.error('Error fetching fuzzing results:', error);
       toast.error("Failed to fetch fuzzing results", {
@@ -80,6 +156,38 @@ export const fuzzingService = {
     }
   },
 
+  // Subscribe to results and progress pushed over Server-Sent Events; returns a function that closes the stream
+  streamResults: (handlers: {
+    onResults: (results: FuzzingResult[]) => void;
+    onProgress?: (progress: ScanProgress) => void;
+  }): (() => void) => {
+    const source = new EventSource(`${API_BASE_URL}/api/stream?since=${resultsCache.cursor}`);
+    const resync = () => {
+      fuzzingService.getResults().then(handlers.onResults);
+    };
+    
+    source.addEventListener('results', (event) => {
+      const rows: FuzzingResult[] = JSON.parse((event as MessageEvent).data);
+      // Only extend the cache when the pushed rows continue it; otherwise catch up over REST
+      if (rows.length > 0 && rows[0].id === resultsCache.cursor + 1) {
+        resultsCache.results = resultsCache.results.concat(rows);
+        resultsCache.cursor = rows[rows.length - 1].id;
+        handlers.onResults([...resultsCache.results]);
+      } else {
+        resync();
+      }
+    });
+    
+    // The server dropped rows for this slow client
+    source.addEventListener('gap', resync);
+    
+    source.addEventListener('progress', (event) => {
+      handlers.onProgress?.(JSON.parse((event as MessageEvent).data));
+    });
+    
+    return () => source.close();
+  },
+
   // Stop an ongoing fuzzing scan
   stopScan: async (): Promise<boolean> => {
     try {
@@ -101,6 +209,23 @@ export const fuzzingService = {
     }
   },
 
+  // Get per-stage probe timings and request counters
+  getMetricsSummary: async (): Promise<MetricsSummary | null> => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/metrics/summary`);
+      
+      if (!response.ok) {
+        throw new Error('Failed to fetch metrics');
+      }
+      
+      const data = await response.json();
+      return data.metrics;
+    } catch (error) {
+      console.error('Error fetching metrics:', error);
+      return null;
+    }
+  },
+
   // Get ML analysis of current results
   getAnomalyAnalysis: async (): Promise<any> => {
     try {